@@ -86,6 +86,122 @@ def create_coursematch_agent():
                                     }
                                 }
                             }
+                        },
+                        "/optimize-schedule": {
+                            "post": {
+                                "description": "Find the most compact conflict-free schedule (fewest gaps, early classes and campus days)",
+                                "parameters": [
+                                    {
+                                        "name": "interests",
+                                        "in": "query",
+                                        "required": False,
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "schedule",
+                                        "in": "query",
+                                        "required": False,
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "courses",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Comma-separated course codes to choose from",
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "count",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Number of courses in the schedule",
+                                        "schema": {"type": "integer"}
+                                    },
+                                    {
+                                        "name": "budget_ms",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Search time limit in milliseconds",
+                                        "schema": {"type": "integer"}
+                                    }
+                                ],
+                                "responses": {
+                                    "200": {
+                                        "description": "Best schedule found within the time limit",
+                                        "content": {
+                                            "application/json": {
+                                                "schema": {
+                                                    "type": "object",
+                                                    "properties": {
+                                                        "courses": {
+                                                            "type": "array",
+                                                            "items": {"type": "object"}
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                        "/generate-schedules": {
+                            "post": {
+                                "description": "Build conflict-free schedules of several courses at once",
+                                "parameters": [
+                                    {
+                                        "name": "interests",
+                                        "in": "query",
+                                        "required": False,
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "schedule",
+                                        "in": "query",
+                                        "required": False,
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "courses",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Comma-separated course codes to choose from",
+                                        "schema": {"type": "string"}
+                                    },
+                                    {
+                                        "name": "count",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Number of courses per schedule",
+                                        "schema": {"type": "integer"}
+                                    },
+                                    {
+                                        "name": "limit",
+                                        "in": "query",
+                                        "required": False,
+                                        "description": "Number of schedule options to return",
+                                        "schema": {"type": "integer"}
+                                    }
+                                ],
+                                "responses": {
+                                    "200": {
+                                        "description": "Conflict-free schedule options",
+                                        "content": {
+                                            "application/json": {
+                                                "schema": {
+                                                    "type": "object",
+                                                    "properties": {
+                                                        "schedules": {
+                                                            "type": "array",
+                                                            "items": {"type": "array", "items": {"type": "object"}}
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
                         }
                     }
                 })
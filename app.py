@@ -1,15 +1,21 @@
 import streamlit as st
 import boto3
-import json
-from io import BytesIO
-import pandas as pd
-from schedule_parser import extract_schedule_with_bedrock
-from course_matcher import match_courses_with_bedrock
-from course_data import get_sample_courses
-from bedrock_agent import CourseMatchAgent, create_course_recommendation_query
+from schedule_parser import parse_schedule
+from course_matcher import match_courses_hedged, stream_courses_with_bedrock
+from course_data import get_catalog, get_code_index, get_completion_index
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeout
+from bedrock_agent import AgentSessionManager, CourseMatchAgent
+from semantic_cache import get_semantic_cache
+from local_retrieval import LocalRetrievalIndex
+from prompt_builder import meeting_summary
 
 st.set_page_config(page_title="CourseMatchAI", page_icon="🎓", layout="wide")
 
+# How long the hybrid method keeps the page busy for Bedrock's late ranking;
+# a ranking that lands later is shown on the next rerun
+UPGRADE_WAIT_SECONDS = 2
+
 # Initialize AWS clients
 @st.cache_resource
 def init_aws_clients():
@@ -28,6 +34,60 @@ def init_agent():
 
 agent = init_agent()
 
+# Agent session ids shared across Streamlit sessions, one per browser session
+@st.cache_resource
+def init_agent_sessions():
+    return AgentSessionManager()
+
+agent_sessions = init_agent_sessions()
+if 'agent_user_key' not in st.session_state:
+    st.session_state.agent_user_key = uuid.uuid4().hex
+
+# Local retrieval index (offline alternative to the Knowledge Base), over the same catalog as the other methods
+@st.cache_resource
+def init_local_index():
+    return LocalRetrievalIndex.from_courses(get_catalog())
+
+def render_recommendation(i, rec):
+    course_info = rec.get('course_info', {})
+    course_code = rec.get('course_code', '')
+    
+    with st.expander(f"{i}. {course_code} - {course_info.get('title', '')}", expanded=i==1):
+        col_a, col_b = st.columns([2, 1])
+        with col_a:
+            st.write(f"**Time:** {course_info.get('time', 'TBA')}")
+            st.write(f"**GE Area:** {course_info.get('ge_area', 'N/A')}")
+            st.write(f"**Credits:** {course_info.get('credits', 'N/A')}")
+            st.write(f"**Description:** {course_info.get('description', '')}")
+            st.write(f"**Why it matches:** {rec.get('explanation', '')}")
+        with col_b:
+            relevance = rec.get('relevance_score', 0)
+            st.metric("Relevance", f"{relevance:.1%}")
+            st.write(f"**Difficulty:** {course_info.get('difficulty', 'N/A')}")
+
+def render_agent_stream(events):
+    """Show the agent's answer as it streams in, then its references; returns the collected response"""
+    placeholder = st.empty()
+    answer = ""
+    references = []
+    for event in events:
+        if event['type'] == 'error':
+            return {"error": event['error']}
+        if event['type'] == 'chunk':
+            answer += event['text']
+            placeholder.markdown(answer)
+        else:
+            references.extend(event['references'])
+    
+    if references:
+        with st.expander("📚 Knowledge Base References"):
+            for ref in references:
+                content = ref.get('content', {}).get('text', '')
+                location = ref.get('location', {}).get('s3Location', {}).get('uri', '')
+                st.write(f"**Source:** {location}")
+                st.write(f"**Content:** {content[:200]}...")
+    return {"answer": answer.strip(), "references": references, "success": True}
+
 
 
 
@@ -45,7 +105,7 @@ with col1:
     
     # Schedule input options
     input_method = st.radio("How would you like to input your schedule?", 
-                           ["Text Input", "Upload File"])
+                           ["Text Input", "Pick from Catalog", "Upload File"])
     
     current_schedule = []
     
@@ -53,7 +113,24 @@ with col1:
         schedule_text = st.text_area("Enter your current schedule:", 
                                    placeholder="MATH 31A (MWF 9-10), ENGL 4 (TuTh 11-12:30)")
         if schedule_text:
-            current_schedule = extract_schedule_with_bedrock(schedule_text, clients['bedrock']).get('courses', [])
+            # Regex parser first; Bedrock only sees the lines it can't explain
+            current_schedule = parse_schedule(schedule_text, clients['bedrock'], code_index=get_code_index())['courses']
+    
+    elif input_method == "Pick from Catalog":
+        # Choose sections by code or title; their meeting times come from the catalog
+        if 'picked_courses' not in st.session_state:
+            st.session_state.picked_courses = []
+        search = st.text_input("Search by course code or title:", placeholder="cs 188, linguistics...")
+        completions = get_completion_index().complete(search) if search else []
+        if completions:
+            picked = st.selectbox("Matching courses", completions, format_func=lambda c: c['label'])
+            if st.button("Add to schedule") and picked['position'] not in st.session_state.picked_courses:
+                st.session_state.picked_courses.append(picked['position'])
+        elif search:
+            st.caption("No catalog course matches that code or title.")
+        if st.session_state.picked_courses and st.button("Clear schedule"):
+            st.session_state.picked_courses = []
+        current_schedule = [dict(get_catalog()[position]) for position in st.session_state.picked_courses]
     
     elif input_method == "Upload File":
         uploaded_file = st.file_uploader("Upload schedule (PDF/Image)", 
@@ -65,18 +142,26 @@ with col1:
     if current_schedule:
         st.success(f"Detected {len(current_schedule)} courses in your schedule")
         for course in current_schedule:
-            st.write(f"• {course.get('code', 'Unknown')} - {course.get('days', '')}{course.get('time', '')}")
+            st.write(f"• {course.get('code', 'Unknown')} - {course.get('days', '')} {course.get('start_time', '')}-{course.get('end_time', '')}")
 
 with col2:
     st.header("🎯 Interests & Preferences")
     
     interests = st.text_area("What are you interested in?", 
                            placeholder="AI ethics, neuroscience, linguistics, cognitive science...")
+    
+    # Filters
+    sample_courses = get_catalog()
+    st.subheader("Filters")
+    difficulty = st.selectbox("Difficulty Level", ["Any"] + sorted({c['difficulty'] for c in sample_courses}))
+    ge_area = st.selectbox("GE Area", ["Any"] + sorted({c['ge_area'] for c in sample_courses}))
+    credits = st.slider("Credits", 1, 5, (1, 5))
 
 # Method selection
 st.subheader("🤖 Recommendation Method")
 method = st.radio("Choose recommendation approach:", 
-                 ["AI Agent (Recommended)", "Direct Bedrock API"])
+                 ["AI Agent (Recommended)", "Direct Bedrock API", "Fast Hybrid (local first, AI upgrade)",
+                  "Local Semantic Search (offline)"])
 
 # Generate recommendations
 if st.button("🔍 Find Matching Courses", type="primary"):
@@ -89,55 +174,107 @@ if st.button("🔍 Find Matching Courses", type="primary"):
             }
             
             if method == "AI Agent (Recommended)":
-                # Use Bedrock Agent
-                query = create_course_recommendation_query(interests, current_schedule, filters)
-                agent_response = agent.invoke_agent(query)
+                # Use Bedrock Agent in this user's session, rendering the answer as it arrives
+                st.header("🤖 AI Agent Recommendations")
+                agent_response = render_agent_stream(agent.ask(
+                    agent_sessions, st.session_state.agent_user_key, interests, current_schedule, filters,
+                    cache=get_semantic_cache()
+                ))
                 
-                if agent_response.get('success'):
-                    st.header("🤖 AI Agent Recommendations")
-                    st.write(agent_response['answer'])
-                    
-                    if agent_response.get('references'):
-                        with st.expander("📚 Knowledge Base References"):
-                            for ref in agent_response['references']:
-                                content = ref.get('content', {}).get('text', '')
-                                location = ref.get('location', {}).get('s3Location', {}).get('uri', '')
-                                st.write(f"**Source:** {location}")
-                                st.write(f"**Content:** {content[:200]}...")
-                else:
+                if not agent_response.get('success'):
                     st.error(f"Agent Error: {agent_response.get('error', 'Unknown error')}")
                     st.info("Falling back to direct API method...")
-                    recommendations = match_courses_with_bedrock(interests, current_schedule, clients['bedrock'], filters)
-            else:
-                # Use direct Bedrock API
-                recommendations = match_courses_with_bedrock(interests, current_schedule, clients['bedrock'], filters)
-            
-            if method == "Direct Bedrock API":
-                st.header("📚 Recommended Courses")
+                    method = "Direct Bedrock API"
+            elif method == "Local Semantic Search (offline)":
+                # Use local retrieval index, no network round trip
+                local_index = init_local_index()
+                results = local_index.search(interests, k=5, candidates=local_index.compatible_mask(current_schedule))
                 
-                if recommendations.get('recommendations'):
-                    for i, rec in enumerate(recommendations['recommendations'][:5], 1):
-                        course_info = rec.get('course_info', {})
-                        course_code = rec.get('course_code', '')
-                        
-                        with st.expander(f"{i}. {course_code} - {course_info.get('title', '')}", expanded=i==1):
+                st.header("💻 Local Semantic Matches")
+                if results:
+                    for i, (doc, score) in enumerate(results, 1):
+                        with st.expander(f"{i}. {doc.get('course_code', '')} - {doc.get('title', '')}", expanded=i==1):
                             col_a, col_b = st.columns([2, 1])
                             with col_a:
-                                st.write(f"**Time:** {course_info.get('time', 'TBA')}")
-                                st.write(f"**GE Area:** {course_info.get('ge_area', 'N/A')}")
-                                st.write(f"**Credits:** {course_info.get('credits', 'N/A')}")
-                                st.write(f"**Description:** {course_info.get('description', '')}")
-                                st.write(f"**Why it matches:** {rec.get('explanation', '')}")
+                                st.write(f"**Time:** {meeting_summary(doc) or 'TBA'}")
+                                st.write(f"**GE Area:** {doc.get('ge_area', 'N/A')}")
+                                st.write(f"**Description:** {doc.get('description', '')}")
                             with col_b:
-                                relevance = rec.get('relevance_score', 0)
-                                st.metric("Relevance", f"{relevance:.1%}")
-                                st.write(f"**Difficulty:** {course_info.get('difficulty', 'N/A')}")
+                                st.metric("Similarity", f"{score:.2f}")
+                                st.write(f"**Difficulty:** {doc.get('difficulty', 'N/A')}")
                 else:
-                    message = recommendations.get('message', 'No matching courses found. Try adjusting your interests or filters.')
-                    st.warning(message)
+                    st.warning("No matching courses found that fit your schedule.")
+            
+            if method == "Fast Hybrid (local first, AI upgrade)":
+                # Local ranking if Bedrock misses the deadline, swapped for Bedrock's when it lands
+                st.header("📚 Recommended Courses")
+                hedged = match_courses_hedged(interests, current_schedule, clients['bedrock'], filters, top_k=5)
+                results = st.empty()
+                with results.container():
+                    for i, rec in enumerate(hedged['recommendations'], 1):
+                        render_recommendation(i, rec)
+                    if not hedged['recommendations']:
+                        st.warning(hedged.get('message', 'No matching courses found. Try adjusting your interests or filters.'))
+                    elif hedged['pending'] is not None:
+                        st.caption("⚡ Quick local matches; AI-ranked results replace these if they land in a moment, otherwise check back below.")
+                
+                st.session_state.pending_upgrade = None
+                if hedged['pending'] is not None:
+                    try:
+                        upgraded = hedged['pending'].result(timeout=UPGRADE_WAIT_SECONDS)
+                    except FutureTimeout:
+                        st.session_state.pending_upgrade = hedged['pending']
+                        upgraded = None
+                    if upgraded:
+                        with results.container():
+                            for i, rec in enumerate(upgraded, 1):
+                                render_recommendation(i, rec)
+            
+            if method == "Direct Bedrock API":
+                st.header("📚 Recommended Courses")
+                
+                # Each recommendation renders as soon as the model finishes writing it
+                shown = 0
+                for shown, rec in enumerate(stream_courses_with_bedrock(interests, current_schedule, clients['bedrock'],
+                                                                        filters, limit=5), 1):
+                    render_recommendation(shown, rec)
+                if not shown:
+                    st.warning('No matching courses found. Try adjusting your interests or filters.')
     else:
         st.error("Please enter both your schedule and interests to get recommendations.")
 
+# A hybrid ranking that missed the short wait replaces the local matches on a later rerun
+pending_upgrade = st.session_state.get('pending_upgrade')
+if pending_upgrade is not None and method == "Fast Hybrid (local first, AI upgrade)":
+    if pending_upgrade.done():
+        st.session_state.pending_upgrade = None
+        upgraded = pending_upgrade.result()
+        if upgraded:
+            st.header("📚 AI-Ranked Courses")
+            for i, rec in enumerate(upgraded, 1):
+                render_recommendation(i, rec)
+    else:
+        st.button("🔄 Check for AI-ranked results")
+
+# Follow-ups continue the same agent session, so the schedule isn't sent again
+if method == "AI Agent (Recommended)":
+    follow_up = st.text_input("💬 Ask the agent a follow-up",
+                              placeholder="Which of those has the lightest workload?")
+    if st.button("Ask") and follow_up:
+        with st.spinner("Asking the agent..."):
+            follow_up_response = render_agent_stream(agent.ask(
+                agent_sessions, st.session_state.agent_user_key, interests, current_schedule,
+                {'difficulty': difficulty, 'ge_area': ge_area, 'credits': credits}, question=follow_up
+            ))
+        if not follow_up_response.get('success'):
+            st.error(f"Agent Error: {follow_up_response.get('error', 'Unknown error')}")
+
+# Semantic cache counters, for tuning its similarity threshold
+semantic_cache = get_semantic_cache()
+if semantic_cache.stats['hits'] + semantic_cache.stats['misses']:
+    st.sidebar.caption(f"Semantic cache: {semantic_cache.hit_ratio():.0%} hit ratio, "
+                       f"{semantic_cache.stats['saved_seconds']:.1f} s of model time saved, {len(semantic_cache)} entries")
+
 # Footer
 st.markdown("---")
 st.markdown("*Powered by AWS Bedrock, Textract, and DynamoDB*")
\ No newline at end of file
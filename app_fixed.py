@@ -1,6 +1,13 @@
 import streamlit as st
-import pandas as pd
 import re
+import numpy as np
+from itertools import islice
+from catalog_snapshot import start_snapshot_manager
+from interval_index import free_gaps
+from schedule_generator import DEFAULT_POOL_SIZE, generate_schedules
+from schedule_optimizer import DEFAULT_BUDGET_MS, DEFAULT_WEIGHTS, optimize_schedule
+from schedule_parser import parse_free_windows
+from time_slots import format_clock
 
 st.set_page_config(page_title="Course Match", layout="wide")
 
@@ -79,14 +86,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_courses():
+@st.cache_resource
+def load_snapshots():
+    """Catalog snapshots shared by every session, reloaded in the background when the CSV changes"""
     try:
-        df = pd.read_csv("ucla_courses.csv")
-        return df
+        return start_snapshot_manager("ucla_courses.csv", "ucla_courses.catalog")
     except Exception as e:
-        pass
-        return pd.DataFrame()
+        st.error(f"Error loading catalog: {e}")
+        return None
+
+def parse_enrolled_codes(codes_text, code_index):
+    """Catalog rows for comma-separated course codes ("cs 188" finds COM SCI 188); unknown codes are returned separately"""
+    rows, unknown = [], []
+    for code in codes_text.split(','):
+        code = ' '.join(code.split()).upper()
+        if code:
+            positions = code_index.positions(code)
+            if positions:
+                rows.append(positions[0])
+            else:
+                unknown.append(code)
+    return rows, unknown
 
 def parse_current_schedule(schedule_text):
     """Parse current schedule into structured format"""
@@ -132,176 +152,82 @@ def convert_to_24h(hour, minute, period):
     
     return hour * 60 + minute
 
-def expand_days(day_string):
-    """Convert day abbreviations to full day names"""
-    day_map = {
-        'M': 'Monday',
-        'Tu': 'Tuesday', 
-        'W': 'Wednesday',
-        'Th': 'Thursday',
-        'F': 'Friday',
-        'Sa': 'Saturday',
-        'Su': 'Sunday'
-    }
-    
-    if not day_string:
-        return 'TBA'
-    
-    # Handle common patterns
-    day_string = str(day_string).strip()
-    
-    # Replace common abbreviations
-    if 'MWF' in day_string:
-        return 'Monday, Wednesday, Friday'
-    elif 'TuTh' in day_string or 'TTh' in day_string:
-        return 'Tuesday, Thursday'
-    elif 'MW' in day_string:
-        return 'Monday, Wednesday'
-    elif 'WF' in day_string:
-        return 'Wednesday, Friday'
-    
-    # Handle individual days or other patterns
-    result = []
-    i = 0
-    while i < len(day_string):
-        if i < len(day_string) - 1 and day_string[i:i+2] in day_map:
-            result.append(day_map[day_string[i:i+2]])
-            i += 2
-        elif day_string[i] in day_map:
-            result.append(day_map[day_string[i]])
-            i += 1
-        else:
-            i += 1
-    
-    return ', '.join(result) if result else day_string
-
-def convert_military_to_standard(time_string):
-    """Convert military time format to standard time format"""
-    if not time_string or time_string == 'TBA':
-        return 'TBA'
-    
-    time_string = str(time_string).strip()
-    
-    # Handle time ranges like "13:00-14:00" or "13-14"
-    if '-' in time_string:
-        start_time, end_time = time_string.split('-', 1)
-        start_converted = convert_single_time(start_time.strip())
-        end_converted = convert_single_time(end_time.strip())
-        return f"{start_converted} - {end_converted}"
-    else:
-        return convert_single_time(time_string)
+def meeting_display(course):
+    """(days, times) display strings for a catalog Course record, e.g. ("Tuesday, Thursday", "3:00 PM - 4:30 PM")"""
+    if course.start is None:
+        return 'TBA', 'TBA'
+    return course.day_names(), f"{format_clock(course.start)} - {format_clock(course.end)}"
 
-def convert_single_time(time_str):
-    """Convert single military time to standard format"""
-    try:
-        # Handle formats like "13:00" or "13"
-        if ':' in time_str:
-            hour, minute = time_str.split(':')
-            hour = int(hour)
-            minute = int(minute)
-        else:
-            hour = int(time_str)
-            minute = 0
-        
-        # Convert to 12-hour format
-        if hour == 0:
-            return f"12:{minute:02d} AM"
-        elif hour < 12:
-            return f"{hour}:{minute:02d} AM"
-        elif hour == 12:
-            return f"12:{minute:02d} PM"
-        else:
-            return f"{hour-12}:{minute:02d} PM"
-    except:
-        return time_str
+def generate_schedule_options(interests, current_schedule, course_arrays, course_count, taken_rows=(), limit=5):
+    """First few conflict-free sets of `course_count` courses drawn from the best interest matches"""
+    matches = course_arrays.top_matches(interests, current_schedule, {}, k=DEFAULT_POOL_SIZE, taken_rows=taken_rows)
+    rows = [row for row, _, _ in matches]
+    pool = [course_arrays.course(row) for row in rows]
+    schedules = generate_schedules(pool, course_count, current_schedule, conflicts=course_arrays.pool_conflicts(rows))
+    return list(islice(schedules, limit))
 
-def check_time_conflict(current_schedule, course_days, course_start, course_end):
-    """Check if course conflicts with current schedule"""
-    if not current_schedule:
-        return False
-    
-    # Convert course times to minutes
-    try:
-        if isinstance(course_start, str) and ':' in course_start:
-            start_parts = course_start.split(':')
-            course_start_min = int(start_parts[0]) * 60 + int(start_parts[1])
-        else:
-            course_start_min = int(float(course_start)) * 60
-            
-        if isinstance(course_end, str) and ':' in course_end:
-            end_parts = course_end.split(':')
-            course_end_min = int(end_parts[0]) * 60 + int(end_parts[1])
-        else:
-            course_end_min = int(float(course_end)) * 60
-    except:
-        return False
-    
-    # Parse course days
-    if isinstance(course_days, str):
-        course_days_clean = course_days.replace('[', '').replace(']', '').replace("'", '').replace('"', '')
-        course_day_list = [d.strip() for d in course_days_clean.split(',')]
-    else:
-        course_day_list = []
-    
-    # Check each scheduled course
-    for scheduled in current_schedule:
-        scheduled_days = scheduled['days']
-        
-        # Check if any days overlap
-        day_overlap = False
-        for course_day in course_day_list:
-            if course_day in scheduled_days or any(d in course_day for d in scheduled_days):
-                day_overlap = True
-                break
-        
-        if day_overlap:
-            # Check if times overlap
-            if (course_start_min < scheduled['end_time'] and 
-                course_end_min > scheduled['start_time']):
-                return True
-    
-    return False
+def optimize_schedule_layout(interests, current_schedule, course_arrays, course_count, weights, budget_ms, taken_rows=()):
+    """Most compact layout of `course_count` courses from the best interest matches"""
+    matches = course_arrays.top_matches(interests, current_schedule, {}, k=DEFAULT_POOL_SIZE, taken_rows=taken_rows)
+    rows = [row for row, _, _ in matches]
+    best_score = matches[0][1] if matches else 1
+    # Enrolled catalog courses count towards the layout like any other fixed meeting
+    fixed = list(current_schedule) + [course_arrays.course(row) for row in taken_rows]
+    return optimize_schedule(
+        [course_arrays.course(row) for row in rows],
+        course_count,
+        fixed,
+        relevance=[score / best_score for _, score, _ in matches],
+        weights=weights,
+        budget_ms=budget_ms,
+        conflicts=course_arrays.pool_conflicts(rows)
+    )
 
-def simple_course_match(interests, current_schedule, courses_df, filters):
+def simple_course_match(interests, current_schedule, course_arrays, filters, taken_rows=()):
     """Course matching with conflict detection"""
-    if courses_df.empty:
+    if not course_arrays.size:
         return []
     
-    interest_words = interests.lower().split()
-    matched_courses = []
+    matches = course_arrays.top_matches(interests, current_schedule, filters, k=5, taken_rows=taken_rows)
+    return [
+        {'course': course_arrays.course(row), 'score': score, 'matches': words}
+        for row, score, words in matches
+    ]
+
+def free_windows(free_text, current_schedule, use_gaps):
+    """Free windows from the user's description, else the gaps of their schedule"""
+    if free_text:
+        return parse_free_windows(free_text)
+    if use_gaps:
+        return free_gaps(current_schedule)
+    return {}
+
+def free_time_match(interests, windows, course_arrays, interval_index, taken_rows=(), k=5):
+    """Courses whose every meeting falls inside the free windows, best interest matches first"""
+    inside = np.zeros(course_arrays.size, dtype=bool)
+    inside[interval_index.ids_within(windows)] = True
+    if len(taken_rows):
+        inside &= course_arrays.fits_with(taken_rows)
     
-    for _, course in courses_df.iterrows():
-        # Check for schedule conflicts first
-        if check_time_conflict(current_schedule, 
-                             course.get('days', ''), 
-                             course.get('start_time', 0), 
-                             course.get('end_time', 0)):
-            continue  # Skip conflicting courses
-        
-        score = 0
-        course_text = f"{course.get('course_title', '')} {course.get('description', '')}".lower()
-        
-        # Check interest matches
-        matches = []
-        for word in interest_words:
-            if word in course_text:
-                score += 1
-                matches.append(word)
-        
-        # Apply filters
-        if filters.get('difficulty') and filters['difficulty'] != 'Any':
-            if str(course.get('difficulty', '')) != str(filters['difficulty']):
-                continue
+    if interests:
+        matches = course_arrays.top_matches(interests, [], {}, k=k, row_mask=inside)
+    else:
+        matches = [(int(row), 0, []) for row in np.flatnonzero(inside)[:k]]
+    return [
+        {'course': course_arrays.course(row), 'score': score, 'matches': words}
+        for row, score, words in matches
+    ]
+
+def render_recommendations(recommendations):
+    for i, rec in enumerate(recommendations, 1):
+        course = rec['course']
         
-        if score > 0:
-            matched_courses.append({
-                'course': course,
-                'score': score,
-                'matches': matches
-            })
-    
-    matched_courses.sort(key=lambda x: x['score'], reverse=True)
-    return matched_courses[:5]
+        with st.expander(f"{i}. {course.get('course_code', '')} - {course.get('course_title', '')}", expanded=i==1):
+            days, times = meeting_display(course)
+            st.write(f"**Days:** {days}")
+            st.write(f"**Time:** {times}")
+            st.write(f"**GE Area:** {course.get('GE', 'N/A')}")
+            st.write(f"**Description:** {course.get('description', '')}")
 
 # Main UI
 st.markdown("""
@@ -310,11 +236,16 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-courses_df = load_courses()
+snapshots = load_snapshots()
 
-if courses_df.empty:
+if not snapshots:
     st.stop()
 
+# One snapshot for the whole rerun, even if a reload swaps in a newer version meanwhile
+snapshot = snapshots.current()
+catalog = snapshot.catalog
+st.sidebar.caption(f"Catalog version {snapshot.version}: {len(catalog)} courses")
+
 col1, col2 = st.columns([1, 1])
 
 with col1:
@@ -332,6 +263,39 @@ with col1:
             end_h = course.get('end_time', 0) // 60
             end_m = course.get('end_time', 0) % 60
             st.write(f"- {days} {start_h:02d}:{start_m:02d}-{end_h:02d}:{end_m:02d}")
+    
+    enrolled_text = st.text_input("Or list catalog courses you're enrolled in:", placeholder="COM SCI 188, LING 20")
+    taken_rows, unknown_codes = parse_enrolled_codes(enrolled_text, snapshot.code_index)
+    if unknown_codes:
+        st.warning(f"Not in the catalog: {', '.join(unknown_codes)}")
+    
+    # Pick sections from the catalog instead of typing their times; picks are kept as
+    # records so they can be found again in a reloaded catalog version
+    if 'picked_courses' not in st.session_state:
+        st.session_state.picked_courses = []
+    search = st.text_input("Or search the catalog:", placeholder="com sci 1, linguistics...")
+    completions = snapshot.completion_index.complete(search) if search else []
+    if completions:
+        picked = st.selectbox("Matching sections", completions, format_func=lambda c: c['label'])
+        # Compared by row in this version, since picks made before a reload are older records
+        already_picked = {snapshot.find_row(course) for course in st.session_state.picked_courses}
+        if st.button("Add section") and picked['position'] not in already_picked:
+            st.session_state.picked_courses.append(picked['course'])
+    elif search:
+        st.caption("No catalog course matches that code or title.")
+    if st.session_state.picked_courses and st.button("Clear picked sections"):
+        st.session_state.picked_courses = []
+    picked_rows = []
+    for course in st.session_state.picked_courses:
+        row = snapshot.find_row(course)
+        if row is None:
+            st.warning(f"{course['code']} is no longer in the catalog at that time")
+            continue
+        picked_rows.append(row)
+        st.write(f"- {course['code']} - {course['title']}: {', '.join(meeting_display(catalog.course(row)))}")
+    taken_rows = list(dict.fromkeys(taken_rows + picked_rows))
+    if taken_rows:
+        st.write(f"{int(snapshot.course_arrays.fits_with(taken_rows).sum())} catalog courses fit alongside these")
 
 with col2:
     st.header("Interests & Preferences")
@@ -343,20 +307,71 @@ with col2:
 if st.button("Find Matching Courses", type="primary"):
     if interests:
         with st.spinner("Finding courses that don't conflict with your schedule..."):
-            recommendations = simple_course_match(interests, current_schedule, courses_df, {})
+            recommendations = simple_course_match(interests, current_schedule, snapshot.course_arrays, {}, taken_rows)
             
             st.header("Recommended Courses")
-            
-            if recommendations:
-                for i, rec in enumerate(recommendations, 1):
-                    course = rec['course']
-                    
-                    with st.expander(f"{i}. {course.get('course_code', '')} - {course.get('course_title', '')}", expanded=i==1):
-                        st.write(f"**Days:** {expand_days(course.get('days', 'TBA'))}")
-                        time_display = f"{course.get('start_time', '')}-{course.get('end_time', '')}"
-                        st.write(f"**Time:** {convert_military_to_standard(time_display)}")
-                        st.write(f"**GE Area:** {course.get('GE', 'N/A')}")
-                        st.write(f"**Description:** {course.get('description', '')}")
+            render_recommendations(recommendations)
+
+st.header("When Are You Free?")
+free_text = st.text_input("Describe your open time:", placeholder="Tuesday 12-2, Th 3-5pm")
+use_gaps = st.checkbox("Use the gaps between the classes in my current schedule")
+
+if st.button("Find Courses In My Free Time"):
+    windows = free_windows(free_text, current_schedule, use_gaps)
+    if windows:
+        recommendations = free_time_match(interests, windows, snapshot.course_arrays, snapshot.interval_index, taken_rows)
+        
+        st.header("Courses That Fit Your Free Time")
+        render_recommendations(recommendations)
+        if not recommendations:
+            st.warning("No courses fit entirely inside those times.")
+    else:
+        st.warning("Describe when you're free (e.g. \"Tuesday 12-2\") or use the gaps in your schedule.")
+
+st.header("Build a Full Schedule")
+course_count = st.number_input("Courses per schedule", min_value=2, max_value=6, value=3)
+
+if st.button("Generate Schedules"):
+    if interests:
+        with st.spinner("Combining courses that fit together..."):
+            schedules = generate_schedule_options(interests, current_schedule, snapshot.course_arrays, int(course_count),
+                                                  taken_rows)
+        
+        if schedules:
+            for i, schedule in enumerate(schedules, 1):
+                with st.expander(f"Option {i}: {', '.join(c.get('course_code', '') for c in schedule)}", expanded=i==1):
+                    for course in schedule:
+                        st.write(f"**{course.get('course_code', '')}** - {course.get('course_title', '')}: "
+                                 f"{', '.join(meeting_display(course))}")
+        else:
+            st.warning(f"No conflict-free combination of {int(course_count)} matching courses was found.")
+
+with st.expander("Layout preferences"):
+    weights = {
+        'gap_hours': st.slider("Avoid gaps between classes", 0.0, 5.0, DEFAULT_WEIGHTS['gap_hours']),
+        'early_hours': st.slider("Avoid classes before 9am", 0.0, 5.0, DEFAULT_WEIGHTS['early_hours']),
+        'campus_days': st.slider("Fewer days on campus", 0.0, 5.0, DEFAULT_WEIGHTS['campus_days']),
+        'no_lunch': st.slider("Keep an hour free for lunch", 0.0, 5.0, DEFAULT_WEIGHTS['no_lunch']),
+        'relevance': st.slider("Match my interests", 0.0, 5.0, DEFAULT_WEIGHTS['relevance'])
+    }
+    budget_ms = st.slider("Search time limit (ms)", 50, 2000, DEFAULT_BUDGET_MS, step=50)
+
+if st.button("Optimize Layout"):
+    if interests:
+        result = optimize_schedule_layout(interests, current_schedule, snapshot.course_arrays,
+                                          int(course_count), weights, budget_ms, taken_rows)
+        
+        if result['courses']:
+            breakdown = result['breakdown']
+            for course in result['courses']:
+                st.write(f"**{course.get('course_code', '')}** - {course.get('course_title', '')}: "
+                         f"{', '.join(meeting_display(course))}")
+            st.write(f"{breakdown['campus_days']} days on campus, {breakdown['gap_hours']:.1f} hours of gaps, "
+                     f"{breakdown['early_hours']:.1f} hours before 9am, {breakdown['no_lunch']} days without lunch")
+            st.caption(f"{'Best possible' if result['optimal'] else 'Best found'} layout, "
+                       f"{result['nodes']} options explored in {result['elapsed_ms']} ms")
+        else:
+            st.warning(f"No conflict-free combination of {int(course_count)} matching courses was found.")
 
 
 st.markdown("---")
\ No newline at end of file
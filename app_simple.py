@@ -1,62 +1,41 @@
 import streamlit as st
-import pandas as pd
 import json
+from catalog_snapshot import start_snapshot_manager
 
 st.set_page_config(page_title="CourseMatchAI", page_icon="🎓", layout="wide")
 
-# Load CSV data
-@st.cache_data
-def load_courses():
+# Catalog snapshots shared by every session, reloaded in the background when the CSV changes
+@st.cache_resource
+def load_snapshots():
     try:
-        df = pd.read_csv("ucla_courses.csv")
-        return df
+        return start_snapshot_manager("ucla_courses.csv", "ucla_courses.catalog")
     except Exception as e:
         st.error(f"Error loading CSV: {e}")
-        return pd.DataFrame()
+        return None
 
-def simple_course_match(interests, schedule_conflicts, courses_df, filters):
+def simple_course_match(interests, schedule_conflicts, course_arrays, filters):
     """Simple course matching without Bedrock"""
-    if courses_df.empty:
+    if not course_arrays.size:
         return []
     
-    # Filter by interests (simple keyword matching)
-    interest_words = interests.lower().split()
-    matched_courses = []
-    
-    for _, course in courses_df.iterrows():
-        score = 0
-        course_text = f"{course.get('course_title', '')} {course.get('description', '')}".lower()
-        
-        # Check interest matches
-        for word in interest_words:
-            if word in course_text:
-                score += 1
-        
-        # Apply filters
-        if filters.get('difficulty') and filters['difficulty'] != 'Any':
-            if str(course.get('difficulty', '')) != str(filters['difficulty']):
-                continue
-        
-        if score > 0:
-            matched_courses.append({
-                'course': course,
-                'score': score,
-                'matches': [w for w in interest_words if w in course_text]
-            })
-    
-    # Sort by score
-    matched_courses.sort(key=lambda x: x['score'], reverse=True)
-    return matched_courses[:5]
+    # Schedule lines here are free text, so only interests and filters apply
+    matches = course_arrays.top_matches(interests, [], filters, k=5)
+    return [
+        {'course': course_arrays.course(row), 'score': score, 'matches': words}
+        for row, score, words in matches
+    ]
 
 # Main UI
 st.title("🎓 CourseMatchAI")
 st.subheader("Personalized Class Recommender for UCLA Students")
 
 # Load courses
-courses_df = load_courses()
+snapshots = load_snapshots()
+snapshot = snapshots.current() if snapshots else None
+catalog = snapshot.catalog if snapshot else None
 
-if not courses_df.empty:
-    st.success(f"Loaded {len(courses_df)} courses from CSV")
+if catalog:
+    st.success(f"Loaded {len(catalog)} courses from CSV (catalog version {snapshot.version})")
 else:
     st.error("Could not load course data")
     st.stop()
@@ -90,7 +69,7 @@ with col2:
     # Filters
     st.subheader("Filters")
     difficulty = st.selectbox("Difficulty Level", ["Any", "1", "2", "3", "4", "5"])
-    ge_area = st.selectbox("GE Area", ["Any"] + list(courses_df['GE'].unique()) if 'GE' in courses_df.columns else ["Any"])
+    ge_area = st.selectbox("GE Area", ["Any"] + catalog.dictionaries['GE'])
 
 # Generate recommendations
 if st.button("🔍 Find Matching Courses", type="primary"):
@@ -101,7 +80,7 @@ if st.button("🔍 Find Matching Courses", type="primary"):
                 'ge_area': ge_area
             }
             
-            recommendations = simple_course_match(interests, current_schedule, courses_df, filters)
+            recommendations = simple_course_match(interests, current_schedule, snapshot.course_arrays, filters)
             
             st.header("📚 Recommended Courses")
             
@@ -1,6 +1,13 @@
 import boto3
+import hashlib
 import json
 import random
+import threading
+import time
+import uuid
+
+# Expire before the agent's own idleSessionTTLInSeconds (30 minutes, see agent_setup.py)
+SESSION_IDLE_SECONDS = 25 * 60
 
 class CourseMatchAgent:
     def __init__(self, region='us-east-1'):
@@ -18,8 +25,17 @@ class CourseMatchAgent:
         """Generate random 15-digit session ID"""
         return ''.join([str(random.randint(0, 9)) for _ in range(15)])
     
-    def invoke_agent(self, query, session_attributes=None):
+    def invoke_agent(self, query, session_attributes=None, session_id=None):
         """Invoke the CourseMatch agent with a query"""
+        return collect_agent_response(self.stream_agent(query, session_attributes, session_id))
+    
+    def stream_agent(self, query, session_attributes=None, session_id=None):
+        """Invoke the agent and yield its answer chunks and references as they arrive.
+
+        Pass a `session_id` (see AgentSessionManager) to continue a conversation;
+        without one every call starts a fresh session. Failures are yielded as
+        a single {"type": "error"} event.
+        """
         if session_attributes is None:
             session_attributes = {}
         
@@ -41,55 +57,168 @@ class CourseMatchAgent:
                 },
                 agentId=self.agent_id,
                 agentAliasId=self.agent_alias_id,
-                sessionId=self.generate_session_id(),
+                sessionId=session_id or self.generate_session_id(),
                 endSession=False,
                 enableTrace=True,
                 inputText=query,
+                # Send the final answer as it is generated instead of in one chunk at the end
+                streamingConfigurations={"streamFinalResponse": True}
             )
             
-            return self.process_agent_response(response)
+            yield from iter_agent_response(response)
             
         except Exception as e:
-            return {"error": f"Agent invocation failed: {str(e)}"}
+            yield {"type": "error", "error": f"Agent invocation failed: {str(e)}"}
     
     def process_agent_response(self, response):
         """Process the streaming response from the agent"""
-        results = response.get("completion", [])
-        final_answer = ""
-        references = []
+        return collect_agent_response(iter_agent_response(response))
+    
+    def ask(self, sessions, user_key, interests, current_schedule, filters=None, question=None, cache=None):
+        """Stream a recommendation (or a free-form follow-up `question`) in the user's agent session.
+
+        The schedule and filters go out in full once per session, also as
+        session attributes the action group can read; later questions with
+        the same context only send what is new. With a SemanticCache,
+        recommendation turns (not follow-ups, which depend on the
+        conversation) are answered from a near-identical earlier request
+        with the same schedule and filters.
+        """
+        context = context_fingerprint(current_schedule, filters)
+        scope = f"agent:{context}"
+        if cache is not None and not question:
+            cached = cache.get(interests, scope)
+            if cached is not None:
+                yield from cached_agent_events(cached)
+                return
         
-        for stream in results:
-            try:
-                # Process trace information
-                trace = stream.get("trace", {}).get("trace", {}).get("orchestrationTrace", {})
-                
-                if trace:
-                    # Knowledge base lookup
-                    kb_input = trace.get("invocationInput", {}).get("knowledgeBaseLookupInput", {})
-                    if kb_input:
-                        print(f'Agent searching knowledge base: {kb_input.get("text", "")}')
-                    
-                    kb_output = trace.get("observation", {}).get("knowledgeBaseLookupOutput", {})
-                    if kb_output:
-                        retrieved_refs = kb_output.get("retrievedReferences", [])
-                        references.extend(retrieved_refs)
-                
-                # Process final answer
-                if "chunk" in stream:
-                    chunk_text = stream["chunk"]["bytes"].decode("utf-8")
-                    final_answer += chunk_text
-                    
-            except Exception as e:
-                print(f"Error processing stream: {e}")
+        session = sessions.session_for(user_key)
+        if session['context'] != context:
+            query = create_course_recommendation_query(interests, current_schedule, filters)
+            if question:
+                query += f"\n{question}"
+            session['context'] = context
+        elif question:
+            query = question
+        else:
+            query = create_follow_up_query(interests)
         
-        # Clean up final answer
-        final_answer = final_answer.strip()
+        started = time.perf_counter()
+        events = []
+        for event in self.stream_agent(query, schedule_session_attributes(current_schedule), session['session_id']):
+            if event['type'] == 'error':
+                # Don't assume the agent kept anything from a failed turn
+                sessions.end(user_key)
+            events.append(event)
+            yield event
         
-        return {
-            "answer": final_answer,
-            "references": references,
-            "success": True
-        }
+        response = collect_agent_response(events)
+        if cache is not None and not question and response.get('success') and response['answer']:
+            cache.set(interests, scope, response, time.perf_counter() - started)
+
+def cached_agent_events(response):
+    """Replay a collected agent response as stream events"""
+    if response.get('references'):
+        yield {"type": "references", "references": response['references']}
+    yield {"type": "chunk", "text": response['answer']}
+
+def iter_agent_response(response):
+    """Yield {"type": "chunk", "text"} and {"type": "references", "references"} events from an agent response stream"""
+    for stream in response.get("completion", []):
+        try:
+            # Process trace information
+            trace = stream.get("trace", {}).get("trace", {}).get("orchestrationTrace", {})
+            
+            if trace:
+                # Knowledge base lookup
+                kb_input = trace.get("invocationInput", {}).get("knowledgeBaseLookupInput", {})
+                if kb_input:
+                    print(f'Agent searching knowledge base: {kb_input.get("text", "")}')
+                
+                kb_output = trace.get("observation", {}).get("knowledgeBaseLookupOutput", {})
+                if kb_output and kb_output.get("retrievedReferences"):
+                    yield {"type": "references", "references": kb_output["retrievedReferences"]}
+            
+            # Answer text as soon as it arrives
+            if "chunk" in stream:
+                chunk_text = stream["chunk"]["bytes"].decode("utf-8")
+                if chunk_text:
+                    yield {"type": "chunk", "text": chunk_text}
+                
+        except Exception as e:
+            print(f"Error processing stream: {e}")
+
+def collect_agent_response(events):
+    """Gather agent events into {"answer", "references", "success"}, or {"error"}"""
+    answer = []
+    references = []
+    for event in events:
+        if event['type'] == 'error':
+            return {"error": event['error']}
+        if event['type'] == 'chunk':
+            answer.append(event['text'])
+        else:
+            references.extend(event['references'])
+    
+    return {
+        "answer": "".join(answer).strip(),
+        "references": references,
+        "success": True
+    }
+
+class AgentSessionManager:
+    """Agent session ids per app user, reused until they sit idle for `idle_seconds`"""
+    
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS, clock=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def session_for(self, user_key):
+        """The user's live session record, or a new one if they have none or it went idle"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            session = self._sessions.get(user_key)
+            if session is None:
+                session = {'session_id': uuid.uuid4().hex, 'context': None, 'started': now}
+                self._sessions[user_key] = session
+            session['last_used'] = now
+            return session
+    
+    def end(self, user_key):
+        with self._lock:
+            self._sessions.pop(user_key, None)
+    
+    def _expire(self, now):
+        idle = [key for key, session in self._sessions.items() if now - session['last_used'] > self.idle_seconds]
+        for key in idle:
+            del self._sessions[key]
+    
+    def __len__(self):
+        with self._lock:
+            self._expire(self.clock())
+            return len(self._sessions)
+
+def schedule_text(current_schedule):
+    """Schedule as "CODE DAYS HH:MM-HH:MM; ..." (parse_schedule reads it back)"""
+    return "; ".join(f"{c.get('code', '')} {c.get('days', '')} {c.get('start_time', '')}-{c.get('end_time', '')}"
+                     for c in current_schedule or [])
+
+def schedule_session_attributes(current_schedule):
+    """Session attributes the action group falls back to when a call has no schedule parameter"""
+    return {"schedule": schedule_text(current_schedule)}
+
+def context_fingerprint(current_schedule, filters=None):
+    """Hash of everything a full recommendation query tells the agent besides the interests"""
+    payload = json.dumps([schedule_text(current_schedule), filters or {}], sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def create_follow_up_query(interests):
+    """Short query for a session that already has the schedule and filters"""
+    return (f"Using my schedule and preferences from earlier, recommend courses for these interests: {interests}. "
+            "Please provide specific course recommendations with explanations.")
 
 def create_course_recommendation_query(interests, current_schedule, filters=None):
     """Create a structured query for the agent"""
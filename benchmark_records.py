@@ -0,0 +1,46 @@
+"""
+Memory and parse-time benchmark for Course records.
+
+`python benchmark_records.py [n]` loads n synthetic catalog rows (100,000 by
+default) as plain CSV dicts and as Course records, and reports the memory of
+each and the time to compute every slot mask from each.
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from course_record import Course, _synthetic_rows, to_records
+from time_slots import course_mask
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = json.dumps(_synthetic_rows(n))
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, current
+
+    rows, dict_bytes = measure(lambda: json.loads(source))
+    records, record_bytes = measure(lambda: [Course.from_csv_row(row) for row in json.loads(source)])
+    start = time.perf_counter()
+    to_records(rows)
+    build_seconds = time.perf_counter() - start
+    print(f"{n} courses: dicts {dict_bytes / 2**20:.1f} MiB ({dict_bytes / n:.0f} B/course), "
+          f"records {record_bytes / 2**20:.1f} MiB ({record_bytes / n:.0f} B/course), "
+          f"{record_bytes / dict_bytes:.0%} of the dict size; built in {build_seconds:.2f} s")
+
+    start = time.perf_counter()
+    for row in rows:
+        course_mask(row)
+    parsed = time.perf_counter()
+    for record in records:
+        course_mask(record)
+    done = time.perf_counter()
+    print(f"slot masks: {(parsed - start) * 1000:.0f} ms parsing dicts, {(done - parsed) * 1000:.1f} ms from records")
@@ -0,0 +1,111 @@
+"""
+Lazy candidate pipeline: source -> filters -> scorer -> top-k.
+
+A pipeline is a source of candidates (catalog course dicts or catalog rows)
+followed by a list of stages. Every stage takes an iterator and returns one,
+so candidates flow through one at a time and no stage builds an intermediate
+list. Filter stages drop candidates, the score stage turns each survivor
+into a (candidate, score, matched_words) triple, and top_k keeps the best k
+on a bounded heap, so memory stays O(k) whatever the catalog size. When the
+scorer knows an upper bound on scores, top_k stops pulling candidates as
+soon as its worst kept entry reaches it.
+
+Each entry point (the local app, the Bedrock matcher's candidate set and the
+agent's action group) is just a different list of stages.
+"""
+
+import heapq
+from interest_index import query_terms
+from time_slots import course_mask, schedule_mask
+
+def filter_stage(keep):
+    """Stage passing only the candidates for which `keep(candidate)` is true"""
+    def stage(candidates):
+        return (candidate for candidate in candidates if keep(candidate))
+    return stage
+
+def score_stage(score):
+    """Stage mapping candidates to (candidate, score, matched_words).
+
+    `score(candidate)` returns (score, matched_words), or None to drop the candidate.
+    """
+    def stage(candidates):
+        for candidate in candidates:
+            scored = score(candidate)
+            if scored is not None:
+                yield (candidate, scored[0], scored[1])
+    return stage
+
+def top_k(scored, k, max_score=None):
+    """Best `k` (candidate, score, matched_words) triples, best first, ties in arrival order.
+
+    Holds at most `k` entries. With `max_score`, stops consuming once every
+    kept entry already scores that high, since later arrivals can only tie.
+    """
+    if k <= 0:
+        return []
+    heap = []
+    for seq, (candidate, score, words) in enumerate(scored):
+        # Earlier arrivals win ties, so they rank above later ones with the same score
+        entry = (score, -seq, candidate, words)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+        if max_score is not None and len(heap) == k and heap[0][0] >= max_score:
+            break
+    return [(candidate, score, words) for score, _, candidate, words in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
+def run_pipeline(source, stages):
+    """Chain `stages` over the `source` iterable and return the final iterator"""
+    candidates = iter(source)
+    for stage in stages:
+        candidates = stage(candidates)
+    return candidates
+
+def select_top(source, stages, k, max_score=None):
+    """Run a filter/score pipeline and keep the top `k` of what comes out"""
+    return top_k(run_pipeline(source, stages), k, max_score)
+
+def conflict_filter(current_schedule, index=None):
+    """Stage dropping courses that overlap the current schedule.
+
+    With a MeetingIntervalIndex over the source courses, the clashing courses
+    are looked up once and the stage is a set lookup; otherwise each course's
+    slot mask is checked against the schedule's.
+    """
+    if index is not None:
+        blocked = {id(index.courses[i]) for i in index.conflicting_ids(current_schedule)}
+        if not blocked:
+            return lambda candidates: candidates
+        return filter_stage(lambda course: id(course) not in blocked)
+    busy = schedule_mask(current_schedule)
+    if not busy:
+        return lambda candidates: candidates
+    return filter_stage(lambda course: not course_mask(course) & busy)
+
+def attribute_filter(filters):
+    """Stage applying the user's difficulty, GE area and credit filters to course dicts"""
+    checks = []
+    if filters:
+        if filters.get('difficulty') and filters['difficulty'] != 'Any':
+            checks.append(lambda c: c.get('difficulty') == filters['difficulty'])
+        if filters.get('ge_area') and filters['ge_area'] != 'Any':
+            checks.append(lambda c: c.get('ge_area') == filters['ge_area'])
+        if filters.get('credits'):
+            min_credits, max_credits = filters['credits']
+            checks.append(lambda c: min_credits <= c.get('credits', 0) <= max_credits)
+    if not checks:
+        return lambda candidates: candidates
+    return filter_stage(lambda course: all(check(course) for check in checks))
+
+def interest_scorer(interests, index):
+    """(score stage, max score) for BM25 relevance over courses in an InterestIndex.
+
+    With no interests every course scores 0 and the bound is 0, so top_k takes
+    the first k that pass the filters and stops.
+    """
+    if not interests:
+        return score_stage(lambda course: (0.0, [])), 0.0
+    terms = query_terms(interests)
+    return score_stage(lambda course: index.course_score(course, terms)), index.max_score(terms)
@@ -0,0 +1,306 @@
+"""
+Compiled, memory-mapped course catalog.
+
+`python catalog.py compile ucla_courses.csv ucla_courses.catalog` validates the
+CSV once and writes a typed columnar binary file:
+
+    magic (8 bytes) | header length (uint64) | JSON header | 64-byte aligned columns
+
+Columns are plain little-endian arrays: int16 start/end minutes, a uint8
+weekday mask, the uint64 weekly slot masks from time_slots, dictionary-encoded
+GE area and difficulty, offsets into one shared UTF-8 string blob, and the
+BM25 postings of the interest index. CompiledCatalog maps the file and views
+every column in place with np.frombuffer, so opening it does no parsing and
+takes the same time for 60 rows or 60,000; processes that open the same file
+share its pages through the OS page cache.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+import numpy as np
+import pandas as pd
+from course_record import Course
+from interest_index import InterestIndex
+from time_slots import MASK_BYTES, is_unscheduled, mask_bytes, meeting_mask, parse_days, parse_minutes
+
+MAGIC = b'CMCAT001'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+REQUIRED_COLUMNS = ['course_code', 'course_title', 'description', 'days', 'start_time', 'end_time']
+STRING_FIELDS = ['course_code', 'course_title', 'description', 'days']
+DICTIONARY_FIELDS = ['GE', 'difficulty']
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def file_fingerprint(path):
+    """Size, mtime and SHA-256 of a source file"""
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+def validate_rows(records, strict=True):
+    """Return parsed (start, end, days) per row.
+
+    In strict mode any bad row raises ValueError listing every problem; otherwise
+    bad rows come back as (-1, -1, []) and simply never conflict with anything.
+    """
+    parsed = []
+    errors = []
+    for i, row in enumerate(records):
+        line = i + 2  # header is line 1
+        start = parse_minutes(row.get('start_time'))
+        end = parse_minutes(row.get('end_time'))
+        days = parse_days(row.get('days'))
+        row_errors = []
+        if not str(row.get('course_code', '')).strip():
+            row_errors.append(f"line {line}: missing course_code")
+        if is_unscheduled(row.get('days')):
+            # TBA / online sections are valid rows that simply never meet
+            errors.extend(row_errors)
+            parsed.append((-1, -1, []))
+            continue
+        if start is None or end is None:
+            row_errors.append(f"line {line}: unreadable time {row.get('start_time')!r}-{row.get('end_time')!r}")
+        elif end <= start:
+            row_errors.append(f"line {line}: end_time {row.get('end_time')} is not after start_time {row.get('start_time')}")
+        if not days:
+            row_errors.append(f"line {line}: unreadable days {row.get('days')!r}")
+
+        if start is None or end is None or end <= start or not days:
+            start, end, days = -1, -1, []
+        errors.extend(row_errors)
+        parsed.append((start, end, days))
+
+    if errors and strict:
+        shown = "\n".join(errors[:20])
+        more = f"\n... and {len(errors) - 20} more" if len(errors) > 20 else ""
+        raise ValueError(f"Invalid catalog rows:\n{shown}{more}")
+    return parsed
+
+def build_columns(records, strict=True):
+    """Encode catalog rows into the compiled column arrays and dictionaries"""
+    n = len(records)
+    parsed = validate_rows(records, strict)
+    columns = {
+        'start_minute': np.array([p[0] for p in parsed], dtype='<i2'),
+        'end_minute': np.array([p[1] for p in parsed], dtype='<i2'),
+        'day_mask': np.array([sum(1 << d for d in p[2]) for p in parsed], dtype='u1'),
+        'slot_mask': np.frombuffer(
+            b''.join(mask_bytes(meeting_mask(row.get('days'), p[0], p[1]) if p[2] else 0)
+                     for row, p in zip(records, parsed)),
+            dtype='<u8'
+        ).reshape(n, MASK_BYTES // 8)
+    }
+
+    dictionaries = {}
+    for field in DICTIONARY_FIELDS:
+        codes, values = pd.factorize(pd.Series([row.get(field, '') for row in records], dtype=object))
+        columns[f'{field}_code'] = codes.astype('<i2')
+        dictionaries[field] = [str(v) for v in values]
+
+    blob = bytearray()
+    for field in STRING_FIELDS:
+        offsets = [len(blob)]
+        for row in records:
+            blob += str(row.get(field, '')).encode('utf-8')
+            offsets.append(len(blob))
+        columns[f'{field}_offsets'] = np.array(offsets, dtype='<i8')
+    columns['string_blob'] = np.frombuffer(bytes(blob), dtype='u1')
+
+    # Interest index postings in CSR form, terms sorted so lookups can bisect the mapped array
+    index = InterestIndex(records)
+    terms = sorted(index.postings)
+    starts = [0]
+    docs = []
+    weights = []
+    for term in terms:
+        for doc, weight in index.postings[term]:
+            docs.append(doc)
+            weights.append(weight)
+        starts.append(len(docs))
+    columns['term_text'] = np.array([t.encode('utf-8') for t in terms] or [b''], dtype='S')[:len(terms)]
+    columns['term_starts'] = np.array(starts, dtype='<i8')
+    columns['term_idf'] = np.array([index.idf[t] for t in terms], dtype='<f4')
+    columns['posting_docs'] = np.array(docs, dtype='<i4')
+    columns['posting_weights'] = np.array(weights, dtype='<f4')
+
+    return columns, dictionaries
+
+def compile_catalog(csv_file_path="ucla_courses.csv", catalog_path="ucla_courses.catalog"):
+    """Validate the catalog CSV and write the compiled binary catalog"""
+    df = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{csv_file_path} is missing columns: {', '.join(missing)}")
+
+    records = df.to_dict('records')
+    columns, dictionaries = build_columns(records)
+
+    layout = {}
+    offset = 0
+    for name, array in columns.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'count': len(records),
+        'source': dict(file_fingerprint(csv_file_path), path=os.path.basename(csv_file_path)),
+        'dictionaries': dictionaries,
+        'string_fields': STRING_FIELDS,
+        'columns': layout
+    }).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    # Write beside the target and rename, so readers never see a half-written file
+    tmp_path = f"{catalog_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in columns.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, catalog_path)
+    return catalog_path
+
+class CompiledCatalog:
+    def __init__(self, catalog_path="ucla_courses.catalog"):
+        self.path = catalog_path
+        with open(catalog_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = struct.unpack_from('<8sQ', self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{catalog_path} is not a compiled course catalog")
+        self.header = json.loads(self._mmap[16:16 + header_length])
+        if self.header['format'] != FORMAT_VERSION:
+            raise ValueError(f"{catalog_path} has catalog format {self.header['format']}, expected {FORMAT_VERSION}")
+
+        data_start = _aligned(16 + header_length)
+        self.columns = {}
+        for name, spec in self.header['columns'].items():
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            self.columns[name] = np.frombuffer(
+                self._mmap, dtype=spec['dtype'], count=count, offset=data_start + spec['offset']
+            ).reshape(spec['shape'])
+        self.dictionaries = self.header['dictionaries']
+        self._records = [None] * self.header['count']
+
+    def __len__(self):
+        return self.header['count']
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def string(self, field, row):
+        """Decode one string field of one row from the shared blob"""
+        offsets = self.columns[f'{field}_offsets']
+        return self.columns['string_blob'][offsets[row]:offsets[row + 1]].tobytes().decode('utf-8')
+
+    def decoded(self, field, row):
+        """Value of a dictionary-encoded field for one row"""
+        code = self.columns[f'{field}_code'][row]
+        return self.dictionaries[field][code] if code >= 0 else ''
+
+    def course(self, row):
+        """One catalog row as a Course record, made from the typed columns on first use"""
+        record = self._records[row]
+        if record is None:
+            start = int(self.columns['start_minute'][row])
+            end = int(self.columns['end_minute'][row])
+            record = self._records[row] = Course(
+                self.string('course_code', row),
+                self.string('course_title', row),
+                self.string('description', row),
+                int(self.columns['day_mask'][row]),
+                start if start >= 0 else None,
+                end if end >= 0 else None,
+                self.decoded('GE', row) or None,
+                self.decoded('difficulty', row) or None
+            )
+        return record
+
+    def courses(self):
+        """Iterate every row as a Course record"""
+        for row in range(len(self)):
+            yield self.course(row)
+
+    def records(self):
+        """Every row as a lazy sequence of Course records, each made on first access"""
+        return CatalogRecords(self)
+
+    def strings(self, field):
+        """Every row's value of one string field, decoded in a single pass over its part of the blob"""
+        offsets = self.columns[f'{field}_offsets'].tolist()
+        base = offsets[0]
+        data = self.columns['string_blob'][base:offsets[-1]].tobytes()
+        return [data[start - base:end - base].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    def is_stale(self, csv_file_path="ucla_courses.csv"):
+        """True if the source CSV has changed since this catalog was compiled"""
+        source = self.header['source']
+        stat = os.stat(csv_file_path)
+        if stat.st_size == source['size'] and stat.st_mtime_ns == source['mtime_ns']:
+            return False
+        return file_fingerprint(csv_file_path)['sha256'] != source['sha256']
+
+class CatalogRecords(Sequence):
+    """Read-only sequence view of a CompiledCatalog's rows as Course records"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.catalog.course(r) for r in range(len(self))[row]]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self.catalog.course(row)
+
+def open_catalog(csv_file_path="ucla_courses.csv", catalog_path="ucla_courses.catalog"):
+    """Open the compiled catalog, compiling it first if it is missing, unreadable or older than the CSV"""
+    if os.path.exists(catalog_path):
+        try:
+            catalog = CompiledCatalog(catalog_path)
+        except (ValueError, KeyError, struct.error) as e:
+            # Older format, truncated or corrupt: the CSV is the source of truth, so rebuild
+            print(f"Recompiling {catalog_path}: {e}")
+        else:
+            if not catalog.is_stale(csv_file_path):
+                return catalog
+    compile_catalog(csv_file_path, catalog_path)
+    return CompiledCatalog(catalog_path)
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "compile"
+    if command == "compile":
+        csv_file = sys.argv[2] if len(sys.argv) > 2 else "ucla_courses.csv"
+        output = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(csv_file)[0] + ".catalog"
+        start = time.perf_counter()
+        compile_catalog(csv_file, output)
+        print(f"Compiled {csv_file} -> {output} ({os.path.getsize(output)} bytes) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    elif command == "info":
+        path = sys.argv[2] if len(sys.argv) > 2 else "ucla_courses.catalog"
+        start = time.perf_counter()
+        catalog = CompiledCatalog(path)
+        print(f"Opened {path} in {(time.perf_counter() - start) * 1000:.2f} ms: {len(catalog)} courses")
+        for name, column in catalog.columns.items():
+            print(f"   {name:18s} {column.dtype.str:6s} {list(column.shape)}")
+    else:
+        print("Usage: python catalog.py compile [courses.csv] [output.catalog]")
+        print("       python catalog.py info [courses.catalog]")
@@ -0,0 +1,165 @@
+"""
+Process-wide, versioned catalog snapshots with background hot reload.
+
+A CatalogSnapshot bundles one compiled catalog with everything derived from
+it (conflict matrix, CourseArrays, interval, code and completion indexes).
+Opening one only maps the catalog and conflict-matrix files, so every
+process shares their pages; each index is built on first use from the mapped
+columns, and Course records are still only made for rows a request reads.
+SnapshotManager holds the current snapshot; a daemon thread polls the source
+CSV and, when its size or mtime changes and its SHA-256 differs from the
+snapshot's, compiles and opens a new snapshot off to the side and swaps it in
+with a single reference assignment. Nothing ever waits for a reload.
+
+Readers call current() once per request (a Streamlit rerun) and use that
+snapshot throughout, so a request that started before a swap finishes on the
+old version, whose mapped files stay valid because the catalog and matrix are
+replaced by rename. Held in st.cache_resource, one manager and one snapshot
+serve every session in the process; an old version is freed once the last
+request using it lets go. A CSV that fails validation (for example while it
+is still being written) leaves the current snapshot in place and is retried
+when the file changes again.
+"""
+
+import os
+import threading
+import time
+from catalog import open_catalog
+from conflict_matrix import open_conflict_matrix
+from course_arrays import CourseArrays
+from course_autocomplete import CompletionIndex
+from course_codes import CourseCodeIndex
+from interval_index import MeetingIntervalIndex
+
+DEFAULT_POLL_SECONDS = 2.0
+
+class CatalogSnapshot:
+    def __init__(self, version, csv_file_path, catalog_path):
+        """Compile (if needed) and open the catalog, then build every derived index"""
+        self.version = version
+        self.catalog = open_catalog(csv_file_path, catalog_path)
+        self.source = self.catalog.header['source']
+        self.conflict_matrix = open_conflict_matrix(self.catalog)
+        self.course_arrays = CourseArrays.from_catalog(self.catalog, self.conflict_matrix)
+        self.loaded_at = time.time()
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def _index(self, name, build):
+        """The named index, built once by whichever request needs it first"""
+        index = self._indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = build()
+        return index
+
+    @property
+    def interval_index(self):
+        columns = self.catalog.columns
+        return self._index('interval', lambda: MeetingIntervalIndex.from_columns(
+            self.catalog.records(), columns['day_mask'].tolist(),
+            columns['start_minute'].tolist(), columns['end_minute'].tolist()
+        ))
+
+    @property
+    def code_index(self):
+        return self._index('code', lambda: CourseCodeIndex(
+            self.catalog.records(), fingerprint=self.source['sha256'],
+            codes=self.catalog.strings('course_code')
+        ))
+
+    @property
+    def completion_index(self):
+        return self._index('completion', lambda: CompletionIndex(
+            self.catalog.records(), codes=self.catalog.strings('course_code'),
+            titles=self.catalog.strings('course_title')
+        ))
+
+    def find_row(self, course):
+        """Row of the section in this version with the same code and meeting as `course`, or None.
+
+        Lets per-session picks made against an older version follow the swap.
+        """
+        for row in self.code_index.positions(course['code']):
+            if self.catalog.course(row).slot_mask == course.slot_mask:
+                return row
+        return None
+
+class SnapshotManager:
+    def __init__(self, csv_file_path="ucla_courses.csv", catalog_path="ucla_courses.catalog",
+                 poll_seconds=DEFAULT_POLL_SECONDS):
+        self.csv_file_path = csv_file_path
+        self.catalog_path = catalog_path
+        self.poll_seconds = poll_seconds
+        self.stats = {"reloads": 0, "failures": 0, "last_error": None}
+        self._seen = self._stat()
+        self._snapshot = CatalogSnapshot(1, csv_file_path, catalog_path)
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """The latest complete snapshot; hold on to it for the rest of the request"""
+        return self._snapshot
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.csv_file_path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def check(self):
+        """Reload if the CSV changed; returns True if a new snapshot was swapped in"""
+        with self._reload_lock:
+            seen = self._stat()
+            if seen is None or seen == self._seen:
+                return False
+            self._seen = seen
+            snapshot = self._snapshot
+            try:
+                if not snapshot.catalog.is_stale(self.csv_file_path):
+                    return False
+                started = time.perf_counter()
+                fresh = CatalogSnapshot(snapshot.version + 1, self.csv_file_path, self.catalog_path)
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                print(f"Catalog reload failed, keeping version {snapshot.version}: {e}")
+                return False
+            self._snapshot = fresh
+            self.stats["reloads"] += 1
+            self.stats["last_error"] = None
+            print(f"Catalog reloaded: version {fresh.version}, {len(fresh)} courses "
+                  f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Catalog watcher error: {e}")
+
+    def start(self):
+        """Start the background watcher thread (once)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def start_snapshot_manager(csv_file_path="ucla_courses.csv", catalog_path="ucla_courses.catalog",
+                           poll_seconds=DEFAULT_POLL_SECONDS):
+    """Load the first snapshot and start watching the CSV for changes"""
+    return SnapshotManager(csv_file_path, catalog_path, poll_seconds).start()
@@ -0,0 +1,110 @@
+"""
+Map-reduce LLM ranking for candidate sets too large for one prompt.
+
+Candidates (already pre-ranked locally, best first) are dealt round-robin into
+chunks so every chunk gets a similar mix of strong and weak matches; every
+candidate lands in some chunk. Chunks are ranked concurrently on a bounded
+thread pool, each chunk's scores are z-normalized so they are comparable
+across prompts, and the union is merged into a global top-k. An optional
+final pass re-ranks just the finalists in a single prompt. Wall-clock time is
+roughly one LLM call per wave of `max_workers` chunks, so a larger candidate
+set takes more waves rather than losing its tail.
+"""
+
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TOP_K = 10
+DEFAULT_MAX_WORKERS = 16
+
+def stratified_chunks(candidates, chunk_size):
+    """Deal best-first candidates round-robin into chunks of at most `chunk_size`"""
+    chunk_size = max(1, chunk_size)
+    count = -(-len(candidates) // chunk_size)
+    return [candidates[i::count] for i in range(count)]
+
+def normalize_chunk_scores(recommendations):
+    """Attach a z-score of relevance_score within one chunk's ranking"""
+    scores = []
+    for position, rec in enumerate(recommendations):
+        try:
+            scores.append(float(rec.get('relevance_score')))
+        except (TypeError, ValueError):
+            # Models sometimes omit scores; fall back to rank position
+            scores.append(1.0 - position / max(len(recommendations), 1))
+    mean = statistics.fmean(scores) if scores else 0.0
+    spread = statistics.pstdev(scores) if len(scores) > 1 else 0.0
+    return [
+        dict(rec, normalized_score=round((score - mean) / spread, 4) if spread else 0.0)
+        for rec, score in zip(recommendations, scores)
+    ]
+
+def match_chunk_positions(recommendations, positions, code_at):
+    """Pair each recommendation with the candidate position it ranks.
+
+    Recommendations name a course code, so sections of one course in the same
+    chunk are taken in chunk order as the model lists them. Recommendations
+    for codes not in the chunk are dropped.
+    """
+    free = {}
+    for position in positions:
+        free.setdefault(code_at(position), []).append(position)
+    matched = []
+    for rec in recommendations:
+        sections = free.get(rec['course_code'])
+        if sections:
+            matched.append((sections.pop(0), rec))
+    return matched
+
+def rank_in_chunks(candidates, rank_chunk, chunk_size, top_k=DEFAULT_TOP_K,
+                   max_workers=DEFAULT_MAX_WORKERS, rerank=True,
+                   code_of=lambda course: course['code'], row_of=None):
+    """Rank `candidates` chunk by chunk and merge into a global top-k.
+
+    `rank_chunk(courses)` must return {"recommendations": [{"course_code", "relevance_score", ...}]}
+    or None on failure; failed chunks are skipped. Results are merged per
+    candidate, so different sections of one course stay separate; with
+    `row_of(course)` each recommendation also gets the section's catalog "row".
+    Every candidate is ranked; more chunks than `max_workers` just run in more
+    waves. Returns {"recommendations"}, or None if every chunk failed.
+    """
+    chunk_positions = stratified_chunks(list(range(len(candidates))), chunk_size)
+    chunks = [[candidates[p] for p in positions] for positions in chunk_positions]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)) or 1) as pool:
+        results = list(pool.map(rank_chunk, chunks))
+
+    def code_at(position):
+        return code_of(candidates[position])
+
+    merged = {}
+    for positions, result in zip(chunk_positions, results):
+        if not result:
+            continue
+        ranked = normalize_chunk_scores(result.get('recommendations', []))
+        for position, rec in match_chunk_positions(ranked, positions, code_at):
+            best = merged.get(position)
+            if best is None or rec['normalized_score'] > best['normalized_score']:
+                merged[position] = rec
+    if not merged and not any(results):
+        return None
+
+    finalists = sorted(merged, key=lambda position: -merged[position]['normalized_score'])[:top_k]
+    waves = -(-len(chunks) // max(1, max_workers))
+    print(f"Chunked ranking: {len(candidates)} candidates, {len(chunks)} chunks in {waves} waves, "
+          f"{sum(1 for r in results if r)} succeeded, {len(finalists)} finalists")
+
+    if rerank and len(finalists) > 1:
+        reranked = rank_chunk([candidates[p] for p in finalists])
+        if reranked:
+            matched = match_chunk_positions(reranked.get('recommendations', []), finalists, code_at)
+            merged.update(matched)
+            order = [p for p, _ in matched]
+            finalists = order + [p for p in finalists if p not in order]
+
+    recommendations = []
+    for position in finalists:
+        rec = merged[position]
+        if row_of is not None:
+            rec = dict(rec, row=row_of(candidates[position]))
+        recommendations.append(rec)
+    return {"recommendations": recommendations}
@@ -0,0 +1,208 @@
+"""
+Precomputed catalog x catalog conflict matrix.
+
+`python conflict_matrix.py build ucla_courses.catalog` materializes the full
+pairwise time-conflict relation of a compiled catalog as a packed bit matrix:
+row i is an n-bit bitset (np.packbits, bitorder='little', so bit j of row i
+is byte j // 8, bit j % 8) that is set when courses i and j meet at the same
+time. The file sits next to the catalog:
+
+    magic (8 bytes) | header length (uint64) | JSON header | 64-byte aligned rows
+
+and takes n * ceil(n / 8) bytes. The header records the catalog's source
+fingerprint, so open_conflict_matrix rebuilds it whenever the catalog is
+recompiled from a changed CSV. Conflicts use the same 5-minute slot rounding
+as time_slots, so the matrix agrees exactly with the slot-mask checks.
+"""
+
+import json
+import mmap
+import os
+import struct
+import numpy as np
+from time_slots import SLOT_MINUTES
+
+MAGIC = b'CMCFL001'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+BLOCK_ROWS = 1024
+_POPCOUNT = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def conflict_matrix_path(catalog_path):
+    return os.path.splitext(catalog_path)[0] + '.conflicts'
+
+def _slot_bounds(columns):
+    """First slot, one-past-last slot and weekday mask per course, as in meeting_mask"""
+    start = columns['start_minute'].astype(np.int32)
+    end = columns['end_minute'].astype(np.int32)
+    days = np.asarray(columns['day_mask'], dtype=np.uint8).copy()
+    # Unparseable rows never conflict with anything
+    days[(start < 0) | (end <= start)] = 0
+    return start // SLOT_MINUTES, -(-end // SLOT_MINUTES), days
+
+def fill_conflict_rows(columns, out, block_rows=BLOCK_ROWS):
+    """Write packed conflict rows into `out` (an (n, ceil(n/8)) uint8 array), a block of rows at a time"""
+    first, last, days = _slot_bounds(columns)
+    n = len(first)
+    for lo in range(0, n, block_rows):
+        hi = min(lo + block_rows, n)
+        hit = (days[lo:hi, None] & days[None, :]) != 0
+        hit &= first[lo:hi, None] < last[None, :]
+        hit &= first[None, :] < last[lo:hi, None]
+        hit[np.arange(hi - lo), np.arange(lo, hi)] = False
+        out[lo:hi] = np.packbits(hit, axis=1, bitorder='little')
+    return out
+
+def build_conflict_matrix(columns, block_rows=BLOCK_ROWS):
+    """In-memory packed conflict matrix for catalog columns"""
+    n = len(columns['start_minute'])
+    return fill_conflict_rows(columns, np.zeros((n, -(-n // 8)), dtype=np.uint8), block_rows)
+
+def write_conflict_matrix(catalog, path=None, block_rows=BLOCK_ROWS):
+    """Build the matrix for a CompiledCatalog straight into its file, then rename into place"""
+    path = path or conflict_matrix_path(catalog.path)
+    n = len(catalog)
+    row_bytes = -(-n // 8)
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'count': n,
+        'row_bytes': row_bytes,
+        'bitorder': 'little',
+        'source': catalog.header['source']
+    }).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        f.truncate(data_start + n * row_bytes)
+    if n:
+        rows = np.memmap(tmp_path, dtype=np.uint8, mode='r+', offset=data_start, shape=(n, row_bytes))
+        fill_conflict_rows(catalog.columns, rows, block_rows)
+        rows.flush()
+        del rows
+    os.replace(tmp_path, path)
+    return path
+
+class ConflictMatrix:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = struct.unpack_from('<8sQ', self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a course conflict matrix")
+        self.header = json.loads(self._mmap[16:16 + header_length])
+        if self.header['format'] != FORMAT_VERSION:
+            raise ValueError(f"{path} has conflict matrix format {self.header['format']}, expected {FORMAT_VERSION}")
+
+        self.size = self.header['count']
+        self.packed = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=self.size * self.header['row_bytes'],
+            offset=_aligned(16 + header_length)
+        ).reshape(self.size, self.header['row_bytes'])
+
+    def __len__(self):
+        return self.size
+
+    def matches(self, catalog):
+        """True if this matrix was built from the same catalog source"""
+        return self.size == len(catalog) and self.header['source'] == catalog.header['source']
+
+    def conflicts(self, i, j):
+        """Do catalog rows i and j meet at the same time?"""
+        return bool(self.packed[i, j >> 3] >> (j & 7) & 1)
+
+    def row(self, i):
+        """Boolean array of the rows that conflict with row i"""
+        return np.unpackbits(self.packed[i], count=self.size, bitorder='little').astype(bool)
+
+    def conflicting_rows(self, i):
+        return np.flatnonzero(self.row(i))
+
+    def compatible_with(self, rows):
+        """Boolean array of the courses that fit alongside every one of `rows` (excluding the rows themselves)"""
+        rows = list(rows)
+        if not rows:
+            return np.ones(self.size, dtype=bool)
+        busy = np.bitwise_or.reduce(self.packed[rows], axis=0)
+        fits = ~np.unpackbits(busy, count=self.size, bitorder='little').astype(bool)
+        fits[rows] = False
+        return fits
+
+    def sub_bitsets(self, rows):
+        """Conflict bitsets restricted to `rows`: bit p of entry q is set if rows[q] and rows[p] conflict.
+
+        The result plugs straight into schedule_generator / schedule_optimizer.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return []
+        sub = np.unpackbits(self.packed[rows], axis=1, count=self.size, bitorder='little')[:, rows]
+        packed = np.packbits(sub, axis=1, bitorder='little')
+        return [int.from_bytes(packed[q].tobytes(), 'little') for q in range(len(rows))]
+
+def open_conflict_matrix(catalog, path=None):
+    """Open the catalog's conflict matrix, rebuilding it if missing, unreadable or built from an older catalog"""
+    path = path or conflict_matrix_path(catalog.path)
+    if os.path.exists(path):
+        try:
+            matrix = ConflictMatrix(path)
+        except (ValueError, KeyError, struct.error) as e:
+            print(f"Rebuilding {path}: {e}")
+        else:
+            if matrix.matches(catalog):
+                return matrix
+    write_conflict_matrix(catalog, path)
+    return ConflictMatrix(path)
+
+def _synthetic_columns(n, seed=0):
+    """Random single-meeting sections shaped like a real term's timetable"""
+    rng = np.random.default_rng(seed)
+    patterns = np.array([0b10101, 0b01010, 0b00101, 0b10000, 0b00001, 0b01000], dtype=np.uint8)
+    lengths = np.array([50, 75, 110, 170], dtype=np.int16)
+    start = (rng.integers(8 * 6, 20 * 6, n) * 10).astype(np.int16)
+    return {
+        'start_minute': start,
+        'end_minute': start + rng.choice(lengths, n),
+        'day_mask': rng.choice(patterns, n)
+    }
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        from catalog import open_catalog
+        catalog_file = sys.argv[2] if len(sys.argv) > 2 else "ucla_courses.catalog"
+        start = time.perf_counter()
+        catalog = open_catalog(os.path.splitext(catalog_file)[0] + ".csv", catalog_file)
+        path = write_conflict_matrix(catalog)
+        print(f"Built {path} for {len(catalog)} courses ({os.path.getsize(path)} bytes) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    elif command == "bench":
+        sizes = [int(s) for s in sys.argv[2:]] or [10000, 50000]
+        for n in sizes:
+            columns = _synthetic_columns(n)
+            start = time.perf_counter()
+            matrix = build_conflict_matrix(columns)
+            built = time.perf_counter() - start
+
+            rng = np.random.default_rng(1)
+            pairs = rng.integers(0, n, (10000, 2))
+            start = time.perf_counter()
+            for i, j in pairs:
+                matrix[i, j >> 3] >> (j & 7) & 1
+            lookup = (time.perf_counter() - start) / len(pairs)
+
+            print(f"{n:>7} courses: built in {built:.2f} s, {matrix.nbytes / 2**20:.1f} MiB "
+                  f"(n^2/8 = {n * n / 8 / 2**20:.1f} MiB), {lookup * 1e6:.2f} us per pair lookup, "
+                  f"{int(_POPCOUNT[matrix].sum(dtype=np.int64)) // 2} conflicting pairs")
+    else:
+        print("Usage: python conflict_matrix.py build [courses.catalog]")
+        print("       python conflict_matrix.py bench [n ...]")
@@ -0,0 +1,147 @@
+"""
+Columnar (NumPy) view of the course catalog for per-click recommendation.
+
+Everything the recommender needs is precomputed once at load time: the BM25
+interest index postings, weekly slot masks as uint64 words, and the
+dictionary-encoded filter columns. A request is then a handful of
+whole-array operations (conflict mask, filters, scores scattered from the
+postings) followed by an argpartition top-k, instead of an iterrows pass
+that rebuilds a Series per row.
+
+The arrays use the same layout as the compiled catalog (catalog.py), so they
+can either be built from a DataFrame or viewed straight out of the mapped
+catalog file with no parsing at all.
+"""
+
+import numpy as np
+from catalog import build_columns
+from interest_index import query_terms
+from time_slots import mask_bytes, schedule_mask
+
+def mask_words(mask):
+    """View a weekly slot mask as an array of uint64 words"""
+    return np.frombuffer(mask_bytes(mask), dtype='<u8')
+
+class CourseArrays:
+    def __init__(self, columns, dictionaries, course_lookup, conflict_matrix=None):
+        self.size = len(columns['slot_mask'])
+        self.slot_words = columns['slot_mask']
+        self.ge_codes = columns['GE_code']
+        self.ge_lookup = {value: code for code, value in enumerate(dictionaries['GE'])}
+        self.difficulty_codes = columns['difficulty_code']
+        self.difficulty_lookup = {value: code for code, value in enumerate(dictionaries['difficulty'])}
+
+        # Postings in CSR form with sorted terms, so a term lookup is a bisect
+        self.term_text = columns['term_text']
+        self.term_starts = columns['term_starts']
+        self.term_idf = columns['term_idf']
+        self.posting_docs = columns['posting_docs']
+        self.posting_weights = columns['posting_weights']
+
+        self.course = course_lookup
+        self.conflict_matrix = conflict_matrix
+
+    @classmethod
+    def from_dataframe(cls, courses_df):
+        """Build the arrays from a catalog DataFrame; rows come back as Series"""
+        columns, dictionaries = build_columns(courses_df.to_dict('records'), strict=False)
+        return cls(columns, dictionaries, lambda row: courses_df.iloc[row])
+
+    @classmethod
+    def from_catalog(cls, catalog, conflict_matrix=None):
+        """View the arrays directly in a CompiledCatalog; rows come back as Course records"""
+        return cls(catalog.columns, catalog.dictionaries, catalog.course, conflict_matrix)
+
+    def conflict_mask(self, current_schedule):
+        """Boolean array: True where the course overlaps the schedule"""
+        busy = mask_words(schedule_mask(current_schedule))
+        words = np.flatnonzero(busy)
+        if len(words) == 0:
+            return np.zeros(self.size, dtype=bool)
+        return (self.slot_words[:, words] & busy[words]).any(axis=1)
+
+    def fits_with(self, rows):
+        """Boolean array: True where the course fits alongside every catalog row in `rows`"""
+        rows = list(rows)
+        if self.conflict_matrix is not None:
+            return self.conflict_matrix.compatible_with(rows)
+        fits = np.ones(self.size, dtype=bool)
+        if rows:
+            busy = np.bitwise_or.reduce(self.slot_words[rows], axis=0)
+            fits = ~(self.slot_words & busy).any(axis=1)
+            fits[rows] = False
+        return fits
+
+    def pool_conflicts(self, rows):
+        """Precomputed conflict bitsets among `rows` for the schedule generator, or None"""
+        if self.conflict_matrix is None:
+            return None
+        return self.conflict_matrix.sub_bitsets(rows)
+
+    def filter_mask(self, filters):
+        """Boolean array: True where the course passes the difficulty/GE filters"""
+        keep = np.ones(self.size, dtype=bool)
+        if not filters:
+            return keep
+
+        if filters.get('difficulty') and filters['difficulty'] != 'Any':
+            keep &= self.difficulty_codes == self.difficulty_lookup.get(str(filters['difficulty']), -2)
+
+        if filters.get('ge_area') and filters['ge_area'] != 'Any':
+            keep &= self.ge_codes == self.ge_lookup.get(filters['ge_area'], -2)
+
+        return keep
+
+    def term_postings(self, term):
+        """(doc ids, BM25 weights, idf) for a term, or None if it isn't in the catalog"""
+        key = term.encode('utf-8')
+        i = int(np.searchsorted(self.term_text, key))
+        if i >= len(self.term_text) or self.term_text[i] != key:
+            return None
+        start, end = self.term_starts[i], self.term_starts[i + 1]
+        return self.posting_docs[start:end], self.posting_weights[start:end], float(self.term_idf[i])
+
+    def interest_scores(self, interests):
+        """BM25 score per course, plus (word, doc_ids) for each query term that hit"""
+        scores = np.zeros(self.size, dtype=np.float64)
+        hits = []
+        for term, word in query_terms(interests):
+            postings = self.term_postings(term)
+            if postings is None:
+                continue
+            docs, weights, idf = postings
+            scores[docs] += idf * weights
+            hits.append((word, docs))
+        return scores, hits
+
+    def top_matches(self, interests, current_schedule, filters, k=5, taken_rows=(), row_mask=None):
+        """Return [(row, score, matched_words)] for the k best-scoring compatible courses.
+
+        `taken_rows` are catalog rows the student is already enrolled in;
+        `row_mask` optionally limits the search to a boolean array of rows.
+        """
+        scores, hits = self.interest_scores(interests)
+        if not hits:
+            return []
+
+        candidates = (scores > 0) & self.filter_mask(filters) & ~self.conflict_mask(current_schedule)
+        if len(taken_rows):
+            candidates &= self.fits_with(taken_rows)
+        if row_mask is not None:
+            candidates &= row_mask
+        rows = np.flatnonzero(candidates)
+        values = scores[rows]
+
+        if len(rows) > k:
+            # Keep everything tied with the k-th best so ties resolve in catalog order
+            threshold = -np.partition(-values, k - 1)[k - 1]
+            top = values >= threshold
+            rows, values = rows[top], values[top]
+        order = np.lexsort((rows, -values))[:k]
+
+        results = []
+        for i in order:
+            row = rows[i]
+            words = [word for word, docs in hits if docs[np.searchsorted(docs, row) % len(docs)] == row]
+            results.append((int(row), round(float(values[i]), 2), words))
+        return results
@@ -0,0 +1,137 @@
+"""
+Prefix autocomplete over course codes and title words.
+
+Built once from the same course list the recommender loads (the records of
+course_data's catalog or of the compiled catalog), so a completion's position
+is that course's catalog position. Two sorted arrays are searched with bisect:
+- code keys: every section's code squashed to letters and digits, with the
+  department alias resolved ("COM SCI 188" -> "COMSCI188"), so "cs 18",
+  "comsci18" and "com sci 1" all land in the same range;
+- title vocabulary: the distinct title words, each with the positions of the
+  sections whose title contains it, in catalog order.
+
+Code matches come first, in code order. Then title matches: the longest
+typed word drives the search and every other word must prefix a word of the
+same title. An exact word sorts first in its bisect range, so it ranks ahead
+of longer completions without any sorting. Work per query is bounded by
+`limit` and `max_scan`, not by the catalog size.
+`python course_autocomplete.py` times queries on a 50,000-section catalog.
+"""
+
+import sys
+from bisect import bisect_left
+from collections.abc import Sequence
+from course_codes import code_of, prefix_keys
+from interest_index import course_fields, tokenize
+from prompt_builder import meeting_summary
+
+DEFAULT_LIMIT = 8
+# Candidates checked against the other typed words before giving up on a title search
+DEFAULT_MAX_SCAN = 2000
+
+class CompletionIndex:
+    def __init__(self, courses, codes=None, titles=None):
+        """Index `courses`; `codes` and `titles` optionally give every course's code and title up front
+        (e.g. a compiled catalog's string columns), so only completed courses are ever read"""
+        self.courses = courses if isinstance(courses, Sequence) else list(courses)
+        if codes is None:
+            codes = map(code_of, self.courses)
+        if titles is None:
+            titles = (course_fields(course)['title'] for course in self.courses)
+
+        codes = sorted((prefix_keys(code)[-1], position) for position, code in enumerate(codes))
+        self.code_keys = [key for key, _ in codes]
+        self.code_positions = [position for _, position in codes]
+
+        # Title words also kept per section as " word word", so "does a word start with x" is a substring test
+        postings = {}
+        self.title_text = []
+        for position, title in enumerate(titles):
+            words = list(dict.fromkeys(tokenize(title)))
+            self.title_text.append(sys.intern(''.join(' ' + word for word in words)))
+            for word in words:
+                postings.setdefault(word, []).append(position)
+        self.words = sorted(postings)
+        self.word_postings = [postings[word] for word in self.words]
+
+    def __len__(self):
+        return len(self.courses)
+
+    def code_matches(self, query, limit=DEFAULT_LIMIT):
+        """Positions of sections whose code starts with the typed code, in code order"""
+        hits = []
+        for key in dict.fromkeys(prefix_keys(query)):
+            if not key:
+                continue
+            i = bisect_left(self.code_keys, key)
+            end = min(i + limit, len(self.code_keys))
+            while i < end and self.code_keys[i].startswith(key):
+                hits.append((self.code_keys[i], self.code_positions[i]))
+                i += 1
+        return [position for _, position in sorted(set(hits))[:limit]]
+
+    def title_matches(self, query, limit=DEFAULT_LIMIT, exclude=(), max_scan=DEFAULT_MAX_SCAN):
+        """Positions of sections whose title has a word starting with each typed word"""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+        driver = max(words, key=len)
+        others = [' ' + word for word in words if word != driver]
+
+        hits = []
+        scanned = 0
+        i = bisect_left(self.words, driver)
+        while i < len(self.words) and self.words[i].startswith(driver):
+            for position in self.word_postings[i]:
+                scanned += 1
+                if scanned > max_scan:
+                    return hits
+                if position in exclude or position in hits:
+                    continue
+                title = self.title_text[position]
+                if all(other in title for other in others):
+                    hits.append(position)
+                    if len(hits) >= limit:
+                        return hits
+            i += 1
+        return hits
+
+    def complete(self, query, limit=DEFAULT_LIMIT):
+        """Up to `limit` ranked completions: {"position", "course", "code", "title", "meeting", "label"}"""
+        positions = self.code_matches(query, limit)
+        if len(positions) < limit:
+            positions += self.title_matches(query, limit - len(positions), exclude=set(positions))
+
+        completions = []
+        for position in positions:
+            course = self.courses[position]
+            fields = course_fields(course)
+            meeting = meeting_summary(course) or 'TBA'
+            completions.append({
+                'position': position,
+                'course': course,
+                'code': fields['code'],
+                'title': fields['title'],
+                'meeting': meeting,
+                'label': f"{fields['code']} - {fields['title']} ({meeting})"
+            })
+        return completions
+
+if __name__ == "__main__":
+    import time
+    from course_record import _synthetic_rows, to_records
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    courses = to_records(_synthetic_rows(n))
+    start = time.perf_counter()
+    index = CompletionIndex(courses)
+    print(f"{n} sections indexed in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    repeats = 1000
+    for query in ['c', 'cs 1', 'com sci 12', 'phil', 'intro', 'adv sys', 'ethics of data', 'xyz']:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            completions = index.complete(query)
+        elapsed = (time.perf_counter() - start) / repeats
+        first = completions[0]['label'] if completions else '-'
+        print(f"{query!r:18} {elapsed * 1e6:7.1f} us  {len(completions)} results, first: {first}")
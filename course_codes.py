@@ -0,0 +1,148 @@
+"""
+Normalized course-code keys and a catalog-wide code index.
+
+Course codes arrive spelled many ways: from the catalog ("COM SCI 188"), from
+students ("cs188", "Com Sci 188") and from the model ("CS 188"). normalize_code
+reduces any of them to one key: the department with spaces and punctuation
+dropped and common abbreviations mapped to the registrar's name, then the
+number with leading zeros removed ("CS 0188" and "COM SCI 188" are both
+"COMSCI 188"). CourseCodeIndex is a dict from that key to the catalog
+positions holding the code (sections of one course share it), built once at
+load, so every lookup is a single hash probe. Its fingerprint identifies the
+catalog it was built from, for caches of results that depend on it.
+"""
+
+import hashlib
+import re
+from collections.abc import Sequence
+
+# Registrar department -> other spellings that mean the same department
+DEPARTMENT_ALIASES = {
+    'COM SCI': ['CS', 'COMPSCI', 'CSCI', 'COMPUTER SCIENCE'],
+    'COG SCI': ['COGS', 'COGNITIVE SCIENCE'],
+    'EC ENGR': ['EE', 'ECE', 'ELEC ENGR', 'ELECTRICAL ENGINEERING'],
+    'PHYSICS': ['PHYS'],
+    'PHILOS': ['PHIL', 'PHILOSOPHY'],
+    'PSYCH': ['PSYC', 'PSY', 'PSYCHOLOGY'],
+    'STATS': ['STAT', 'STATISTICS'],
+    'SOCIOL': ['SOC', 'SOCIOLOGY'],
+    'POL SCI': ['POLI SCI', 'POLITICAL SCIENCE'],
+    'MATH': ['MATHEMATICS'],
+    'ECON': ['ECONOMICS'],
+    'LING': ['LINGUISTICS'],
+    'HIST': ['HISTORY'],
+    'CHEM': ['CHEMISTRY'],
+    'ANTHRO': ['ANTHROPOLOGY'],
+    'ASTR': ['ASTRO', 'ASTRONOMY'],
+    'ENGL': ['ENGLISH'],
+    'LIFESCI': ['LS', 'LIFE SCI', 'LIFE SCIENCES']
+}
+
+_NON_DEPARTMENT = re.compile(r'[^A-Z&]')
+_GLUED_CODE = re.compile(r'^([A-Z&]+)(\d+[A-Z]*)$')
+_NUMBER = re.compile(r'^([A-Z]*)0*(\d+)([A-Z]*)$')
+_NON_CODE = re.compile(r'[^A-Z0-9&]')
+_LEADING_DEPARTMENT = re.compile(r'^([A-Z&]+)(.*)$')
+
+def _department_key(department):
+    return _NON_DEPARTMENT.sub('', department.upper())
+
+_ALIAS_KEYS = {
+    _department_key(alias): _department_key(department)
+    for department, aliases in DEPARTMENT_ALIASES.items()
+    for alias in aliases
+}
+
+def normalize_code(code):
+    """Lookup key for a course code; "cs 188", "CS188" and "COM SCI 188" all give 'COMSCI 188'"""
+    tokens = str(code or '').upper().replace('-', ' ').split()
+    if not tokens:
+        return ''
+    if len(tokens) > 1 and any(ch.isdigit() for ch in tokens[-1]):
+        department, number = ''.join(tokens[:-1]), tokens[-1]
+    else:
+        glued = _GLUED_CODE.match(''.join(tokens))
+        if not glued:
+            return ' '.join(tokens)
+        department, number = glued.groups()
+
+    department = _department_key(department)
+    department = _ALIAS_KEYS.get(department, department)
+    parts = _NUMBER.match(number)
+    if parts:
+        number = ''.join(parts.groups())
+    return f"{department} {number}"
+
+def prefix_keys(text):
+    """Squashed keys for prefix-matching a partly typed code: "cs 18" gives ["CS18", "COMSCI18"].
+
+    Letters, digits and '&' only; a leading department that is a known alias
+    adds a second key with the registrar's name. The last key is the one to
+    index catalog codes under.
+    """
+    squashed = _NON_CODE.sub('', str(text or '').upper())
+    keys = [squashed]
+    match = _LEADING_DEPARTMENT.match(squashed)
+    if match and match.group(1) in _ALIAS_KEYS:
+        keys.append(_ALIAS_KEYS[match.group(1)] + match.group(2))
+    return keys
+
+def code_of(course):
+    return course.get('code') or course.get('course_code') or ''
+
+def catalog_fingerprint(courses):
+    """SHA-256 over every course's code and meeting, in catalog order"""
+    digest = hashlib.sha256()
+    for course in courses:
+        digest.update(f"{code_of(course)}|{course.get('days')}|{course.get('start_time')}|"
+                      f"{course.get('end_time')}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+class CourseCodeIndex:
+    def __init__(self, courses, fingerprint=None, codes=None):
+        """Index `courses` by normalized code.
+
+        `codes` optionally gives every course's code up front (e.g. a compiled
+        catalog's string column), so the courses are only read on lookup.
+        `fingerprint` (e.g. the source CSV's hash) is computed if not given.
+        """
+        self.courses = courses if isinstance(courses, Sequence) else list(courses)
+        if codes is None:
+            codes = map(code_of, self.courses)
+        self._positions = {}
+        for position, code in enumerate(codes):
+            self._positions.setdefault(normalize_code(code), []).append(position)
+        self.fingerprint = fingerprint or catalog_fingerprint(self.courses)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, code):
+        return normalize_code(code) in self._positions
+
+    def positions(self, code):
+        """Catalog positions of every section with this code, in catalog order"""
+        return self._positions.get(normalize_code(code), [])
+
+    def all(self, code):
+        """Every course with this code"""
+        return [self.courses[position] for position in self.positions(code)]
+
+    def get(self, code, default=None):
+        """First course with this code, or `default`"""
+        positions = self.positions(code)
+        return self.courses[positions[0]] if positions else default
+
+    def canonical(self, code):
+        """The catalog's spelling of a code, or the code unchanged if it isn't in the catalog"""
+        course = self.get(code)
+        return code_of(course) if course is not None else code
+
+    def position_of(self, course):
+        """Catalog position of this very course record, or None"""
+        return next((position for position in self.positions(code_of(course))
+                     if self.courses[position] is course), None)
+
+    def first_in(self, code, allowed_ids):
+        """First course with this code whose id() is in `allowed_ids`, or None"""
+        return next((course for course in self.all(code) if id(course) in allowed_ids), None)
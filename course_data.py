@@ -1,5 +1,17 @@
 import boto3
+import csv
 import json
+from course_autocomplete import CompletionIndex
+from course_codes import CourseCodeIndex
+from course_record import to_records
+from interest_index import InterestIndex
+from interval_index import MeetingIntervalIndex
+
+_catalog = None
+_course_index = None
+_interest_index = None
+_code_index = None
+_completion_index = None
 
 def setup_dynamodb_table():
     """Setup DynamoDB table for UCLA courses"""
@@ -83,4 +95,48 @@ def setup_dynamodb_table():
 
 def get_sample_courses():
     """Return sample course data for demo purposes"""
-    return setup_dynamodb_table()
\ No newline at end of file
+    return setup_dynamodb_table()
+
+def load_csv_courses(csv_file_path="ucla_courses.csv"):
+    """Load the catalog CSV as Course records, parsed once here"""
+    with open(csv_file_path, newline='') as f:
+        return to_records(csv.DictReader(f))
+
+def get_catalog():
+    """Return the sample catalog as Course records, loaded once per process and shared by the indexes"""
+    global _catalog
+    if _catalog is None:
+        _catalog = to_records(get_sample_courses())
+    return _catalog
+
+def get_course_index():
+    """Return the meeting-time index over the sample catalog, built once per process"""
+    global _course_index
+    if _course_index is None:
+        _course_index = MeetingIntervalIndex(get_catalog())
+    return _course_index
+
+def get_interest_index():
+    """Return the BM25 interest index over the sample catalog, built once per process"""
+    global _interest_index
+    if _interest_index is None:
+        _interest_index = InterestIndex(get_catalog())
+    return _interest_index
+
+def get_code_index():
+    """Return the normalized course-code index over the sample catalog, built once per process"""
+    global _code_index
+    if _code_index is None:
+        _code_index = CourseCodeIndex(get_catalog())
+    return _code_index
+
+def get_completion_index():
+    """Return the code and title autocomplete index over the sample catalog, built once per process"""
+    global _completion_index
+    if _completion_index is None:
+        _completion_index = CompletionIndex(get_catalog())
+    return _completion_index
+
+def load_csv_course_index(csv_file_path="ucla_courses.csv"):
+    """Build a meeting-time index over the catalog CSV"""
+    return MeetingIntervalIndex(load_csv_courses(csv_file_path))
\ No newline at end of file
@@ -1,65 +1,296 @@
 import boto3
 import json
-from course_data import get_sample_courses
-from schedule_parser import check_schedule_conflicts
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from candidate_pipeline import attribute_filter, conflict_filter, interest_scorer, run_pipeline, select_top
+from course_data import get_catalog, get_code_index, get_course_index, get_interest_index
+from json_stream import JsonArrayStreamParser
+from chunked_ranking import DEFAULT_MAX_WORKERS, DEFAULT_TOP_K, rank_in_chunks
+from prompt_builder import DEFAULT_TOKEN_BUDGET, build_ranking_prompt, decode_recommendations, rank_candidates
+from response_cache import course_set_hash, get_response_cache, make_cache_key, normalize_interests
+from resilience import DEFAULT_RETRIES, CircuitBreaker, retry_call
+from semantic_cache import get_semantic_cache
 
-def match_courses_with_bedrock(interests, current_schedule, bedrock_client, filters=None):
+MODEL_ID = 'us.amazon.nova-pro-v1:0'
+INFERENCE_CONFIG = {"temperature": 0.3, "maxTokens": 2000}
+DEFAULT_DEADLINE_SECONDS = 3.0
+HEDGE_WORKERS = 8
+# Ranking modes, kept apart in the caches: every candidate in chunks, or one streamed prompt
+CHUNKED_MODE = 'chunked'
+STREAM_MODE = 'stream'
+
+_bedrock_breaker = CircuitBreaker()
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+def match_courses_with_bedrock(interests, current_schedule, bedrock_client, filters=None, cache=None,
+                               token_budget=DEFAULT_TOKEN_BUDGET, top_k=DEFAULT_TOP_K, semantic_cache=None):
     """Use Bedrock to match courses with student interests"""
-    available_courses = get_sample_courses()
+    compatible_courses = find_compatible_courses(current_schedule, filters)
+    
+    if not compatible_courses:
+        return {"recommendations": [], "message": "No courses available that fit your schedule and filters."}
     
-    # Filter courses by schedule conflicts first
-    compatible_courses = []
-    for course in available_courses:
-        if not check_schedule_conflicts(current_schedule, course):
-            compatible_courses.append(course)
+    # Identical interests over the same candidate set get the cached ranking,
+    # and near-identical wording the ranking of its closest cached neighbour
+    if cache is None:
+        cache = get_response_cache()
+    if semantic_cache is None:
+        semantic_cache = get_semantic_cache()
+    cache_key = ranking_cache_key(interests, compatible_courses, token_budget, top_k)
+    scope = ranking_cache_scope(compatible_courses, token_budget, top_k)
+    recommendations = cache.get(cache_key)
+    if recommendations is None:
+        recommendations = semantic_cache.get(interests, scope)
+    if recommendations is None:
+        started = time.perf_counter()
+        recommendations = rank_with_bedrock(interests, current_schedule, compatible_courses, bedrock_client,
+                                            token_budget, top_k)
+        if recommendations is not None:
+            cache.set(cache_key, recommendations)
+            semantic_cache.set(interests, scope, recommendations, time.perf_counter() - started)
     
-    # Apply additional filters
-    if filters:
-        compatible_courses = apply_filters(compatible_courses, filters)
+    if recommendations is not None:
+        return {"recommendations": enrich_recommendations(recommendations, compatible_courses)}
     
+    # Fallback: simple keyword matching
+    return fallback_matching(interests, compatible_courses)
+
+def stream_courses_with_bedrock(interests, current_schedule, bedrock_client, filters=None, cache=None,
+                                token_budget=DEFAULT_TOKEN_BUDGET, limit=None, semantic_cache=None, breaker=None):
+    """Yield enriched recommendations one at a time as Bedrock streams them.
+
+    Each recommendation is yielded as soon as its JSON object is complete, so
+    the first one can be shown long before the model finishes. Only the
+    candidates that fit one prompt's token budget are ranked, so the result is
+    cached apart from the chunked ranking. While the circuit breaker is open
+    the local ranking is yielded instead. Yields nothing if no course fits the
+    schedule and filters.
+    """
+    compatible_courses = find_compatible_courses(current_schedule, filters)
     if not compatible_courses:
-        return {"recommendations": [], "message": "No courses available that fit your schedule and filters."}
+        return
     
-    # Create prompt for Bedrock
-    schedule_summary = create_schedule_summary(current_schedule)
-    courses_json = json.dumps(compatible_courses, indent=2)
-    
-    prompt = f"""
-    You are a course recommendation system for UCLA students.
-    
-    Student Profile:
-    - Interests: {interests}
-    - Current Schedule: {schedule_summary}
-    
-    Available Courses (already filtered for schedule compatibility):
-    {courses_json}
-    
-    Task: Rank these courses by how well they match the student's interests. Consider:
-    1. Semantic similarity between interests and course description/keywords
-    2. Academic progression and complementary subjects
-    3. Interdisciplinary connections
-    
-    Return ONLY valid JSON in this format:
-    {{
-        "recommendations": [
-            {{
-                "course_code": "LING 20",
-                "relevance_score": 0.95,
-                "explanation": "Perfect match for linguistics interest. Complements cognitive science background.",
-                "interest_matches": ["linguistics", "language"]
-            }}
-        ]
-    }}
-    
-    Rank all compatible courses, highest relevance first.
+    if cache is None:
+        cache = get_response_cache()
+    if semantic_cache is None:
+        semantic_cache = get_semantic_cache()
+    if breaker is None:
+        breaker = _bedrock_breaker
+    cache_key = ranking_cache_key(interests, compatible_courses, token_budget, DEFAULT_TOP_K, STREAM_MODE)
+    scope = ranking_cache_scope(compatible_courses, token_budget, DEFAULT_TOP_K, STREAM_MODE)
+    cached = cache.get(cache_key)
+    if cached is None:
+        cached = semantic_cache.get(interests, scope)
+    if cached is not None:
+        yield from enrich_recommendations(cached, compatible_courses)[:limit]
+        return
+    if not breaker.allow():
+        print("Bedrock circuit open, using local ranking")
+        yield from fallback_matching(interests, compatible_courses)['recommendations'][:limit]
+        return
+    
+    started = time.perf_counter()
+    built = build_ranking_prompt(interests, create_schedule_summary(current_schedule), compatible_courses,
+                                 token_budget=token_budget, index=get_interest_index())
+    code_index = get_code_index()
+    allowed = {id(c) for c in compatible_courses}
+    ranked = []
+    yielded = 0
+    
+    try:
+        response = bedrock_client.invoke_model_with_response_stream(
+            modelId=MODEL_ID,
+            body=json.dumps({
+                "messages": [{"role": "user", "content": [{"text": built['prompt']}]}],
+                "inferenceConfig": INFERENCE_CONFIG
+            })
+        )
+        parser = JsonArrayStreamParser('recommendations')
+        for text in iter_stream_text(response):
+            for rec in parser.feed(text):
+                for decoded in decode_recommendations({"recommendations": [rec]}, built['course_ids'])['recommendations']:
+                    ranked.append(decoded)
+                    course_info = code_index.first_in(decoded['course_code'], allowed)
+                    if course_info is None or (limit is not None and yielded >= limit):
+                        continue
+                    if yielded == 0:
+                        print(f"Time to first recommendation: {(time.perf_counter() - started) * 1000:.0f} ms")
+                    yielded += 1
+                    yield dict(decoded, course_info=course_info)
+    except Exception as e:
+        print(f"Bedrock streaming error: {e}")
+        breaker.record_failure()
+        if not ranked:
+            yield from fallback_matching(interests, compatible_courses)['recommendations'][:limit]
+        return
+    
+    breaker.record_success()
+    elapsed = time.perf_counter() - started
+    print(f"Streamed {len(ranked)} recommendations in {elapsed * 1000:.0f} ms")
+    cache.set(cache_key, {"recommendations": ranked})
+    semantic_cache.set(interests, scope, {"recommendations": ranked}, elapsed)
+
+def match_courses_hedged(interests, current_schedule, bedrock_client, filters=None, cache=None,
+                         deadline_seconds=DEFAULT_DEADLINE_SECONDS, retries=DEFAULT_RETRIES,
+                         breaker=None, semantic_cache=None, token_budget=DEFAULT_TOKEN_BUDGET, top_k=DEFAULT_TOP_K):
+    """Race the Bedrock ranking against the local BM25 ranking under a latency budget.
+
+    The Bedrock call (with jittered retries) starts on a background pool and
+    the local ranking is computed meanwhile. If Bedrock answers within
+    `deadline_seconds` its ranking is returned, otherwise the local one is,
+    with "pending" set to a Future that later resolves to the Bedrock
+    recommendations (or None) so a UI can upgrade in place; a late answer is
+    cached for the next request either way. While the circuit breaker is
+    open Bedrock isn't called at all. Returns {"recommendations", "source",
+    "pending"} where source is "cache", "bedrock" or "local".
+    """
+    started = time.perf_counter()
+    compatible_courses = find_compatible_courses(current_schedule, filters)
+    if not compatible_courses:
+        return {"recommendations": [], "source": "local", "pending": None,
+                "message": "No courses available that fit your schedule and filters."}
+    
+    if cache is None:
+        cache = get_response_cache()
+    if semantic_cache is None:
+        semantic_cache = get_semantic_cache()
+    if breaker is None:
+        breaker = _bedrock_breaker
+    cache_key = ranking_cache_key(interests, compatible_courses, token_budget, top_k)
+    scope = ranking_cache_scope(compatible_courses, token_budget, top_k)
+    cached = cache.get(cache_key)
+    if cached is None:
+        cached = semantic_cache.get(interests, scope)
+    if cached is not None:
+        return {"recommendations": enrich_recommendations(cached, compatible_courses), "source": "cache", "pending": None}
+    
+    future = None
+    if breaker.allow():
+        def call_bedrock():
+            called = time.perf_counter()
+            recommendations = retry_call(
+                lambda: rank_with_bedrock(interests, current_schedule, compatible_courses, bedrock_client,
+                                          token_budget, top_k),
+                retries
+            )
+            if recommendations is None:
+                breaker.record_failure()
+                return None
+            breaker.record_success()
+            cache.set(cache_key, recommendations)
+            semantic_cache.set(interests, scope, recommendations, time.perf_counter() - called)
+            return enrich_recommendations(recommendations, compatible_courses)
+        
+        future = get_hedge_pool().submit(call_bedrock)
+    else:
+        print("Bedrock circuit open, using local ranking")
+    
+    local = fallback_matching(interests, compatible_courses, top_k)['recommendations']
+    if future is None:
+        return {"recommendations": local, "source": "local", "pending": None}
+    
+    remaining = deadline_seconds - (time.perf_counter() - started)
+    try:
+        recommendations = future.result(timeout=max(remaining, 0))
+    except FutureTimeout:
+        print(f"Bedrock missed the {deadline_seconds:.1f} s deadline, returning local ranking")
+        return {"recommendations": local, "source": "local", "pending": future}
+    
+    if recommendations is None:
+        return {"recommendations": local, "source": "local", "pending": None}
+    return {"recommendations": recommendations, "source": "bedrock", "pending": None}
+
+def get_hedge_pool():
+    """Shared pool for hedged Bedrock calls; they can outlive the request that started them"""
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="bedrock-hedge")
+        return _hedge_pool
+
+def iter_stream_text(response):
+    """Text deltas from an invoke_model_with_response_stream response (Nova message-stream format)"""
+    for event in response['body']:
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        data = json.loads(chunk['bytes'])
+        text = data.get('contentBlockDelta', {}).get('delta', {}).get('text')
+        if text:
+            yield text
+
+def find_compatible_courses(current_schedule, filters=None):
+    """Catalog courses that fit the schedule and pass the user's filters.
+
+    The prompt needs the whole candidate set, so this is the one place the
+    pipeline output is collected into a list.
     """
+    return list(run_pipeline(get_catalog(), [
+        conflict_filter(current_schedule, get_course_index()),
+        attribute_filter(filters)
+    ]))
+
+def ranking_cache_key(interests, compatible_courses, token_budget, top_k, mode=CHUNKED_MODE):
+    """Cache key covering everything that can change a ranking response"""
+    return make_cache_key(
+        normalize_interests(interests),
+        course_set_hash(c['code'] for c in compatible_courses),
+        MODEL_ID,
+        INFERENCE_CONFIG,
+        token_budget,
+        top_k,
+        mode
+    )
+
+def ranking_cache_scope(compatible_courses, token_budget, top_k, mode=CHUNKED_MODE):
+    """Semantic cache scope: everything but the interests that can change a ranking response"""
+    return make_cache_key(
+        'ranking',
+        course_set_hash(c['code'] for c in compatible_courses),
+        MODEL_ID,
+        INFERENCE_CONFIG,
+        token_budget,
+        top_k,
+        mode
+    )
+
+def rank_with_bedrock(interests, current_schedule, compatible_courses, bedrock_client,
+                      token_budget=DEFAULT_TOKEN_BUDGET, top_k=DEFAULT_TOP_K, max_workers=DEFAULT_MAX_WORKERS):
+    """Ask Bedrock to rank the compatible courses; returns the parsed JSON or None on failure.
+
+    Candidates that don't fit one prompt's token budget are ranked in parallel
+    chunks and merged into a global top-k.
+    """
+    # Compact, token-budgeted prompt over the locally pre-ranked candidates
+    schedule_summary = create_schedule_summary(current_schedule)
+    index = get_interest_index()
+    built = build_ranking_prompt(interests, schedule_summary, compatible_courses,
+                                 token_budget=token_budget, index=index)
+    print(f"Ranking prompt: {built['included']}/{built['candidates']} courses, "
+          f"~{built['estimated_tokens']} tokens (budget {token_budget})")
+    if built['included'] >= built['candidates']:
+        return invoke_ranking(built, bedrock_client)
     
+    def rank_chunk(chunk):
+        return invoke_ranking(
+            build_ranking_prompt(interests, schedule_summary, chunk, token_budget=token_budget, index=index),
+            bedrock_client
+        )
+    
+    return rank_in_chunks(rank_candidates(interests, compatible_courses, index), rank_chunk,
+                          chunk_size=built['included'], top_k=top_k, max_workers=max_workers,
+                          row_of=get_code_index().position_of)
+
+def invoke_ranking(built, bedrock_client):
+    """Send one built ranking prompt to Bedrock and decode the short ids in its answer"""
     try:
         response = bedrock_client.invoke_model(
-            modelId='us.amazon.nova-pro-v1:0',
+            modelId=MODEL_ID,
             body=json.dumps({
-                "messages": [{"role": "user", "content": [{"text": prompt}]}],
-                "inferenceConfig": {"temperature": 0.3, "maxTokens": 2000}
+                "messages": [{"role": "user", "content": [{"text": built['prompt']}]}],
+                "inferenceConfig": INFERENCE_CONFIG
             })
         )
         
@@ -71,39 +302,45 @@ def match_courses_with_bedrock(interests, current_schedule, bedrock_client, filt
         json_end = content.rfind('}') + 1
         if json_start != -1 and json_end != -1:
             json_str = content[json_start:json_end]
-            recommendations = json.loads(json_str)
-            
-            # Enrich recommendations with full course details
-            enriched_recs = []
-            for rec in recommendations.get('recommendations', []):
-                course_info = next((c for c in compatible_courses if c['code'] == rec['course_code']), None)
-                if course_info:
-                    rec['course_info'] = course_info
-                    enriched_recs.append(rec)
-            
-            return {"recommendations": enriched_recs}
+            return decode_recommendations(json.loads(json_str), built['course_ids'])
         
     except Exception as e:
         print(f"Bedrock matching error: {e}")
     
-    # Fallback: simple keyword matching
-    return fallback_matching(interests, compatible_courses)
+    return None
+
+def enrich_recommendations(recommendations, compatible_courses):
+    """Attach full course details to each ranked recommendation, dropping unknown codes.
+
+    A recommendation carrying a catalog "row" (chunked rankings) gets that
+    exact section; otherwise its code is looked up in the catalog's normalized
+    code index, so "CS 188" finds COM SCI 188. Only courses among
+    `compatible_courses` are used.
+    """
+    code_index = get_code_index()
+    allowed = {id(c) for c in compatible_courses}
+    enriched_recs = []
+    for rec in recommendations.get('recommendations', []):
+        course_info = section_at(code_index, rec, allowed) or code_index.first_in(rec.get('course_code'), allowed)
+        if course_info:
+            # Copy so cached rankings are never mutated
+            enriched_recs.append(dict(rec, course_info=course_info))
+    
+    return enriched_recs
+
+def section_at(code_index, rec, allowed_ids):
+    """The compatible course at the recommendation's catalog row, if it still has the recommended code"""
+    row = rec.get('row')
+    if not isinstance(row, int) or not 0 <= row < len(code_index.courses):
+        return None
+    course = code_index.courses[row]
+    if id(course) not in allowed_ids or row not in code_index.positions(rec.get('course_code')):
+        return None
+    return course
 
 def apply_filters(courses, filters):
     """Apply user-selected filters to course list"""
-    filtered = courses
-    
-    if filters.get('difficulty') and filters['difficulty'] != 'Any':
-        filtered = [c for c in filtered if c.get('difficulty') == filters['difficulty']]
-    
-    if filters.get('ge_area') and filters['ge_area'] != 'Any':
-        filtered = [c for c in filtered if c.get('ge_area') == filters['ge_area']]
-    
-    if filters.get('credits'):
-        min_credits, max_credits = filters['credits']
-        filtered = [c for c in filtered if min_credits <= c.get('credits', 0) <= max_credits]
-    
-    return filtered
+    return list(attribute_filter(filters)(courses))
 
 def create_schedule_summary(schedule):
     """Create readable summary of current schedule"""
@@ -117,39 +354,20 @@ def create_schedule_summary(schedule):
     
     return ", ".join(summary)
 
-def fallback_matching(interests, courses):
-    """Simple keyword-based matching as fallback"""
-    interest_words = interests.lower().split()
+def fallback_matching(interests, courses, top_k=DEFAULT_TOP_K):
+    """BM25 keyword matching over the shared interest index as fallback"""
+    scorer, max_score = interest_scorer(interests, get_interest_index())
+    results = select_top(courses, [scorer], top_k, max_score)
     recommendations = []
+    best_score = results[0][1] if results else 0
     
-    for course in courses:
-        score = 0
-        matches = []
-        
-        # Check keywords
-        for keyword in course.get('keywords', []):
-            for interest in interest_words:
-                if interest in keyword.lower() or keyword.lower() in interest:
-                    score += 1
-                    matches.append(keyword)
-        
-        # Check title and description
-        text_to_check = f"{course.get('title', '')} {course.get('description', '')}".lower()
-        for interest in interest_words:
-            if interest in text_to_check:
-                score += 0.5
-                matches.append(interest)
-        
-        if score > 0:
-            recommendations.append({
-                "course_code": course['code'],
-                "relevance_score": min(score / len(interest_words), 1.0),
-                "explanation": f"Matches interests: {', '.join(set(matches))}",
-                "interest_matches": list(set(matches)),
-                "course_info": course
-            })
-    
-    # Sort by relevance score
-    recommendations.sort(key=lambda x: x['relevance_score'], reverse=True)
+    for course, score, matches in results:
+        recommendations.append({
+            "course_code": course['code'],
+            "relevance_score": score / best_score if best_score else 0.0,
+            "explanation": f"Matches interests: {', '.join(matches)}",
+            "interest_matches": matches,
+            "course_info": course
+        })
     
     return {"recommendations": recommendations}
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Compact course records.
+
+Courses reach the code in two dict schemas: the sample catalog in course_data
+(code/title/ge_area/credits, days as weekday names) and the CSV catalog
+(course_code/course_title/GE, days like "['MWF']"). A Course record holds
+either one in a fixed set of __slots__, built once at load with the meeting
+already parsed: start and end as integer minutes, days as a weekday bitmask
+and the weekly slot mask from time_slots. Nothing downstream has to parse a
+time string again; time_slots.meeting_times and course_mask read the fields
+directly.
+
+Repeated values are shared rather than copied per course: strings are
+interned (GE areas, difficulties, codes, and the titles and descriptions
+that sections of one course repeat), minutes come from one table of ints,
+and courses with the same meeting pattern share one slot-mask integer.
+
+Course is a read-only Mapping answering to the keys of both schemas, so code
+written against dicts (course['code'], course.get('GE'), dict(course, ...))
+keeps working; dict(course) gives the sample schema and is JSON-serializable.
+A known field with no value reads as None, like a dict holding None, while
+get() falls back to its default and iteration leaves the field out. Records
+hash and compare by identity, like the one-per-row objects they are.
+`python benchmark_records.py` compares the memory of 100,000 courses as CSV
+dicts and as records.
+"""
+
+import sys
+from collections.abc import Mapping
+from time_slots import DAY_ABBREVIATIONS, DAY_NAMES, minutes_mask, parse_days, parse_minutes
+
+# Shared int objects for every minute of the day, and the day tuples of every weekday bitmask
+_MINUTES = tuple(range(24 * 60 + 1))
+_MASK_DAYS = tuple(tuple(d for d in range(7) if mask >> d & 1) for mask in range(128))
+_MASK_ABBREVIATIONS = tuple(''.join(DAY_ABBREVIATIONS[d] for d in days) for days in _MASK_DAYS)
+
+_pattern_masks = {}
+
+def canonical_code(code):
+    """Course code with whitespace collapsed and upper-cased ("com  sci 188" -> "COM SCI 188")"""
+    return ' '.join(str(code or '').split()).upper()
+
+def _intern(value):
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+def _minute(value):
+    return _MINUTES[value] if value is not None and 0 <= value <= 24 * 60 else value
+
+def pattern_mask(day_mask, start, end):
+    """Slot mask of a meeting pattern, one shared int per distinct (days, start, end)"""
+    key = (day_mask, start, end)
+    mask = _pattern_masks.get(key)
+    if mask is None:
+        mask = _pattern_masks[key] = minutes_mask(_MASK_DAYS[day_mask], start, end)
+    return mask
+
+def _clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def _short_clock(minutes):
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d}"
+
+class Course(Mapping):
+    __slots__ = ('course_id', 'code', 'title', 'description', 'day_mask', 'start', 'end', 'slot_mask',
+                 'ge_area', 'difficulty', 'credits', 'keywords')
+
+    def __init__(self, code, title='', description='', day_mask=0, start=None, end=None, ge_area=None,
+                 difficulty=None, credits=None, keywords=(), course_id=None, slot_mask=None):
+        """Build a record from already-parsed values; use from_sample/from_csv_row/from_dict for dicts"""
+        if start is None or end is None or end <= start or not day_mask:
+            day_mask, start, end = 0, None, None
+        self.course_id = _intern(course_id)
+        self.code = _intern(canonical_code(code))
+        self.title = _intern(title)
+        self.description = _intern(description)
+        self.day_mask = day_mask
+        self.start = _minute(start)
+        self.end = _minute(end)
+        self.slot_mask = pattern_mask(day_mask, self.start, self.end) if slot_mask is None else slot_mask
+        self.ge_area = _intern(ge_area)
+        self.difficulty = _intern(difficulty)
+        self.credits = credits
+        self.keywords = tuple(_intern(k) for k in keywords)
+
+    @classmethod
+    def from_dict(cls, course):
+        """Record from a course dict in either schema"""
+        days = sum(1 << d for d in parse_days(course.get('days')))
+        credits = course.get('credits')
+        if isinstance(credits, str):
+            credits = int(credits) if credits.strip().isdigit() else None
+        keywords = course.get('keywords') or ()
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        return cls(
+            course.get('code') or course.get('course_code') or '',
+            course.get('title') or course.get('course_title') or '',
+            course.get('description') or '',
+            days,
+            parse_minutes(course.get('start_time')),
+            parse_minutes(course.get('end_time')),
+            course.get('ge_area') or course.get('GE') or None,
+            course.get('difficulty') or None,
+            credits,
+            keywords,
+            course.get('course_id') or None
+        )
+
+    # Adapters named for the source they read; both schemas go through from_dict
+    from_sample = from_dict
+    from_csv_row = from_dict
+
+    @property
+    def day_indices(self):
+        return _MASK_DAYS[self.day_mask]
+
+    def parsed_times(self):
+        """(day indices, start minute, end minute), as time_slots.meeting_times returns them"""
+        return _MASK_DAYS[self.day_mask], self.start, self.end
+
+    def days_text(self):
+        """Meeting days as abbreviations ("MWF", "TuTh")"""
+        return _MASK_ABBREVIATIONS[self.day_mask] or None
+
+    def day_names(self):
+        """Meeting days spelled out ("Monday, Wednesday, Friday"), or 'TBA'"""
+        return ', '.join(DAY_NAMES[d] for d in _MASK_DAYS[self.day_mask]) or 'TBA'
+
+    def start_time(self):
+        return _clock(self.start) if self.start is not None else None
+
+    def end_time(self):
+        return _clock(self.end) if self.end is not None else None
+
+    def time(self):
+        """Display time in the sample catalog's style ("TuTh 3:00-4:30")"""
+        if self.start is None:
+            return None
+        return f"{self.days_text()} {_short_clock(self.start)}-{_short_clock(self.end)}"
+
+    # Mapping would otherwise compare field by field and leave records unhashable
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+    def __getitem__(self, key):
+        getter = _KEYS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def __contains__(self, key):
+        getter = _KEYS.get(key)
+        return getter is not None and getter(self) is not None
+
+    def get(self, key, default=None):
+        getter = _KEYS.get(key)
+        value = getter(self) if getter is not None else None
+        return default if value is None else value
+
+    def __iter__(self):
+        return (key for key in _SAMPLE_KEYS if _KEYS[key](self) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Course({self.code!r}, {self.title!r})"
+
+# Keys of the sample schema (what dict(course) produces), then the CSV schema's aliases
+_KEYS = {
+    'course_id': lambda c: c.course_id,
+    'code': lambda c: c.code,
+    'title': lambda c: c.title,
+    'description': lambda c: c.description,
+    'days': Course.days_text,
+    'time': Course.time,
+    'start_time': Course.start_time,
+    'end_time': Course.end_time,
+    'ge_area': lambda c: c.ge_area,
+    'credits': lambda c: c.credits,
+    'difficulty': lambda c: c.difficulty,
+    'keywords': lambda c: list(c.keywords)
+}
+_SAMPLE_KEYS = tuple(_KEYS)
+_KEYS.update({
+    'course_code': _KEYS['code'],
+    'course_title': _KEYS['title'],
+    'GE': _KEYS['ge_area']
+})
+
+def to_records(courses):
+    """Course records for an iterable of course dicts in either schema (records pass through)"""
+    return [course if isinstance(course, Course) else Course.from_dict(course) for course in courses]
+
+def _synthetic_rows(n, seed=0):
+    """CSV-schema rows shaped like a large catalog: ~1/3 are extra sections of an earlier course"""
+    import random
+    rng = random.Random(seed)
+    departments = ['COM SCI', 'MATH', 'PHYSICS', 'LING', 'PSYCH', 'HIST', 'ENGL', 'ECON', 'PHILOS', 'STATS']
+    words = ['systems', 'theory', 'analysis', 'introduction', 'advanced', 'methods', 'language', 'data',
+             'history', 'society', 'mind', 'structures', 'design', 'computation', 'ethics', 'culture']
+    ge_areas = ['Society and Culture', 'Foundations of Scientific Inquiry', 'Arts and Humanities', '']
+    patterns = ['MWF', 'TuTh', 'MW', 'F', 'TuTh', 'MWF']
+    rows = []
+    for i in range(n):
+        if rows and rng.random() < 1 / 3:
+            row = dict(rng.choice(rows))
+        else:
+            row = {
+                'course_code': f"{rng.choice(departments)} {rng.randint(1, 299)}",
+                'course_title': ' '.join(rng.choice(words) for _ in range(3)).title(),
+                'description': ' '.join(rng.choice(words) for _ in range(25)) + f" ({i})",
+                'GE': rng.choice(ge_areas),
+                'difficulty': str(rng.randint(1, 5))
+            }
+        start = rng.randrange(8 * 60, 19 * 60, 30)
+        row.update({
+            'days': f"['{rng.choice(patterns)}']",
+            'start_time': f"{start // 60:02d}:{start % 60:02d}",
+            'end_time': f"{(start + 50) // 60:02d}:{(start + 50) % 60:02d}"
+        })
+        rows.append(row)
+    return rows
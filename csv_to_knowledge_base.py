@@ -1,65 +1,315 @@
-import pandas as pd
-import boto3
+import csv
+import hashlib
 import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from kb_shards import DEFAULT_SHARD_BYTES, INDEX_NAME, SHARDS_PREFIX, write_shards
+
+# Knowledge Base data source prefix (matches inclusionPrefixes in setup_knowledge_base.py)
+KB_PREFIX = 'coursematch-kb/'
+MANIFEST_SUFFIX = '.manifest.json'
+DEFAULT_UPLOAD_WORKERS = 16
+UPLOAD_RETRIES = 3
+RETRY_BACKOFF = 0.2
+# Bump when course_document changes so an unchanged CSV is still re-exported
+DOCUMENT_VERSION = 2
+
+def section_key(row):
+    """Stable, filename-safe id for one section: course code, section and meeting pattern"""
+    days = ''.join(re.findall(r'[A-Za-z]+', str(row.get('days') or '')))
+    parts = [row.get('course_code'), row.get('section'), days, row.get('start_time')]
+    return re.sub(r'[^A-Za-z0-9]+', '-', ' '.join(str(p) for p in parts if p)).strip('-')
+
+def with_section_ids(rows):
+    """Yield (section id, row); exact repeats of a section_key get _2, _3, ... in catalog order"""
+    seen = {}
+    for row in rows:
+        key = section_key(row)
+        seen[key] = seen.get(key, 0) + 1
+        yield (key if seen[key] == 1 else f"{key}_{seen[key]}"), row
+
+def course_document(row, course_id):
+    """Build the Knowledge Base document for one catalog row"""
+    # The catalog CSV uses course_title/GE/start_time; older exports used title/ge_area/time
+    title = row.get('title') or row.get('course_title', '')
+    ge_area = row.get('ge_area') or row.get('GE', '')
+    time = row.get('time') or (
+        f"{row.get('start_time')}-{row.get('end_time')}" if row.get('start_time') else ''
+    )
+    return {
+        "course_id": course_id,
+        "course_code": row.get('course_code', ''),
+        "title": title,
+        "description": row.get('description', ''),
+        "time": time,
+        "days": row.get('days', ''),
+        "start_time": row.get('start_time', ''),
+        "end_time": row.get('end_time', ''),
+        "instructor": row.get('instructor', ''),
+        "credits": row.get('credits', ''),
+        "difficulty": row.get('difficulty', ''),
+        "ge_area": ge_area,
+        "prerequisites": row.get('prerequisites', ''),
+        "full_text": f"{row.get('course_code', '')} {title} {row.get('description', '')} {time} {row.get('days', '')}"
+    }
+
+def iter_course_documents(csv_file_path="ucla_courses.csv"):
+    """Stream Knowledge Base documents from the catalog CSV, one row at a time"""
+    with open(csv_file_path, newline='') as f:
+        for course_id, row in with_section_ids(csv.DictReader(f, restval='')):
+            yield course_document(row, course_id)
+
+def build_course_documents(csv_file_path="ucla_courses.csv"):
+    """Convert the catalog CSV to Knowledge Base documents without writing them"""
+    return list(iter_course_documents(csv_file_path))
+
+def document_bytes(doc):
+    """Serialized Knowledge Base document, exactly as written to disk and S3"""
+    return json.dumps(doc, indent=2).encode('utf-8')
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def manifest_path(output_dir):
+    """The sync manifest sits next to the documents directory so it is never uploaded"""
+    return os.path.normpath(output_dir) + MANIFEST_SUFFIX
+
+def load_manifest(path):
+    """{"source": {...}, "documents": {filename: hash}, "uploads": {target: {filename: hash}}}; empty if missing"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    manifest.setdefault('source', {})
+    manifest.setdefault('documents', {})
+    manifest.setdefault('uploads', {})
+    return manifest
+
+def save_manifest(manifest, path):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def diff_hashes(current, previous):
+    """(added, changed, deleted) filenames between two {filename: hash} maps"""
+    added = sorted(name for name in current if name not in previous)
+    changed = sorted(name for name in current if name in previous and previous[name] != current[name])
+    deleted = sorted(name for name in previous if name not in current)
+    return added, changed, deleted
+
+def hash_directory(local_dir):
+    """{filename: hash} of the JSON documents already in a directory"""
+    hashes = {}
+    for filename in sorted(os.listdir(local_dir)):
+        if filename.endswith('.json'):
+            with open(os.path.join(local_dir, filename), 'rb') as f:
+                hashes[filename] = content_hash(f.read())
+    return hashes
+
+def source_fingerprint(csv_file_path):
+    """Hash of the CSV and the document format, stored in the manifest to skip unchanged exports"""
+    with open(csv_file_path, 'rb') as f:
+        return {'sha256': content_hash(f.read()), 'version': DOCUMENT_VERSION}
+
+def document_filename(doc):
+    return f"course_{doc['course_id']}.json"
 
 def prepare_csv_for_knowledge_base(csv_file_path="ucla_courses.csv", output_dir="knowledge_base_docs"):
-    """Convert CSV to individual JSON documents for Knowledge Base"""
+    """Convert CSV to individual JSON documents for Knowledge Base.
+
+    Documents are named after their section, so inserting or reordering rows
+    leaves every other file alone. Only documents whose content hash differs
+    from the manifest (or whose file is missing) are rewritten, documents for
+    removed rows are deleted, and an unchanged CSV returns without parsing it.
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    path = manifest_path(output_dir)
+    manifest = load_manifest(path)
+    previous = manifest['documents']
+    source = source_fingerprint(csv_file_path)
+    if manifest['source'] == source and previous and all(
+        os.path.exists(os.path.join(output_dir, filename)) for filename in previous
+    ):
+        print(f"{len(previous)} course documents in {output_dir}/ are up to date "
+              f"({time.perf_counter() - started:.3f} s)")
+        return output_dir
     
-    # Read CSV
-    df = pd.read_csv(csv_file_path)
+    documents = build_course_documents(csv_file_path)
+    current = {}
+    written = 0
+    for doc in documents:
+        filename = document_filename(doc)
+        data = document_bytes(doc)
+        current[filename] = content_hash(data)
+        file_path = os.path.join(output_dir, filename)
+        if previous.get(filename) != current[filename] or not os.path.exists(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(data)
+            written += 1
     
-    # Create documents directory
-    import os
-    os.makedirs(output_dir, exist_ok=True)
+    added, changed, deleted = diff_hashes(current, previous)
+    for filename in deleted:
+        try:
+            os.remove(os.path.join(output_dir, filename))
+        except FileNotFoundError:
+            pass
     
-    # Convert each row to a document
-    for idx, row in df.iterrows():
-        doc = {
-            "course_id": f"{row.get('course_code', '')}-{idx}",
-            "course_code": row.get('course_code', ''),
-            "title": row.get('title', ''),
-            "description": row.get('description', ''),
-            "time": row.get('time', ''),
-            "days": row.get('days', ''),
-            "instructor": row.get('instructor', ''),
-            "credits": row.get('credits', ''),
-            "ge_area": row.get('ge_area', ''),
-            "prerequisites": row.get('prerequisites', ''),
-            "full_text": f"{row.get('course_code', '')} {row.get('title', '')} {row.get('description', '')} {row.get('time', '')} {row.get('days', '')}"
-        }
-        
-        # Save as JSON file
-        with open(f"{output_dir}/course_{idx}.json", 'w') as f:
-            json.dump(doc, f, indent=2)
-    
-    print(f"Created {len(df)} course documents in {output_dir}/")
+    manifest['source'] = source
+    manifest['documents'] = current
+    save_manifest(manifest, path)
+    elapsed = time.perf_counter() - started
+    print(f"{len(documents)} course documents in {output_dir}/: {len(added)} added, {len(changed)} changed, "
+          f"{len(deleted)} deleted, {written} written ({len(documents) / max(elapsed, 1e-9):.0f} docs/sec)")
     return output_dir
 
-def upload_to_s3(local_dir, bucket_name, s3_prefix="coursematch-kb/"):
-    """Upload knowledge base documents to S3"""
-    s3 = boto3.client('s3')
+def export_knowledge_base_shards(csv_file_path="ucla_courses.csv", output_dir="knowledge_base_shards",
+                                 max_shard_bytes=DEFAULT_SHARD_BYTES):
+    """Bundled export mode: stream documents into compressed JSONL shards plus an offsets index.
+
+    Shards are staged next to the old ones and only replace them when their
+    content hash changed, so upload_to_s3 re-sends just the changed shards.
+    """
+    started = time.perf_counter()
+    path = manifest_path(output_dir)
+    manifest = load_manifest(path)
+    previous = manifest['documents']
     
-    import os
-    for filename in os.listdir(local_dir):
-        if filename.endswith('.json'):
-            s3.upload_file(
-                f"{local_dir}/{filename}",
-                bucket_name,
-                f"{s3_prefix}{filename}"
-            )
+    suffix = f".tmp{os.getpid()}"
+    index = write_shards(iter_course_documents(csv_file_path), output_dir, max_shard_bytes, suffix=suffix)
+    
+    current = {}
+    written = 0
+    for name in [shard['name'] for shard in index['shards']] + [INDEX_NAME]:
+        staged = os.path.join(output_dir, name + suffix)
+        with open(staged, 'rb') as f:
+            current[name] = content_hash(f.read())
+        final = os.path.join(output_dir, name)
+        if previous.get(name) == current[name] and os.path.exists(final):
+            os.remove(staged)
+        else:
+            os.replace(staged, final)
+            written += 1
     
-    print(f"Uploaded documents to s3://{bucket_name}/{s3_prefix}")
+    _, _, deleted = diff_hashes(current, previous)
+    for name in deleted:
+        try:
+            os.remove(os.path.join(output_dir, name))
+        except FileNotFoundError:
+            pass
+    
+    manifest['documents'] = current
+    save_manifest(manifest, path)
+    elapsed = time.perf_counter() - started
+    count = len(index['documents'])
+    print(f"{count} course documents in {len(index['shards'])} shards in {output_dir}/: {written} files written "
+          f"in {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} docs/sec)")
+    return output_dir
+
+def with_retries(call, retries=UPLOAD_RETRIES, backoff=RETRY_BACKOFF):
+    """Run `call`, retrying with exponential backoff; re-raises the last error"""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+def upload_to_s3(local_dir, bucket_name, s3_prefix=KB_PREFIX, s3=None,
+                 max_workers=DEFAULT_UPLOAD_WORKERS, retries=UPLOAD_RETRIES):
+    """Sync knowledge base documents to S3: upload added/changed ones, delete removed ones.
+
+    What is already in the bucket is tracked per target in the manifest, so
+    an unchanged export makes no S3 calls at all. Failed uploads stay pending
+    and are retried on the next run. Pass a LocalS3Client as `s3` to sync
+    without AWS.
+    """
+    if s3 is None:
+        import boto3
+        s3 = boto3.client('s3')
+    
+    path = manifest_path(local_dir)
+    manifest = load_manifest(path)
+    documents = manifest['documents'] or hash_directory(local_dir)
+    target = f"s3://{bucket_name}/{s3_prefix}"
+    uploaded = manifest['uploads'].setdefault(target, {})
+    added, changed, deleted = diff_hashes(documents, uploaded)
+    
+    def upload(filename):
+        with_retries(lambda: s3.upload_file(os.path.join(local_dir, filename), bucket_name, f"{s3_prefix}{filename}"),
+                     retries)
+    
+    failed = 0
+    pending = added + changed
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            futures = {pool.submit(upload, filename): filename for filename in pending}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    future.result()
+                    uploaded[filename] = documents[filename]
+                except Exception as e:
+                    print(f"Upload failed for {filename}: {e}")
+                    failed += 1
+    
+    # S3 deletes up to 1000 keys per request
+    for i in range(0, len(deleted), 1000):
+        batch = deleted[i:i + 1000]
+        try:
+            response = with_retries(lambda: s3.delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': [{'Key': f"{s3_prefix}{filename}"} for filename in batch]}
+            ), retries)
+        except Exception as e:
+            print(f"Delete failed for {len(batch)} documents: {e}")
+            failed += len(batch)
+            continue
+        for obj in response.get('Deleted', []):
+            uploaded.pop(obj['Key'][len(s3_prefix):], None)
+    
+    save_manifest(manifest, path)
+    print(f"Synced {target}: {len(added)} added, {len(changed)} changed, {len(deleted)} deleted, {failed} failed")
+    return {'added': added, 'changed': changed, 'deleted': deleted, 'failed': failed}
 
 if __name__ == "__main__":
+    import sys
+    
     # Use the CSV file in the same directory
     csv_file = "ucla_courses.csv"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
     
     print(f"Processing {csv_file}...")
     
-    # Convert CSV to knowledge base format
-    docs_dir = prepare_csv_for_knowledge_base(csv_file)
+    # Convert CSV to knowledge base format (only changed documents are rewritten)
+    shards = "--shards" in sys.argv
+    if shards:
+        docs_dir = export_knowledge_base_shards(csv_file)
+    else:
+        docs_dir = prepare_csv_for_knowledge_base(csv_file)
+    
+    if args:
+        # python csv_to_knowledge_base.py BUCKET [--local] [--shards] syncs the changes straight away
+        s3 = None
+        if "--local" in sys.argv:
+            from local_s3 import LocalS3Client
+            s3 = LocalS3Client()
+        # Shards go beside the Knowledge Base prefix, never into it: ingestion can't read .jsonl.gz
+        upload_to_s3(docs_dir, args[0], s3_prefix=SHARDS_PREFIX if shards else KB_PREFIX, s3=s3)
     
     print("\nNext steps:")
-    print("1. Upload to S3: aws s3 sync knowledge_base_docs/ s3://your-bucket/coursematch-kb/")
-    print("2. Create Knowledge Base in Bedrock Console")
-    print("3. Update COURSEMATCH_KB_ID in bedrock_agent.py")
\ No newline at end of file
+    if shards:
+        if not args:
+            print(f"1. Upload to S3 (under {SHARDS_PREFIX}): python csv_to_knowledge_base.py your-bucket --shards")
+        print("2. Shards serve LocalRetrievalIndex.from_shards and ShardedDocuments (kb_shards.s3_range_reader reads S3);")
+        print("   they are not Knowledge Base input, so run without --shards to refresh the Knowledge Base")
+    else:
+        if not args:
+            print("1. Upload to S3: python csv_to_knowledge_base.py your-bucket")
+        print("2. Create Knowledge Base in Bedrock Console (or sync the data source after an update)")
+        print("3. Update COURSEMATCH_KB_ID in bedrock_agent.py")
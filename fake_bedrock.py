@@ -0,0 +1,94 @@
+"""
+Offline stand-in for the bedrock-runtime client.
+
+FakeBedrockClient answers invoke_model with Nova-format responses computed
+locally, so the ranking and schedule-parsing paths can be exercised and timed
+without AWS credentials:
+- ranking prompts from prompt_builder are scored with BM25 over the table rows
+- schedule extraction prompts are answered with the local regex parser
+
+A fixed `latency` (seconds) is slept per call to model network time, and
+streamed responses are sent `stream_chunk_chars` characters at a time with
+`token_delay` seconds between chunks.
+"""
+
+import io
+import json
+import re
+import threading
+import time
+from interest_index import InterestIndex
+
+_INTERESTS_LINE = re.compile(r'^\s*- Interests:\s*(.*)$', re.MULTILINE)
+_TABLE_ROW = re.compile(r'^(C\d+)\|(.*)$', re.MULTILINE)
+_SCHEDULE_TEXT = re.compile(r'Text:\s*(.*?)\n\s*\n\s*Format:', re.DOTALL)
+
+def _nova_body(text):
+    return {'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+            'stopReason': 'end_turn'}
+
+class FakeBedrockClient:
+    def __init__(self, latency=0.0, token_delay=0.0, stream_chunk_chars=16):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.stream_chunk_chars = stream_chunk_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        rows = _TABLE_ROW.findall(prompt)
+        if rows:
+            interests = _INTERESTS_LINE.search(prompt)
+            return json.dumps(self.rank_rows(interests.group(1) if interests else '', rows))
+
+        schedule = _SCHEDULE_TEXT.search(prompt)
+        if schedule:
+            from schedule_parser import parse_schedule_text
+            return json.dumps({'courses': parse_schedule_text(schedule.group(1).strip(), min_confidence=0.0)})
+        return json.dumps({})
+
+    def rank_rows(self, interests, rows):
+        """Rank table rows by BM25 against the interests, like a (very literal) model would"""
+        index = InterestIndex([{'code': short_id, 'description': text} for short_id, text in rows])
+        scores, matched = index.score(interests)
+        best = max(scores.values(), default=0.0) or 1.0
+        order = sorted(range(len(rows)), key=lambda doc: (-scores.get(doc, 0.0), doc))
+        return {'recommendations': [
+            {
+                'id': rows[doc][0],
+                'relevance_score': round(scores.get(doc, 0.0) / best, 3),
+                'explanation': f"Matches interests: {', '.join(matched.get(doc, [])) or 'none'}",
+                'interest_matches': matched.get(doc, [])
+            }
+            for doc in order
+        ]}
+
+    def _prompt(self, body):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return json.loads(body)['messages'][0]['content'][0]['text']
+
+    def invoke_model(self, modelId, body, **kwargs):
+        prompt = self._prompt(body)
+        payload = json.dumps(_nova_body(self._answer(prompt))).encode('utf-8')
+        return {'body': io.BytesIO(payload), 'contentType': 'application/json'}
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        prompt = self._prompt(body)
+        return {'body': self._stream_events(self._answer(prompt)), 'contentType': 'application/json'}
+
+    def _stream_events(self, text):
+        """Nova message-stream events, delivered lazily like a real EventStream"""
+        def event(data):
+            return {'chunk': {'bytes': json.dumps(data).encode('utf-8')}}
+
+        yield event({'messageStart': {'role': 'assistant'}})
+        for start in range(0, len(text), self.stream_chunk_chars):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield event({'contentBlockDelta': {'delta': {'text': text[start:start + self.stream_chunk_chars]},
+                                               'contentBlockIndex': 0}})
+        yield event({'contentBlockStop': {'contentBlockIndex': 0}})
+        yield event({'messageStop': {'stopReason': 'end_turn'}})
@@ -0,0 +1,172 @@
+"""
+Tokenized inverted index with BM25 scoring for interest matching.
+
+Course code, title, description and keywords are tokenized once when the
+index is built. An interest query then only walks the postings of its own
+terms, instead of substring-checking every interest word against every
+course's text. Works with both course schemas (`code`/`title` from
+course_data and `course_code`/`course_title` from the CSV).
+"""
+
+import heapq
+import math
+import re
+
+# Title and keyword hits say more about a course than a passing mention
+FIELD_WEIGHTS = {'code': 1.0, 'title': 2.0, 'description': 1.0, 'keywords': 2.0}
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'i', 'im',
+    'in', 'including', 'into', 'is', 'it', 'like', 'me', 'my', 'of', 'on', 'or', 'some',
+    'that', 'the', 'their', 'this', 'to', 'with', 'want', 'interested'
+}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def stem(token):
+    """Very light plural stripping, e.g. "ethics" -> "ethic", "theories" -> "theory"."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in _TOKEN_PATTERN.findall(str(text).lower()) if t not in STOPWORDS]
+
+def query_terms(interests):
+    """Return (term, word) pairs for an interest string, one per distinct term"""
+    seen = set()
+    terms = []
+    for word in tokenize(interests):
+        term = stem(word)
+        if term not in seen:
+            seen.add(term)
+            terms.append((term, word))
+    return terms
+
+def course_fields(course):
+    """Searchable text fields of a course in either schema"""
+    keywords = course.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    return {
+        'code': course.get('code') or course.get('course_code') or '',
+        'title': course.get('title') or course.get('course_title') or '',
+        'description': course.get('description') or '',
+        'keywords': ' '.join(keywords)
+    }
+
+class InterestIndex:
+    def __init__(self, courses, field_weights=None, k1=1.2, b=0.75):
+        self.courses = list(courses)
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self.k1 = k1
+        self._doc_ids = {id(course): doc for doc, course in enumerate(self.courses)}
+
+        term_freqs = []
+        doc_lengths = []
+        for course in self.courses:
+            freqs = {}
+            length = 0.0
+            for field, text in course_fields(course).items():
+                weight = self.field_weights.get(field, 1.0)
+                for token in tokenize(text):
+                    term = stem(token)
+                    freqs[term] = freqs.get(term, 0.0) + weight
+                    length += weight
+            term_freqs.append(freqs)
+            doc_lengths.append(length)
+
+        n = len(self.courses)
+        avg_length = (sum(doc_lengths) / n) if n else 0.0
+
+        # BM25 term-frequency saturation depends only on the document, so it is
+        # folded into the posting weight here and queries just multiply by idf.
+        # The same weights are kept per document for scoring one course at a time.
+        self.postings = {}
+        self.doc_weights = []
+        for doc, freqs in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * doc_lengths[doc] / avg_length) if avg_length else k1
+            weights = {term: tf * (k1 + 1) / (tf + norm) for term, tf in freqs.items()}
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((doc, weight))
+            self.doc_weights.append(weights)
+
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.courses)
+
+    def doc_ids(self, courses):
+        """Map course objects from this index back to doc ids; None if any course isn't indexed"""
+        ids = set()
+        for course in courses:
+            doc = self._doc_ids.get(id(course))
+            if doc is None:
+                return None
+            ids.add(doc)
+        return ids
+
+    def score(self, interests, candidates=None):
+        """Return ({doc_id: score}, {doc_id: matched_words}) for every doc hit by the query.
+
+        `candidates` optionally restricts scoring to a set of doc ids.
+        """
+        scores = {}
+        matched = {}
+        for term, word in query_terms(interests):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc, weight in postings:
+                if candidates is not None and doc not in candidates:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + idf * weight
+                matched.setdefault(doc, []).append(word)
+        return scores, matched
+
+    def course_score(self, course, terms):
+        """(score, matched_words) of one indexed course for `terms` from query_terms, or None if nothing matched"""
+        doc = self._doc_ids.get(id(course))
+        if doc is None:
+            return None
+        weights = self.doc_weights[doc]
+        score = 0.0
+        words = []
+        for term, word in terms:
+            weight = weights.get(term)
+            if weight is not None:
+                score += self.idf[term] * weight
+                words.append(word)
+        return (score, words) if words else None
+
+    def max_score(self, terms):
+        """Upper bound on any course's score for `terms` (tf saturation tops out at k1 + 1)"""
+        return sum(self.idf.get(term, 0.0) for term, _ in terms) * (self.k1 + 1)
+
+    def search(self, interests, candidates=None, limit=None):
+        """Return [(doc_id, score, matched_words)] best first, ties in catalog order"""
+        scores, matched = self.score(interests, candidates)
+        rank_key = lambda doc: (-scores[doc], doc)
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, scores, key=rank_key)
+        else:
+            ranked = sorted(scores, key=rank_key)
+        return [(doc, scores[doc], matched[doc]) for doc in ranked]
+
+def search_courses(interests, courses, index=None, limit=None):
+    """Search `courses` using `index` when they all come from it, else a throwaway index.
+
+    Returns [(course, score, matched_words)] best first.
+    """
+    candidates = index.doc_ids(courses) if index is not None else None
+    if candidates is None:
+        index = InterestIndex(courses)
+    results = index.search(interests, candidates=candidates, limit=limit)
+    return [(index.courses[doc], score, words) for doc, score, words in results]
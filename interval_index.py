@@ -0,0 +1,153 @@
+"""
+Per-day interval index over catalog meeting times.
+
+Meetings are grouped by weekday and kept in start-sorted arrays. A busy
+interval only has to look at meetings that start inside a window of
+(busy length + longest meeting) around it, so finding what a schedule
+conflicts with costs O(schedule * log catalog) plus the size of the answer,
+rather than a pass over the whole catalog. The same arrays answer the
+inverse question, which courses fit entirely inside a set of free windows,
+with one bisect per window.
+
+Conflicts are decided on the same 5-minute slots as the weekly bitmasks in
+time_slots (meetings rounded outwards), so the index, CourseArrays and the
+conflict matrix always agree. Fitting inside a free window uses the same grid,
+with the window rounded inwards, so nothing found in the gaps of a schedule
+can then be reported as clashing with it.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from time_slots import free_slot_bounds, meeting_times, slot_bounds
+
+# Window searched for free time when a schedule doesn't say otherwise
+DAY_START = 8 * 60
+DAY_END = 22 * 60
+WEEKDAYS = range(5)
+
+def meeting_intervals(course):
+    """Return (day, start_minute, end_minute) tuples for a course or schedule entry"""
+    days, start, end = meeting_times(course)
+    if start is None or end is None or end <= start:
+        return []
+    return [(day, start, end) for day in days]
+
+def free_gaps(current_schedule, days=WEEKDAYS, day_start=DAY_START, day_end=DAY_END):
+    """{day: [(start, end)]} of the open stretches between the schedule's meetings"""
+    busy = {day: [] for day in days}
+    for entry in current_schedule or []:
+        for day, start, end in meeting_intervals(entry):
+            if day in busy:
+                busy[day].append((start, end))
+
+    gaps = {}
+    for day, intervals in busy.items():
+        gaps[day] = []
+        free_from = day_start
+        for start, end in sorted(intervals):
+            if start > free_from:
+                gaps[day].append((free_from, min(start, day_end)))
+            free_from = max(free_from, end)
+            if free_from >= day_end:
+                break
+        if free_from < day_end:
+            gaps[day].append((free_from, day_end))
+        gaps[day] = [(start, end) for start, end in gaps[day] if end > start]
+    return gaps
+
+class MeetingIntervalIndex:
+    def __init__(self, courses, meetings=None):
+        """Index `courses`; `meetings` optionally gives each course's already parsed (day, start, end) list"""
+        self.courses = courses if isinstance(courses, Sequence) else list(courses)
+        self.slot_starts = [[] for _ in range(7)]
+        self.slot_ends = [[] for _ in range(7)]
+        self.ids = [[] for _ in range(7)]
+        self.max_slots = [0] * 7
+        self.meeting_counts = [0] * len(self.courses)
+
+        if meetings is None:
+            meetings = map(meeting_intervals, self.courses)
+        by_day = [[] for _ in range(7)]
+        for course_id, course_meetings in enumerate(meetings):
+            for day, start, end in course_meetings:
+                by_day[day].append((start, end, course_id))
+                self.meeting_counts[course_id] += 1
+
+        for day in range(7):
+            by_day[day].sort()
+            for start, end, course_id in by_day[day]:
+                first, last = slot_bounds(start, end)
+                self.slot_starts[day].append(first)
+                self.slot_ends[day].append(last)
+                self.ids[day].append(course_id)
+                self.max_slots[day] = max(self.max_slots[day], last - first)
+
+    @classmethod
+    def from_columns(cls, courses, day_masks, starts, ends):
+        """Index parallel weekday-bitmask/start/end columns (e.g. a compiled catalog's) without reading `courses`"""
+        meetings = [
+            [(day, start, end) for day in range(7) if day_mask >> day & 1] if 0 <= start < end else []
+            for day_mask, start, end in zip(day_masks, starts, ends)
+        ]
+        return cls(courses, meetings)
+
+    def __len__(self):
+        return len(self.courses)
+
+    def overlapping(self, day, start, end):
+        """Yield ids of courses meeting on `day` that share a time slot with [start, end)"""
+        first, last = slot_bounds(start, end)
+        starts = self.slot_starts[day]
+        ends = self.slot_ends[day]
+        ids = self.ids[day]
+        # A meeting can only reach past `first` if it began less than max_slots before it
+        lo = bisect_right(starts, first - self.max_slots[day])
+        hi = bisect_left(starts, last)
+        for j in range(lo, hi):
+            if ends[j] > first:
+                yield ids[j]
+
+    def within(self, day, start, end):
+        """Yield ids of courses meeting on `day` entirely inside the slots of [start, end)"""
+        first, last = free_slot_bounds(start, end)
+        starts = self.slot_starts[day]
+        ends = self.slot_ends[day]
+        ids = self.ids[day]
+        for j in range(bisect_left(starts, first), bisect_right(starts, last)):
+            if ends[j] <= last:
+                yield ids[j]
+
+    def ids_within(self, windows):
+        """Ids of courses whose every meeting falls inside one of the {day: [(start, end)]} windows"""
+        inside = {}
+        for day, day_windows in windows.items():
+            for start, end in day_windows:
+                for course_id in self.within(day, start, end):
+                    inside[course_id] = inside.get(course_id, 0) + 1
+        return sorted(i for i, count in inside.items() if count == self.meeting_counts[i])
+
+    def courses_within(self, windows):
+        """Courses that fit entirely inside the free windows, in catalog order"""
+        return [self.courses[i] for i in self.ids_within(windows)]
+
+    def conflicting_ids(self, current_schedule):
+        """Set of course ids that conflict with any entry in the schedule"""
+        conflicting = set()
+        for entry in current_schedule or []:
+            for day, start, end in meeting_intervals(entry):
+                conflicting.update(self.overlapping(day, start, end))
+        return conflicting
+
+    def compatible_ids(self, current_schedule):
+        """Ids of courses that fit the schedule, in catalog order"""
+        conflicting = self.conflicting_ids(current_schedule)
+        if not conflicting:
+            return range(len(self.courses))
+        return [i for i in range(len(self.courses)) if i not in conflicting]
+
+    def compatible_courses(self, current_schedule):
+        """Courses that fit the schedule, in catalog order"""
+        conflicting = self.conflicting_ids(current_schedule)
+        if not conflicting:
+            return list(self.courses)
+        return [c for i, c in enumerate(self.courses) if i not in conflicting]
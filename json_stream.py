@@ -0,0 +1,78 @@
+"""
+Incremental parsing of a streamed JSON array of objects.
+
+A model streaming {"recommendations": [{...}, {...}]} sends the text a few
+characters at a time. JsonArrayStreamParser tracks string/escape state and
+brace depth across chunks and emits each element object of the named array as
+soon as its closing brace arrives, instead of waiting for the whole document.
+Text before the array (preambles, code fences) is ignored.
+"""
+
+import json
+
+class JsonArrayStreamParser:
+    def __init__(self, array_key='recommendations'):
+        self.array_key = array_key
+        self._buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+
+    def feed(self, text):
+        """Add streamed text; return the list of element objects completed by it"""
+        self._buffer += text
+        completed = []
+        if self._done:
+            return completed
+
+        if not self._in_array:
+            key_at = self._buffer.find(f'"{self.array_key}"')
+            bracket_at = self._buffer.find('[', key_at) if key_at != -1 else -1
+            if bracket_at == -1:
+                return completed
+            self._in_array = True
+            self._pos = bracket_at + 1
+
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if self._depth == 0 and ch == '{':
+                    self._object_start = i
+                self._depth += 1
+            elif ch in '}]':
+                if self._depth == 0:
+                    # Closing bracket of the array itself
+                    self._done = True
+                    self._pos = i + 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._object_start is not None:
+                    try:
+                        completed.append(json.loads(buffer[self._object_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._object_start = None
+        else:
+            self._pos = len(buffer)
+
+        # Everything before an open element can be dropped
+        keep_from = self._object_start if self._object_start is not None else self._pos
+        self._buffer = buffer[keep_from:]
+        self._pos -= keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return completed
@@ -0,0 +1,136 @@
+"""
+Bundled Knowledge Base export: compressed JSONL shards plus an offsets index.
+
+Instead of one tiny JSON file (and one S3 object) per course, documents are
+streamed as JSON lines into blocks of about `block_bytes`, each block is
+gzip-compressed on its own (a BGZF-style multi-member gzip file), and blocks
+are appended to shards of at most `max_shard_bytes`. `index.json` records,
+per document, its shard, the byte range of its compressed block and its line
+within the block, so a single course costs one ranged read of one block.
+A shard is still a valid .jsonl.gz file for any gzip reader, but not a
+format Bedrock Knowledge Base ingestion reads, so shards are synced under
+their own S3 prefix (SHARDS_PREFIX), outside the Knowledge Base data source.
+
+Compression uses mtime=0, so an unchanged catalog produces byte-identical
+shards and the content-hashed sync only re-uploads shards that changed.
+"""
+
+import gzip
+import json
+import os
+
+INDEX_NAME = 'index.json'
+INDEX_FORMAT = 1
+DEFAULT_BLOCK_BYTES = 64 * 1024
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+SHARDS_PREFIX = 'coursematch-shards/'
+
+def shard_name(number):
+    return f"shard-{number:05d}.jsonl.gz"
+
+def write_shards(documents, output_dir, max_shard_bytes=DEFAULT_SHARD_BYTES, block_bytes=DEFAULT_BLOCK_BYTES,
+                 suffix=''):
+    """Stream `documents` into compressed shards and write their index.
+
+    Files are written as `<name><suffix>` so callers can stage them and swap
+    them in; returns the index dict (shard names without the suffix).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shards = []
+    entries = []
+    state = {'file': None}
+    block = bytearray()
+    pending = []
+
+    def open_shard():
+        if state['file'] is not None:
+            state['file'].close()
+        shards.append({'name': shard_name(len(shards)), 'bytes': 0, 'documents': 0})
+        state['file'] = open(os.path.join(output_dir, shards[-1]['name'] + suffix), 'wb')
+
+    def flush_block():
+        data = gzip.compress(bytes(block), mtime=0)
+        shard = shards[-1] if shards else None
+        if shard is None or (shard['bytes'] and shard['bytes'] + len(data) > max_shard_bytes):
+            open_shard()
+            shard = shards[-1]
+        offset = shard['bytes']
+        state['file'].write(data)
+        shard['bytes'] += len(data)
+        shard['documents'] += len(pending)
+        for course_id, line_offset, line_length in pending:
+            entries.append([course_id, len(shards) - 1, offset, len(data), line_offset, line_length])
+        block.clear()
+        pending.clear()
+
+    for doc in documents:
+        line = json.dumps(doc, separators=(',', ':')).encode('utf-8') + b'\n'
+        if block and len(block) + len(line) > block_bytes:
+            flush_block()
+        pending.append((doc.get('course_id', ''), len(block), len(line)))
+        block.extend(line)
+    if block:
+        flush_block()
+    if state['file'] is not None:
+        state['file'].close()
+
+    index = {'format': INDEX_FORMAT, 'block_bytes': block_bytes, 'shards': shards, 'documents': entries}
+    with open(os.path.join(output_dir, INDEX_NAME + suffix), 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return index
+
+def local_range_reader(directory):
+    """read_range(name, offset, length) over export files in a local directory; length None reads to the end"""
+    def read_range(name, offset, length):
+        with open(os.path.join(directory, name), 'rb') as f:
+            f.seek(offset)
+            return f.read(-1 if length is None else length)
+    return read_range
+
+def s3_range_reader(s3, bucket_name, s3_prefix=SHARDS_PREFIX):
+    """read_range(name, offset, length) using ranged GETs on a synced export"""
+    def read_range(name, offset, length):
+        end = '' if length is None else offset + length - 1
+        response = s3.get_object(Bucket=bucket_name, Key=f"{s3_prefix}{name}", Range=f"bytes={offset}-{end}")
+        return response['Body'].read()
+    return read_range
+
+class ShardedDocuments:
+    def __init__(self, directory="knowledge_base_shards", read_range=None):
+        """Open an export's index; `read_range` defaults to the files in `directory`"""
+        self.directory = directory
+        self.read_range = read_range or local_range_reader(directory)
+        index = json.loads(self.read_range(INDEX_NAME, 0, None))
+        if index['format'] != INDEX_FORMAT:
+            raise ValueError(f"{directory} has shard index format {index['format']}, expected {INDEX_FORMAT}")
+        self.index = index
+        self.shards = index['shards']
+        self.entries = index['documents']
+        self._positions = {entry[0]: position for position, entry in enumerate(self.entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, course_id):
+        return course_id in self._positions
+
+    def read(self, position):
+        """Document at catalog position `position`, decompressing only its block"""
+        _, shard, block_offset, block_length, line_offset, line_length = self.entries[position]
+        block = gzip.decompress(self.read_range(self.shards[shard]['name'], block_offset, block_length))
+        return json.loads(block[line_offset:line_offset + line_length])
+
+    def get(self, course_id):
+        """Document for a course_id, or None"""
+        position = self._positions.get(course_id)
+        return self.read(position) if position is not None else None
+
+    def __iter__(self):
+        """Every document in catalog order, one compressed block in memory at a time"""
+        current = None
+        block = b''
+        for _, shard, block_offset, block_length, line_offset, line_length in self.entries:
+            if (shard, block_offset) != current:
+                current = (shard, block_offset)
+                block = gzip.decompress(self.read_range(self.shards[shard]['name'], block_offset, block_length))
+            yield json.loads(block[line_offset:line_offset + line_length])
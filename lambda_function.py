@@ -1,7 +1,14 @@
 import json
 import boto3
-from course_data import get_sample_courses
-from schedule_parser import check_schedule_conflicts, parse_schedule_text
+from candidate_pipeline import conflict_filter, interest_scorer, select_top
+from course_data import get_catalog, get_code_index, get_course_index, get_interest_index
+from itertools import islice
+from schedule_generator import generate_schedules, interest_ranked_pool
+from schedule_optimizer import DEFAULT_BUDGET_MS, interest_relevance, optimize_schedule
+from schedule_parser import parse_schedule
+
+# Keep optimizer runs well inside the action group's response window
+MAX_BUDGET_MS = 2000
 
 def lambda_handler(event, context):
     """
@@ -28,29 +35,47 @@ def lambda_handler(event, context):
                 parameters[param['name']] = param['value']
         
         interests = parameters.get('interests', '')
-        schedule_text = parameters.get('schedule', '')
+        # Follow-up turns leave the schedule out; the app keeps it in the session attributes
+        schedule_text = parameters.get('schedule') or event.get('sessionAttributes', {}).get('schedule', '')
         
         # Parse current schedule
         current_schedule = []
         if schedule_text:
-            current_schedule = parse_schedule_text(schedule_text)
-        
-        # Get available courses
-        available_courses = get_sample_courses()
-        
-        # Filter courses by schedule conflicts
-        compatible_courses = []
-        for course in available_courses:
-            if not current_schedule or not check_schedule_conflicts(current_schedule, course):
-                compatible_courses.append(course)
-        
-        # Simple interest matching
-        recommendations = match_courses_by_interests(interests, compatible_courses)
+            current_schedule = parse_schedule(schedule_text, code_index=get_code_index())['courses']
+        
+        if api_path == '/optimize-schedule':
+            # Best weekly layout found within a fixed time budget
+            compatible = get_course_index().compatible_courses(current_schedule)
+            pool = schedule_pool(interests, compatible, parameters.get('courses', ''))
+            result = optimize_schedule(
+                pool,
+                int(parameters.get('count') or 3),
+                current_schedule,
+                relevance=interest_relevance(interests, pool, index=get_interest_index()),
+                budget_ms=min(int(parameters.get('budget_ms') or DEFAULT_BUDGET_MS), MAX_BUDGET_MS)
+            )
+            body = format_optimized_schedule_for_agent(result, interests)
+        elif api_path == '/generate-schedules':
+            # Whole conflict-free schedules built from desired or interest-ranked courses
+            compatible = get_course_index().compatible_courses(current_schedule)
+            schedules = build_schedules(
+                interests,
+                current_schedule,
+                compatible,
+                desired=parameters.get('courses', ''),
+                count=int(parameters.get('count') or 3),
+                limit=int(parameters.get('limit') or 3)
+            )
+            body = format_schedules_for_agent(schedules, interests)
+        else:
+            # Simple interest matching, streamed over the catalog
+            recommendations = match_courses_by_interests(interests, current_schedule)
+            body = format_recommendations_for_agent(recommendations, interests)
         
         # Format response for agent
         response_body = {
             "TEXT": {
-                "body": format_recommendations_for_agent(recommendations, interests)
+                "body": body
             }
         }
         
@@ -75,40 +100,74 @@ def lambda_handler(event, context):
         
         return error_response
 
-def match_courses_by_interests(interests, courses):
-    """Simple keyword-based course matching"""
+def match_courses_by_interests(interests, current_schedule, limit=5):
+    """BM25 keyword course matching as a conflict filter -> scorer -> top-k pipeline over the catalog"""
+    scorer, max_score = interest_scorer(interests, get_interest_index())
+    stages = [conflict_filter(current_schedule, get_course_index()), scorer]
     if not interests:
-        return courses[:3]  # Return top 3 if no interests specified
+        # Return top 3 if no interests specified
+        return [course for course, _, _ in select_top(get_catalog(), stages, 3, max_score)]
     
-    interest_words = interests.lower().split()
-    scored_courses = []
+    results = select_top(get_catalog(), stages, limit, max_score)
+    if not results:
+        return []
     
-    for course in courses:
-        score = 0
-        matches = []
-        
-        # Check against keywords
-        for keyword in course.get('keywords', []):
-            for interest in interest_words:
-                if interest in keyword.lower() or keyword.lower() in interest:
-                    score += 2
-                    matches.append(keyword)
-        
-        # Check against title and description
-        searchable_text = f"{course.get('title', '')} {course.get('description', '')}".lower()
-        for interest in interest_words:
-            if interest in searchable_text:
-                score += 1
-                matches.append(interest)
-        
-        if score > 0:
-            course['match_score'] = score
-            course['match_reasons'] = list(set(matches))
-            scored_courses.append(course)
+    # Scale to the /10 score shown to the agent, relative to the best match
+    best_score = results[0][1]
+    return [
+        dict(course, match_score=round(10 * score / best_score, 1), match_reasons=matches)
+        for course, score, matches in results
+    ]
+
+def schedule_pool(interests, compatible, desired=''):
+    """Candidate courses for schedule building: the desired codes if given, else the best interest matches"""
+    if desired:
+        code_index = get_code_index()
+        wanted = {id(course) for code in desired.split(',') for course in code_index.all(code)}
+        return [c for c in compatible if id(c) in wanted]
+    return interest_ranked_pool(interests, compatible, index=get_interest_index())
+
+def build_schedules(interests, current_schedule, compatible, desired='', count=3, limit=3):
+    """First `limit` conflict-free sets of `count` courses, from the desired codes or best interest matches"""
+    pool = schedule_pool(interests, compatible, desired)
+    return list(islice(generate_schedules(pool, count, current_schedule), limit))
+
+def meeting_and_units(course):
+    """"TuTh 3:00-4:30, 4 units" for a schedule line; courses without a time or credits say so"""
+    credits = course.get('credits')
+    units = f"{credits} units" if credits is not None else "units not listed"
+    return f"{course.get('time', 'TBA')}, {units}"
+
+def format_optimized_schedule_for_agent(result, interests):
+    """Format the optimizer's best layout for the agent response"""
+    if not result['courses']:
+        return "I couldn't build a conflict-free schedule from those courses. Try fewer courses or a different set."
+    
+    breakdown = result['breakdown']
+    response = f"Here is the most compact schedule I found for '{interests}':\n\n"
+    for course in result['courses']:
+        response += f"   - **{course['code']} - {course['title']}** ({meeting_and_units(course)})\n"
+    response += (f"\nOn campus {breakdown['campus_days']} days, {breakdown['gap_hours']:.1f} hours of gaps, "
+                 f"{breakdown['early_hours']:.1f} hours before 9am, "
+                 f"{breakdown['no_lunch']} days without a lunch break.\n")
+    if not result['optimal']:
+        response += "(Best option found within the time limit.)\n"
+    
+    return response
+
+def format_schedules_for_agent(schedules, interests):
+    """Format generated schedules for the agent response"""
+    if not schedules:
+        return "I couldn't build a conflict-free schedule from those courses. Try fewer courses or a different set."
+    
+    response = f"Here are conflict-free schedule options based on '{interests}':\n\n"
+    for i, schedule in enumerate(schedules, 1):
+        response += f"Option {i}:\n"
+        for course in schedule:
+            response += f"   - **{course['code']} - {course['title']}** ({meeting_and_units(course)})\n"
+        response += f"   Total: {sum(c.get('credits', 0) for c in schedule)} units\n\n"
     
-    # Sort by score and return top matches
-    scored_courses.sort(key=lambda x: x['match_score'], reverse=True)
-    return scored_courses[:5]
+    return response
 
 def format_recommendations_for_agent(recommendations, interests):
     """Format course recommendations for the agent response"""
@@ -119,11 +178,11 @@ def format_recommendations_for_agent(recommendations, interests):
     
     for i, course in enumerate(recommendations, 1):
         response += f"{i}. **{course['code']} - {course['title']}**\n"
-        response += f"   Time: {course['time']}\n"
-        response += f"   Credits: {course['credits']} units\n"
-        response += f"   Difficulty: {course['difficulty']}\n"
-        response += f"   GE Area: {course['ge_area']}\n"
-        response += f"   Description: {course['description']}\n"
+        response += f"   Time: {course.get('time', 'TBA')}\n"
+        response += f"   Credits: {course.get('credits', 'N/A')} units\n"
+        response += f"   Difficulty: {course.get('difficulty', 'N/A')}\n"
+        response += f"   GE Area: {course.get('ge_area', 'N/A')}\n"
+        response += f"   Description: {course.get('description', '')}\n"
         
         if course.get('match_reasons'):
             response += f"   Why it matches: This course aligns with your interest in {', '.join(course['match_reasons'])}\n"
@@ -0,0 +1,234 @@
+"""
+Offline semantic retrieval over the Knowledge Base course documents.
+
+An alternative to the Bedrock Knowledge Base round trip: the same documents
+produced by csv_to_knowledge_base (read from the CSV or a sharded export) are embedded with a local encoder, kept as
+one contiguous float32 matrix, and queried with a batched matrix product and
+a top-k per query. No network access is needed at build or query time.
+
+Encoders are pluggable; anything with fit(texts) and encode(texts) that
+returns unit-length rows works. Two are provided:
+- HashingEncoder: stateless hashed word + character n-gram features (default)
+- TfidfSvdEncoder: TF-IDF over the corpus vocabulary reduced with an SVD
+"""
+
+import json
+import os
+import zlib
+import numpy as np
+from interest_index import stem, tokenize
+from time_slots import course_mask, schedule_mask
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class HashingEncoder:
+    name = 'hashing'
+
+    def __init__(self, dim=1024, ngram_range=(3, 5)):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+
+    def features(self, text):
+        """Word stems plus character n-grams of each word, so partial words still land nearby"""
+        feats = []
+        for token in tokenize(text):
+            term = stem(token)
+            feats.append('w:' + term)
+            padded = f"<{term}>"
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                feats.extend('c:' + padded[i:i + n] for i in range(len(padded) - n + 1))
+        return feats
+
+    def fit(self, texts):
+        return self
+
+    def encode(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feat in self.features(text):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(feat.encode('utf-8'))
+                matrix[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        # Sublinear term frequency keeps long descriptions from dominating
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return _normalize_rows(matrix).astype(np.float32)
+
+    def config(self):
+        return {'dim': self.dim, 'ngram_range': list(self.ngram_range)}
+
+    def state(self):
+        return {}
+
+    @classmethod
+    def restore(cls, config, state):
+        return cls(**config)
+
+class TfidfSvdEncoder:
+    name = 'tfidf_svd'
+
+    def __init__(self, dim=128, max_features=4096, chunk_size=4096):
+        self.dim = dim
+        self.max_features = max_features
+        self.chunk_size = chunk_size
+        self.vocabulary = {}
+        self.idf = None
+        self.components = None
+
+    def _tfidf(self, texts):
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                col = self.vocabulary.get(stem(token))
+                if col is not None:
+                    matrix[row, col] += 1.0
+        return _normalize_rows(np.log1p(matrix) * self.idf)
+
+    def fit(self, texts):
+        doc_freq = {}
+        for text in texts:
+            for term in {stem(token) for token in tokenize(text)}:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+        terms = sorted(doc_freq, key=lambda t: (-doc_freq[t], t))[:self.max_features]
+        self.vocabulary = {term: col for col, term in enumerate(terms)}
+        n = len(texts)
+        self.idf = np.array([np.log((1 + n) / (1 + doc_freq[t])) + 1 for t in terms], dtype=np.float32)
+
+        # Right singular vectors from the (vocab x vocab) Gram matrix, accumulated
+        # in chunks so the full document-term matrix never has to exist at once
+        gram = np.zeros((len(terms), len(terms)), dtype=np.float64)
+        for start in range(0, n, self.chunk_size):
+            block = self._tfidf(texts[start:start + self.chunk_size])
+            gram += block.T @ block
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        top = np.argsort(eigenvalues)[::-1][:self.dim]
+        self.components = np.ascontiguousarray(eigenvectors[:, top], dtype=np.float32)
+        return self
+
+    def encode(self, texts):
+        rows = [self._tfidf(texts[i:i + self.chunk_size]) @ self.components
+                for i in range(0, len(texts), self.chunk_size)]
+        if not rows:
+            return np.zeros((0, self.components.shape[1]), dtype=np.float32)
+        return _normalize_rows(np.vstack(rows)).astype(np.float32)
+
+    def config(self):
+        return {'dim': self.dim, 'max_features': self.max_features, 'chunk_size': self.chunk_size}
+
+    def state(self):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        return {'terms': np.array(terms), 'idf': self.idf, 'components': self.components}
+
+    @classmethod
+    def restore(cls, config, state):
+        encoder = cls(**config)
+        encoder.vocabulary = {str(term): col for col, term in enumerate(state['terms'])}
+        encoder.idf = state['idf']
+        encoder.components = state['components']
+        return encoder
+
+ENCODERS = {cls.name: cls for cls in (HashingEncoder, TfidfSvdEncoder)}
+
+class LocalRetrievalIndex:
+    def __init__(self, documents, encoder=None, embeddings=None):
+        self.documents = list(documents)
+        self.encoder = encoder or HashingEncoder()
+        if embeddings is None:
+            texts = [doc.get('full_text', '') for doc in self.documents]
+            embeddings = self.encoder.fit(texts).encode(texts)
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self._slot_masks = None
+
+    @classmethod
+    def from_csv(cls, csv_file_path="ucla_courses.csv", encoder=None):
+        """Embed the documents csv_to_knowledge_base would produce for this CSV"""
+        from csv_to_knowledge_base import build_course_documents
+        return cls(build_course_documents(csv_file_path), encoder)
+
+    @classmethod
+    def from_courses(cls, courses, encoder=None):
+        """Embed Knowledge Base-style documents for already loaded catalog courses (e.g. course_data.get_catalog())"""
+        from csv_to_knowledge_base import course_document, with_section_ids
+        return cls([course_document(course, course_id) for course_id, course in with_section_ids(courses)], encoder)
+
+    @classmethod
+    def from_shards(cls, directory="knowledge_base_shards", encoder=None):
+        """Embed the documents of a bundled (sharded) csv_to_knowledge_base export"""
+        from kb_shards import ShardedDocuments
+        return cls(ShardedDocuments(directory), encoder)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def compatible_mask(self, current_schedule):
+        """Boolean mask of documents whose meeting times fit the schedule"""
+        if self._slot_masks is None:
+            self._slot_masks = [course_mask(doc) for doc in self.documents]
+        busy = schedule_mask(current_schedule)
+        return np.fromiter((not mask & busy for mask in self._slot_masks), dtype=bool, count=len(self.documents))
+
+    def search_batch(self, queries, k=5, candidates=None):
+        """Return one [(document, score)] list per query, best first.
+
+        `candidates` optionally restricts results to a boolean mask over documents.
+        """
+        if not queries or not self.documents:
+            return [[] for _ in queries]
+
+        scores = self.encoder.encode(list(queries)) @ self.embeddings.T
+        if candidates is not None:
+            scores[:, ~np.asarray(candidates, dtype=bool)] = -np.inf
+
+        k = min(k, len(self.documents))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, cols in enumerate(top):
+            cols = cols[np.argsort(-scores[row, cols], kind='stable')]
+            results.append([(self.documents[c], float(scores[row, c]))
+                            for c in cols if np.isfinite(scores[row, c])])
+        return results
+
+    def search(self, query, k=5, candidates=None):
+        """Return [(document, score)] for a single query, best first"""
+        return self.search_batch([query], k, candidates)[0]
+
+    def save(self, directory):
+        """Write the embedding matrix, documents and encoder state to a directory"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'embeddings.npy'), self.embeddings)
+        np.savez(os.path.join(directory, 'encoder.npz'), **self.encoder.state())
+        with open(os.path.join(directory, 'index.json'), 'w') as f:
+            json.dump({
+                'encoder': self.encoder.name,
+                'encoder_config': self.encoder.config(),
+                'documents': self.documents
+            }, f)
+
+    @classmethod
+    def load(cls, directory):
+        """Load a saved index; the embedding matrix is memory-mapped, not read"""
+        with open(os.path.join(directory, 'index.json')) as f:
+            meta = json.load(f)
+        with np.load(os.path.join(directory, 'encoder.npz')) as state:
+            encoder = ENCODERS[meta['encoder']].restore(meta['encoder_config'], dict(state))
+        embeddings = np.load(os.path.join(directory, 'embeddings.npy'), mmap_mode='r')
+        return cls(meta['documents'], encoder, embeddings)
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    query = " ".join(sys.argv[1:]) or "ethics of artificial intelligence"
+    for encoder in (HashingEncoder(), TfidfSvdEncoder(dim=32)):
+        start = time.perf_counter()
+        index = LocalRetrievalIndex.from_csv(encoder=encoder)
+        built = time.perf_counter()
+        results = index.search(query)
+        done = time.perf_counter()
+
+        print(f"{encoder.name}: built {len(index)} docs in {(built - start) * 1000:.1f} ms, "
+              f"query in {(done - built) * 1000:.2f} ms")
+        for doc, score in results:
+            print(f"   {score:.3f}  {doc['course_code']} - {doc['title']}")
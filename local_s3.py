@@ -0,0 +1,79 @@
+"""
+Offline stand-in for the S3 client.
+
+LocalS3Client keeps objects as files under `root/<bucket>/<key>` and
+implements the calls the knowledge-base sync uses (upload_file, ranged
+get_object, delete_objects, list_objects_v2), so exports can be synced, read
+back and timed without AWS credentials. A fixed `latency` (seconds) is slept per call to model
+network time, and `failure_rate` makes that fraction of calls raise, to
+exercise the retry path.
+"""
+
+import io
+import os
+import random
+import shutil
+import threading
+import time
+
+class LocalS3Client:
+    def __init__(self, root="local_s3", latency=0.0, failure_rate=0.0, seed=0):
+        self.root = root
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("Simulated S3 failure")
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split('/'))
+
+    def upload_file(self, Filename, Bucket, Key):
+        self._call()
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+    def get_object(self, Bucket, Key, Range=None):
+        """Object body as a file-like 'Body'; `Range` accepts the "bytes=start-end" form"""
+        self._call()
+        with open(self._path(Bucket, Key), 'rb') as f:
+            if Range:
+                start, _, end = Range[len('bytes='):].partition('-')
+                f.seek(int(start))
+                data = f.read(int(end) - int(start) + 1 if end else -1)
+            else:
+                data = f.read()
+        return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+
+    def delete_objects(self, Bucket, Delete):
+        self._call()
+        deleted = []
+        for obj in Delete['Objects']:
+            try:
+                os.remove(self._path(Bucket, obj['Key']))
+            except FileNotFoundError:
+                pass  # S3 reports missing keys as deleted too
+            deleted.append({'Key': obj['Key']})
+        return {'Deleted': deleted}
+
+    def list_objects_v2(self, Bucket, Prefix=''):
+        self._call()
+        bucket_dir = os.path.join(self.root, Bucket)
+        contents = []
+        for directory, _, files in os.walk(bucket_dir):
+            for name in files:
+                key = os.path.relpath(os.path.join(directory, name), bucket_dir).replace(os.sep, '/')
+                if key.startswith(Prefix):
+                    contents.append({'Key': key, 'Size': os.path.getsize(os.path.join(directory, name))})
+        contents.sort(key=lambda obj: obj['Key'])
+        return {'Contents': contents, 'KeyCount': len(contents)}
@@ -0,0 +1,128 @@
+"""
+Token-budgeted prompt construction for LLM course ranking.
+
+Instead of pasting every compatible course into the prompt as indented JSON,
+candidates are pre-ranked with the local BM25 interest index and written as a
+compact pipe-separated table with short ids ("C1", "C2", ...). Rows are added
+best-first until the estimated token budget is spent, so prompt size stays
+flat no matter how large the catalog is. The model answers with the short ids,
+which decode_recommendations maps back to course codes.
+"""
+
+from interest_index import course_fields, search_courses
+from time_slots import DAY_ABBREVIATIONS, meeting_times
+
+# Rough English average for the Nova/Claude tokenizers; good enough for budgeting
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 3000
+DESCRIPTION_CHARS = 160
+TABLE_COLUMNS = ['id', 'code', 'title', 'meets', 'ge', 'level', 'credits', 'keywords', 'description']
+
+PROMPT_TEMPLATE = """You are a course recommendation system for UCLA students.
+
+Student Profile:
+- Interests: {interests}
+- Current Schedule: {schedule_summary}
+
+Available Courses (already filtered for schedule compatibility), one per line:
+{table}
+
+Task: Rank these courses by how well they match the student's interests. Consider:
+1. Semantic similarity between interests and course description/keywords
+2. Academic progression and complementary subjects
+3. Interdisciplinary connections
+
+Return ONLY valid JSON, using the course ids from the first column:
+{{"recommendations": [{{"id": "C1", "relevance_score": 0.95, "explanation": "Perfect match for linguistics interest.", "interest_matches": ["linguistics", "language"]}}]}}
+
+Rank all listed courses, highest relevance first."""
+
+def estimate_tokens(text):
+    """Approximate token count of a prompt string"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def _cell(value):
+    return str(value).replace('|', '/').replace('\n', ' ').strip()
+
+def meeting_summary(course):
+    """Compact "MWF 10:00-10:50" form of a course's meeting time"""
+    day_indices, start, end = meeting_times(course)
+    days = ''.join(DAY_ABBREVIATIONS[d] for d in day_indices)
+    if start is None or end is None:
+        return days or course.get('time', '')
+    return f"{days} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+def compact_course_row(short_id, course, description_chars=DESCRIPTION_CHARS):
+    """One table row for a course in either schema"""
+    fields = course_fields(course)
+    description = fields['description']
+    if len(description) > description_chars:
+        description = description[:description_chars].rsplit(' ', 1)[0] + '...'
+    keywords = course.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    return '|'.join(_cell(v) for v in (
+        short_id,
+        fields['code'],
+        fields['title'],
+        meeting_summary(course),
+        course.get('ge_area') or course.get('GE') or '',
+        course.get('difficulty', ''),
+        course.get('credits', ''),
+        ';'.join(keywords),
+        description
+    ))
+
+def rank_candidates(interests, courses, index=None):
+    """Courses ordered best-first by BM25 score, unmatched courses after in catalog order"""
+    ranked = [course for course, _, _ in search_courses(interests, courses, index=index)]
+    seen = {id(course) for course in ranked}
+    return ranked + [course for course in courses if id(course) not in seen]
+
+def build_ranking_prompt(interests, schedule_summary, courses, token_budget=DEFAULT_TOKEN_BUDGET,
+                         max_courses=None, index=None, description_chars=DESCRIPTION_CHARS):
+    """Build a ranking prompt that fits `token_budget`.
+
+    Returns a dict with the prompt text, the short id -> course mapping, the
+    estimated token count, and how many candidates were included vs. offered.
+    """
+    header = '|'.join(TABLE_COLUMNS)
+    base_tokens = estimate_tokens(PROMPT_TEMPLATE.format(
+        interests=interests, schedule_summary=schedule_summary, table=header
+    ))
+
+    rows = [header]
+    course_ids = {}
+    tokens = base_tokens
+    for course in rank_candidates(interests, courses, index):
+        if max_courses is not None and len(course_ids) >= max_courses:
+            break
+        short_id = f"C{len(course_ids) + 1}"
+        row = compact_course_row(short_id, course, description_chars)
+        row_tokens = estimate_tokens(row + '\n')
+        if tokens + row_tokens > token_budget and course_ids:
+            break
+        rows.append(row)
+        course_ids[short_id] = course
+        tokens += row_tokens
+
+    prompt = PROMPT_TEMPLATE.format(interests=interests, schedule_summary=schedule_summary, table='\n'.join(rows))
+    return {
+        "prompt": prompt,
+        "course_ids": course_ids,
+        "estimated_tokens": estimate_tokens(prompt),
+        "included": len(course_ids),
+        "candidates": len(courses)
+    }
+
+def decode_recommendations(parsed, course_ids):
+    """Replace short ids in a model response with course codes, dropping ids that weren't offered"""
+    decoded = []
+    for rec in parsed.get('recommendations', []):
+        course = course_ids.get(str(rec.get('id', '')).strip())
+        if course is None:
+            continue
+        rec = {k: v for k, v in rec.items() if k != 'id'}
+        rec['course_code'] = course_fields(course)['code']
+        decoded.append(rec)
+    return {"recommendations": decoded}
@@ -0,0 +1,102 @@
+"""
+Retry and circuit-breaker helpers for calls to Bedrock.
+
+retry_call re-runs a call that raised or returned None with "full jitter"
+exponential backoff (sleep a uniform random time up to base * 2**attempt,
+capped), so many clients retrying at once don't stampede the service, and
+never sleeps past an optional wall-clock deadline.
+
+CircuitBreaker counts consecutive failures. After `failure_threshold` in a
+row it opens and callers skip the service entirely for `reset_seconds`;
+then one trial call is let through (half-open) and its outcome closes or
+re-opens the breaker. With the breaker open a request costs nothing, which
+is what bounds tail latency during an outage.
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_RETRIES = 2
+DEFAULT_BASE_DELAY = 0.25
+DEFAULT_MAX_DELAY = 2.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_SECONDS = 30.0
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, rng=random):
+    """Full-jitter delay before retry number `attempt` (0-based)"""
+    return rng.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+def retry_call(call, retries=DEFAULT_RETRIES, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+               deadline=None, rng=random):
+    """Return call()'s first non-None result, retrying with jittered backoff; None if every attempt failed.
+
+    `deadline` is a time.monotonic() value after which no further attempt starts.
+    """
+    for attempt in range(retries + 1):
+        try:
+            result = call()
+            if result is not None:
+                return result
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed: {e}")
+        if attempt == retries:
+            break
+        delay = backoff_delay(attempt, base_delay, max_delay, rng)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            break
+        time.sleep(delay)
+    return None
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_seconds=DEFAULT_RESET_SECONDS,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """May a call go out now? In half-open state only one trial call is allowed at a time."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+            self.stats["successes"] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.trial_in_flight:
+                    self.stats["opened"] += 1
+                self.opened_at = self.clock()
+            self.trial_in_flight = False
@@ -0,0 +1,162 @@
+"""
+Two-tier cache for Bedrock responses.
+
+An in-memory LRU sits in front of an on-disk SQLite table. Both tiers honour
+a TTL; the disk tier is also bounded by entry count and total bytes, evicting
+the least recently used rows first. Keys are hashes of everything that can
+change the model's answer: the normalized interests, the set of candidate
+courses, and the model id + inference config.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.environ.get("COURSEMATCH_CACHE_PATH", "bedrock_cache.sqlite3")
+
+def normalize_interests(interests):
+    """Lowercase, strip punctuation and collapse whitespace so trivial edits share a key"""
+    return " ".join(re.findall(r"[a-z0-9]+", str(interests).lower()))
+
+def course_set_hash(course_codes):
+    """Order-independent hash of the candidate course codes"""
+    return hashlib.sha256("\n".join(sorted(course_codes)).encode("utf-8")).hexdigest()
+
+def make_cache_key(*parts):
+    """Stable key from JSON-serializable parts"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class LRUCache:
+    def __init__(self, max_entries=256, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=256, ttl_seconds=24 * 3600,
+                 max_disk_entries=10000, max_disk_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(memory_entries, ttl_seconds)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+
+    def get(self, key):
+        """Return the cached value or None"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value in both tiers"""
+        payload = json.dumps(value)
+        now = time.time()
+        self.memory.set(key, value)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(now)
+        self.stats["stores"] += 1
+
+    def _evict(self, now):
+        """Drop expired rows, then least recently used rows until under the size limits"""
+        expired = self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)).rowcount
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        evicted = 0
+        if count > self.max_disk_entries or total > self.max_disk_bytes:
+            for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall():
+                if count <= self.max_disk_entries and total <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                count -= 1
+                total -= size
+                evicted += 1
+        self.stats["evictions"] += expired + evicted
+
+    def hit_ratio(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.memory.clear()
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+_default_cache = None
+
+def get_response_cache():
+    """Process-wide response cache, opened on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
@@ -0,0 +1,119 @@
+"""
+Conflict-free K-course schedule generation.
+
+Candidates that clash with the student's current schedule are dropped, then
+the pairwise conflict relation of the remaining pool is computed once from
+the weekly slot masks (the per-day interval index only narrows the pairs to
+test) and stored as one integer bitset per course. A
+depth-first search keeps the set of still-allowed candidates as a bitset too,
+so adding a course is a single AND NOT, and a branch is abandoned as soon as
+fewer candidates remain than slots left to fill. Schedules are yielded lazily
+in candidate order, so with an interest-ranked pool the first results use the
+best matches and arrive without enumerating the rest.
+"""
+
+from interest_index import course_fields, search_courses
+from interval_index import MeetingIntervalIndex, meeting_intervals
+from time_slots import course_mask, schedule_mask
+
+DEFAULT_POOL_SIZE = 40
+
+def _popcount(bits):
+    return bin(bits).count('1')
+
+def _iter_bits(bits):
+    """Indices of set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def same_code_bitsets(courses):
+    """Per course, the bits of the other sections sharing its course code"""
+    by_code = {}
+    for i, course in enumerate(courses):
+        by_code.setdefault(course_fields(course)['code'].upper(), []).append(i)
+    bitsets = [0] * len(courses)
+    for sections in by_code.values():
+        if len(sections) > 1:
+            same = sum(1 << i for i in sections)
+            for i in sections:
+                bitsets[i] = same & ~(1 << i)
+    return bitsets
+
+def conflict_bitsets(courses):
+    """Per course, an int whose bit j is set when course j can't be taken with it.
+
+    Two courses conflict when their slot masks overlap, the same rule as
+    ConflictMatrix and CourseArrays, or they share a course code (two sections
+    of the same class).
+    """
+    index = MeetingIntervalIndex(courses)
+    masks = [course_mask(course) for course in courses]
+    bitsets = same_code_bitsets(courses)
+    for i, course in enumerate(courses):
+        for day, start, end in meeting_intervals(course):
+            for j in index.overlapping(day, start, end):
+                if j != i and masks[i] & masks[j]:
+                    bitsets[i] |= 1 << j
+    return bitsets
+
+def restrict_bitsets(bitsets, keep):
+    """Re-index bitsets onto the subset of positions in `keep`"""
+    restricted = []
+    for i in keep:
+        bits = bitsets[i]
+        restricted.append(sum(1 << p for p, j in enumerate(keep) if bits >> j & 1))
+    return restricted
+
+def pool_conflicts(candidates, current_schedule=None, conflicts=None):
+    """Candidates that fit the current schedule, with their conflict bitsets.
+
+    `conflicts` optionally gives precomputed time-conflict bitsets aligned with
+    `candidates` (e.g. ConflictMatrix.sub_bitsets); same-code sections are
+    always added on top.
+    """
+    busy = schedule_mask(current_schedule)
+    keep = [i for i, course in enumerate(candidates) if not course_mask(course) & busy]
+    pool = [candidates[i] for i in keep]
+    if conflicts is None:
+        return pool, conflict_bitsets(pool)
+    restricted = restrict_bitsets(conflicts, keep)
+    return pool, [a | b for a, b in zip(restricted, same_code_bitsets(pool))]
+
+def generate_schedules(candidates, k, current_schedule=None, conflicts=None):
+    """Lazily yield every conflict-free combination of `k` candidates as a list of courses.
+
+    Combinations come out in candidate order (lexicographic by position), so
+    pass candidates best-first. `conflicts` is as for pool_conflicts.
+    """
+    pool, conflicts = pool_conflicts(candidates, current_schedule, conflicts)
+    if k <= 0 or len(pool) < k:
+        return
+
+    def extend(chosen, allowed):
+        need = k - len(chosen)
+        if need == 0:
+            yield [pool[i] for i in chosen]
+            return
+        for i in _iter_bits(allowed):
+            later = allowed >> (i + 1) << (i + 1)
+            # Not enough candidates left after i to fill the remaining slots
+            if _popcount(later) + 1 < need:
+                return
+            chosen.append(i)
+            yield from extend(chosen, later & ~conflicts[i])
+            chosen.pop()
+
+    yield from extend([], (1 << len(pool)) - 1)
+
+def interest_ranked_pool(interests, courses, index=None, limit=DEFAULT_POOL_SIZE):
+    """Best-matching courses first, topped up in catalog order, at most `limit`"""
+    ranked = [course for course, _, _ in search_courses(interests, courses, index=index, limit=limit)] if interests else []
+    seen = {id(course) for course in ranked}
+    for course in courses:
+        if len(ranked) >= limit:
+            break
+        if id(course) not in seen:
+            ranked.append(course)
+    return ranked[:limit]
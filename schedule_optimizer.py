@@ -0,0 +1,171 @@
+"""
+Anytime weekly-layout optimizer.
+
+Picks `k` mutually compatible courses that minimize a weighted cost:
+- gap_hours:   idle hours between classes on the same day
+- early_hours: hours of class before `earliest_preferred` (no 8am classes)
+- campus_days: number of weekdays with at least one class
+- no_lunch:    days without a free `lunch_minutes` window inside the lunch period
+- relevance:   minus the summed interest relevance (0-1) of the chosen courses
+
+The current schedule's meetings count towards every term. The search is a
+depth-first branch-and-bound over candidates ordered by relevance, reusing
+the pairwise conflict bitsets from schedule_generator. Campus days, early
+hours and missing lunch breaks can only grow as courses are added, and the
+relevance still available is bounded by the best remaining candidates, so
+partial schedules whose bound can't beat the incumbent are cut. When the
+millisecond budget runs out the best schedule found so far is returned.
+"""
+
+import time
+from interest_index import search_courses
+from interval_index import meeting_intervals
+from schedule_generator import pool_conflicts, restrict_bitsets
+
+DEFAULT_WEIGHTS = {
+    'gap_hours': 1.0,
+    'early_hours': 2.0,
+    'campus_days': 1.5,
+    'no_lunch': 1.0,
+    'relevance': 3.0
+}
+DEFAULT_BUDGET_MS = 200
+EARLIEST_PREFERRED = 9 * 60
+LUNCH_WINDOW = (11 * 60, 14 * 60)
+LUNCH_MINUTES = 60
+
+def _day_meetings(meetings):
+    days = {}
+    for day, start, end in meetings:
+        days.setdefault(day, []).append((start, end))
+    for intervals in days.values():
+        intervals.sort()
+    return days
+
+def layout_breakdown(meetings, earliest_preferred=EARLIEST_PREFERRED,
+                     lunch_window=LUNCH_WINDOW, lunch_minutes=LUNCH_MINUTES):
+    """Unweighted objective terms for a list of (day, start, end) meetings"""
+    gap = early = no_lunch = 0
+    days = _day_meetings(meetings)
+    for intervals in days.values():
+        early += max(0, earliest_preferred - intervals[0][0])
+
+        busy_until = intervals[0][1]
+        for start, end in intervals[1:]:
+            if start > busy_until:
+                gap += start - busy_until
+            busy_until = max(busy_until, end)
+
+        # Longest free stretch inside the lunch period
+        free_from = lunch_window[0]
+        longest = 0
+        for start, end in intervals:
+            if end <= lunch_window[0] or start >= lunch_window[1]:
+                continue
+            longest = max(longest, start - free_from)
+            free_from = max(free_from, end)
+        longest = max(longest, lunch_window[1] - free_from)
+        if longest < lunch_minutes:
+            no_lunch += 1
+
+    return {
+        'gap_hours': gap / 60,
+        'early_hours': early / 60,
+        'campus_days': len(days),
+        'no_lunch': no_lunch
+    }
+
+def weighted_cost(breakdown, relevance, weights):
+    return sum(weights.get(term, 0.0) * value for term, value in breakdown.items()) \
+        - weights.get('relevance', 0.0) * relevance
+
+def interest_relevance(interests, courses, index=None):
+    """Relevance in [0, 1] per course from the BM25 matcher, aligned with `courses`"""
+    if not interests:
+        return [0.0] * len(courses)
+    results = search_courses(interests, courses, index=index)
+    best = results[0][1] if results else 0.0
+    by_id = {id(course): score / best for course, score, _ in results} if best else {}
+    return [by_id.get(id(course), 0.0) for course in courses]
+
+def optimize_schedule(candidates, k, current_schedule=None, relevance=None, weights=None,
+                      budget_ms=DEFAULT_BUDGET_MS, earliest_preferred=EARLIEST_PREFERRED, conflicts=None):
+    """Best `k`-course layout found within `budget_ms`.
+
+    `relevance` is an optional list of 0-1 scores aligned with `candidates`,
+    and `conflicts` optional precomputed bitsets as for generate_schedules.
+    Returns {"courses", "cost", "breakdown", "relevance", "optimal", "nodes", "elapsed_ms"};
+    "courses" is empty if no conflict-free combination exists.
+    """
+    started = time.perf_counter()
+    deadline = started + budget_ms / 1000
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    relevance = list(relevance) if relevance is not None else [0.0] * len(candidates)
+
+    # Most relevant first: good incumbents early make the bound bite sooner
+    order = sorted(range(len(candidates)), key=lambda i: -relevance[i])
+    courses, conflicts = pool_conflicts(
+        [candidates[i] for i in order],
+        current_schedule,
+        restrict_bitsets(conflicts, order) if conflicts is not None else None
+    )
+    relevance_of = {id(candidates[i]): relevance[i] for i in order}
+    scores = [relevance_of[id(course)] for course in courses]
+    meetings = [meeting_intervals(course) for course in courses]
+    fixed = [m for entry in current_schedule or [] for m in meeting_intervals(entry)]
+
+    def partial_bound(chosen_meetings, chosen_relevance, allowed, need):
+        terms = layout_breakdown(chosen_meetings, earliest_preferred)
+        # Gaps can shrink when a course fills them, so they don't count towards the bound
+        terms['gap_hours'] = 0
+        best_rest = 0.0
+        taken = 0
+        for i, score in enumerate(scores):
+            if taken == need:
+                break
+            if allowed >> i & 1:
+                best_rest += score
+                taken += 1
+        return weighted_cost(terms, chosen_relevance + best_rest, weights)
+
+    best = {'courses': [], 'cost': float('inf'), 'breakdown': {}, 'relevance': 0.0}
+    stats = {'nodes': 0, 'timed_out': False}
+
+    def search(chosen, chosen_meetings, chosen_relevance, allowed):
+        stats['nodes'] += 1
+        if time.perf_counter() > deadline:
+            stats['timed_out'] = True
+            return
+        need = k - len(chosen)
+        if need == 0:
+            breakdown = layout_breakdown(chosen_meetings, earliest_preferred)
+            cost = weighted_cost(breakdown, chosen_relevance, weights)
+            if cost < best['cost']:
+                best.update(courses=[courses[i] for i in chosen], cost=cost,
+                            breakdown=breakdown, relevance=chosen_relevance)
+            return
+        if bin(allowed).count('1') < need:
+            return
+        if partial_bound(chosen_meetings, chosen_relevance, allowed, need) >= best['cost']:
+            return
+
+        remaining = allowed
+        while remaining and not stats['timed_out']:
+            low = remaining & -remaining
+            i = low.bit_length() - 1
+            remaining ^= low
+            chosen.append(i)
+            search(chosen, chosen_meetings + meetings[i], chosen_relevance + scores[i],
+                   remaining & ~conflicts[i])
+            chosen.pop()
+
+    if k > 0:
+        search([], fixed, 0.0, (1 << len(courses)) - 1)
+
+    return dict(
+        best,
+        cost=round(best['cost'], 3) if best['courses'] else None,
+        optimal=not stats['timed_out'],
+        nodes=stats['nodes'],
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
@@ -1,33 +1,209 @@
-import boto3
+import hashlib
 import json
 import re
+from course_codes import code_of
+from response_cache import LRUCache
+from time_slots import COMPACT_DAYS_PATTERN, DAY_ABBREVIATIONS, meeting_times, parse_days, parse_minutes
 
-def parse_schedule_text(text):
-    """Parse schedule from text input"""
+# Local parsing: each schedule entry is explained as "<code> <days> <start>-<end>"
+# in any order after the code. Entries the regexes cannot fully explain are the
+# only ones sent to Bedrock.
+_ENTRY_SPLIT = re.compile(r'[\n;]+')
+_COMMA_SPLIT = re.compile(r',(?![^()]*\))')
+_CODE_PATTERN = re.compile(r'^[\s\-*\u2022\d.)]*?([A-Za-z&]+(?:\s+[A-Za-z&]+)?)\s*(\d+[A-Za-z]*)\b')
+_TIME_RANGE_PATTERN = re.compile(
+    r'(\d{1,2}(?::\d{2})?\s*(?:am|pm)?)\s*(?:-|\u2013|to)\s*(\d{1,2}(?::\d{2})?\s*(?:am|pm)?)',
+    re.IGNORECASE
+)
+_FULL_DAYS = {'mon', 'monday', 'tue', 'tues', 'tuesday', 'wed', 'wednesday', 'thu', 'thur', 'thurs',
+              'thursday', 'fri', 'friday', 'sat', 'saturday', 'sun', 'sunday'}
+_NOISE_WORDS = {'lec', 'lecture', 'dis', 'discussion', 'lab', 'sem', 'seminar', 'and', 'at', 'from'}
+
+MIN_LOCAL_CONFIDENCE = 1.0
+SCHEDULE_MODEL_ID = 'us.amazon.nova-pro-v1:0'
+
+_parse_cache = LRUCache(max_entries=512)
+
+def split_schedule_entries(text):
+    """Split schedule text into one entry per course.
+
+    Entries are separated by newlines, semicolons, or commas outside
+    parentheses; a comma piece without a time range yet is joined to the next
+    so "M, W, F 10-11" stays one entry.
+    """
+    entries = []
+    for line in _ENTRY_SPLIT.split(text):
+        pending = ''
+        for piece in _COMMA_SPLIT.split(line):
+            pending = f"{pending},{piece}" if pending else piece
+            if _TIME_RANGE_PATTERN.search(pending):
+                entries.append(pending.strip())
+                pending = ''
+        if pending.strip():
+            entries.append(pending.strip())
+    return entries
+
+def _clock_range(start_text, end_text):
+    """Minutes for a class time range; bare hours before 8 are read as afternoon"""
+    start = parse_minutes(start_text)
+    end = parse_minutes(end_text)
+    if start is None or end is None:
+        return None, None
+    has_period = re.search(r'[ap]m', f"{start_text}{end_text}", re.IGNORECASE)
+    if not has_period:
+        if start < 8 * 60:
+            start += 12 * 60
+            end += 12 * 60
+        elif end <= start and end + 12 * 60 > start:
+            end += 12 * 60
+    elif end <= start and not re.search(r'[ap]m', end_text, re.IGNORECASE):
+        end += 12 * 60
+    elif not re.search(r'[ap]m', start_text, re.IGNORECASE) and re.search(r'pm', end_text, re.IGNORECASE):
+        # "3-5pm": the start shares the end's afternoon unless that would put it after the end
+        if start < 12 * 60 and start + 12 * 60 < end:
+            start += 12 * 60
+    return start, end
+
+def _day_tokens(token):
+    """Day indices if the token is purely a day pattern, else None"""
+    if token.lower() in _FULL_DAYS or COMPACT_DAYS_PATTERN.match(token.upper()):
+        return parse_days(token)
+    return None
+
+def parse_schedule_entry(entry, code_index=None):
+    """Parse one schedule entry locally.
+
+    Returns (course, confidence): confidence is the share of code, days and
+    time found, scaled by the share of remaining words that were explained.
+    `course` is None unless all three were found. With a CourseCodeIndex the
+    code is written the catalog's way ("cs 31" -> "COM SCI 31"), and a
+    catalog code given without days or times takes the catalog's meeting.
+    """
+    code_match = _CODE_PATTERN.match(entry)
+    rest = entry[code_match.end():] if code_match else entry
+
+    time_match = _TIME_RANGE_PATTERN.search(rest)
+    start = end = None
+    if time_match:
+        start, end = _clock_range(time_match.group(1), time_match.group(2))
+        rest = rest[:time_match.start()] + ' ' + rest[time_match.end():]
+    has_time = start is not None and end is not None and end > start
+
+    days = set()
+    tokens = [t for t in re.split(r'[\s,/()\-:|]+', rest) if t]
+    unexplained = 0
+    for token in tokens:
+        token_days = _day_tokens(token)
+        if token_days:
+            days.update(token_days)
+        elif token.lower() not in _NOISE_WORDS:
+            unexplained += 1
+
+    code = f"{code_match.group(1).upper()} {code_match.group(2).upper()}" if code_match else None
+    catalog_course = code_index.get(code) if code and code_index is not None else None
+    if catalog_course is not None:
+        code = code_of(catalog_course)
+        if not days and not has_time:
+            catalog_days, start, end = meeting_times(catalog_course)
+            days = set(catalog_days)
+            has_time = start is not None and end is not None
+
+    found = (code_match is not None) + bool(days) + has_time
+    explained = (len(tokens) - unexplained) / len(tokens) if tokens else 1.0
+    confidence = found / 3 * explained
+    if found < 3:
+        return None, confidence
+
+    course = {
+        'code': code,
+        'days': ''.join(DAY_ABBREVIATIONS[d] for d in sorted(days)),
+        'start_time': f"{start // 60:02d}:{start % 60:02d}",
+        'end_time': f"{end // 60:02d}:{end % 60:02d}"
+    }
+    return course, confidence
+
+def parse_schedule_text(text, min_confidence=MIN_LOCAL_CONFIDENCE, code_index=None):
+    """Parse schedule from text input with the local regex parser only"""
     courses = []
-    
-    # Simple regex patterns for common schedule formats
-    patterns = [
-        r'([A-Z]+\s*\d+[A-Z]*)\s*\(([MWF]+|[TR]+|[MTWRF]+)\s*(\d{1,2}:\d{2})-(\d{1,2}:\d{2})\)',
-        r'([A-Z]+\s*\d+[A-Z]*)\s*([MWF]+|[TR]+|[MTWRF]+)\s*(\d{1,2})-(\d{1,2})',
-        r'([A-Z]+\s*\d+[A-Z]*)\s*-\s*([MWF]+|[TR]+|[MTWRF]+)\s*(\d{1,2}:\d{2})-(\d{1,2}:\d{2})'
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            course = {
-                'code': match[0].strip(),
-                'days': match[1].strip(),
-                'start_time': match[2] if ':' in match[2] else f"{match[2]}:00",
-                'end_time': match[3] if ':' in match[3] else f"{match[3]}:00"
-            }
+    for entry in split_schedule_entries(text):
+        course, confidence = parse_schedule_entry(entry, code_index)
+        if course and confidence >= min_confidence:
             courses.append(course)
-    
     return courses
 
-def extract_schedule_with_bedrock(text, bedrock_client):
-    """Use Bedrock to extract schedule information"""
+def parse_free_windows(text):
+    """Parse "I'm free Tuesday 12-2, Th 3-5pm" into {day: [(start_minute, end_minute)]}"""
+    windows = {}
+    for entry in split_schedule_entries(text):
+        time_match = _TIME_RANGE_PATTERN.search(entry)
+        if not time_match:
+            continue
+        start, end = _clock_range(time_match.group(1), time_match.group(2))
+        if start is None or end is None or end <= start:
+            continue
+        rest = entry[:time_match.start()] + ' ' + entry[time_match.end():]
+        for token in re.split(r'[\s,/()\-:|]+', rest):
+            for day in _day_tokens(token) or []:
+                windows.setdefault(day, []).append((start, end))
+    return {day: _merge_windows(day_windows) for day, day_windows in sorted(windows.items())}
+
+def _merge_windows(windows):
+    """Sorted windows with overlapping or touching ones joined"""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def parse_schedule(text, bedrock_client=None, min_confidence=MIN_LOCAL_CONFIDENCE, code_index=None):
+    """Parse a schedule locally, asking Bedrock only about entries the local parser can't explain.
+
+    Returns {"courses": [...], "unparsed": [entries], "source": "local" | "local+bedrock"}.
+    Results are memoized by a hash of the input text and, with a
+    CourseCodeIndex, the fingerprint of its catalog. Pass the catalog's
+    CourseCodeIndex to spell codes the catalog's way and to read bare
+    catalog codes as that course's meeting times.
+    """
+    cache_key = (hashlib.sha256(text.encode('utf-8')).hexdigest(), bedrock_client is not None, min_confidence,
+                 code_index.fingerprint if code_index is not None else None)
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached, courses=[dict(c) for c in cached['courses']])
+
+    courses = []
+    unexplained = []
+    for entry in split_schedule_entries(text):
+        course, confidence = parse_schedule_entry(entry, code_index)
+        if course and confidence >= min_confidence:
+            courses.append(course)
+        elif any(ch.isdigit() for ch in entry):
+            # Lines without any digits (headers, notes) can't describe a meeting time
+            unexplained.append(entry)
+
+    result = {"courses": courses, "unparsed": unexplained, "source": "local"}
+    if unexplained and bedrock_client is not None:
+        extracted = _extract_with_bedrock("\n".join(unexplained), bedrock_client)
+        if extracted is None:
+            # Don't memoize a transient Bedrock failure
+            return result
+        extracted_courses = extracted.get('courses', [])
+        if code_index is not None:
+            for course in extracted_courses:
+                if course.get('code'):
+                    course['code'] = code_index.canonical(course['code'])
+        result = {
+            "courses": courses + extracted_courses,
+            "unparsed": [],
+            "source": "local+bedrock"
+        }
+
+    _parse_cache.set(cache_key, result)
+    return dict(result, courses=[dict(c) for c in result['courses']])
+
+def _extract_with_bedrock(text, bedrock_client):
+    """Ask Bedrock to extract schedule entries; returns the parsed JSON or None on failure"""
     prompt = f"""
     Extract course schedule information from this text. Return only valid JSON.
     
@@ -48,7 +224,7 @@ def extract_schedule_with_bedrock(text, bedrock_client):
     
     try:
         response = bedrock_client.invoke_model(
-            modelId='us.amazon.nova-pro-v1:0',
+            modelId=SCHEDULE_MODEL_ID,
             body=json.dumps({
                 "messages": [{"role": "user", "content": [{"text": prompt}]}],
                 "inferenceConfig": {"temperature": 0.1}
@@ -67,45 +243,14 @@ def extract_schedule_with_bedrock(text, bedrock_client):
     except Exception as e:
         print(f"Bedrock parsing error: {e}")
     
+    return None
+
+def extract_schedule_with_bedrock(text, bedrock_client):
+    """Use Bedrock to extract schedule information"""
+    extracted = _extract_with_bedrock(text, bedrock_client)
+    if extracted is not None:
+        return extracted
+    
     # Fallback to regex parsing
     courses = parse_schedule_text(text)
     return {"courses": courses}
-
-def check_schedule_conflicts(current_schedule, new_course):
-    """Check if new course conflicts with current schedule"""
-    new_days = set(new_course.get('days', ''))
-    new_start = new_course.get('start_time', '')
-    new_end = new_course.get('end_time', '')
-    
-    for course in current_schedule:
-        existing_days = set(course.get('days', ''))
-        existing_start = course.get('start_time', '')
-        existing_end = course.get('end_time', '')
-        
-        # Check for day overlap
-        if new_days & existing_days:
-            # Check for time overlap
-            if time_overlap(new_start, new_end, existing_start, existing_end):
-                return True
-    
-    return False
-
-def time_overlap(start1, end1, start2, end2):
-    """Check if two time ranges overlap"""
-    try:
-        start1_min = time_to_minutes(start1)
-        end1_min = time_to_minutes(end1)
-        start2_min = time_to_minutes(start2)
-        end2_min = time_to_minutes(end2)
-        
-        return start1_min < end2_min and start2_min < end1_min
-    except:
-        return False
-
-def time_to_minutes(time_str):
-    """Convert time string to minutes since midnight"""
-    try:
-        hours, minutes = map(int, time_str.split(':'))
-        return hours * 60 + minutes
-    except:
-        return 0
\ No newline at end of file
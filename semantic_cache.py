@@ -0,0 +1,145 @@
+"""
+Semantic cache for agent and LLM answers.
+
+Near-identical questions ("AI ethics", "ethics of artificial intelligence")
+should share one model call. Queries are normalized (lowercase, punctuation
+stripped, common abbreviations expanded) and embedded with the local
+HashingEncoder. Entries are partitioned by a scope key, a fingerprint of
+everything that must match exactly (schedule, filters, candidate set, model
+settings), and a lookup takes the nearest cached query in its scope by
+cosine similarity, returning the cached answer if it clears `threshold`.
+
+Vectors live in one preallocated float32 matrix with a slot per entry; the
+cache is bounded by `max_entries` with least-recently-used eviction. Stats
+count hits, misses and the model latency the hits saved, and the best
+similarity of recent lookups is kept so the threshold can be tuned.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+import numpy as np
+from local_retrieval import HashingEncoder
+from response_cache import normalize_interests
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+RECENT_SIMILARITIES = 1000
+
+# Expanded before embedding so "AI ethics" lands on "artificial intelligence ethics"
+QUERY_EXPANSIONS = {
+    'ai': 'artificial intelligence',
+    'ml': 'machine learning',
+    'nlp': 'natural language processing',
+    'cs': 'computer science',
+    'compsci': 'computer science',
+    'cogsci': 'cognitive science',
+    'psych': 'psychology',
+    'econ': 'economics',
+    'stats': 'statistics',
+    'bio': 'biology',
+    'chem': 'chemistry',
+    'poli': 'political',
+    'polisci': 'political science'
+}
+
+def normalize_query(query):
+    return " ".join(QUERY_EXPANSIONS.get(word, word) for word in normalize_interests(query).split())
+
+class SemanticCache:
+    def __init__(self, encoder=None, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.encoder = encoder or HashingEncoder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "saved_seconds": 0.0}
+        self.recent_similarities = deque(maxlen=RECENT_SIMILARITIES)
+
+        self._vectors = None
+        self._entries = OrderedDict()
+        self._scopes = {}
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def _embed(self, query):
+        return self.encoder.encode([normalize_query(query)])[0]
+
+    def _nearest(self, vector, scope):
+        """(slot, similarity) of the closest entry in `scope`, or (None, 0.0)"""
+        slots = self._scopes.get(scope)
+        if not slots:
+            return None, 0.0
+        similarities = self._vectors[slots] @ vector
+        best = int(np.argmax(similarities))
+        return slots[best], float(similarities[best])
+
+    def _remove(self, slot):
+        entry = self._entries.pop(slot)
+        slots = self._scopes[entry['scope']]
+        slots.remove(slot)
+        if not slots:
+            del self._scopes[entry['scope']]
+        self._free.append(slot)
+
+    def get(self, query, scope):
+        """Cached value for the nearest query in `scope` above the threshold, or None"""
+        vector = self._embed(query)
+        with self._lock:
+            slot, similarity = self._nearest(vector, scope)
+            if slot is not None:
+                self.recent_similarities.append(similarity)
+                entry = self._entries[slot]
+                if self.ttl_seconds is not None and time.time() - entry['stored_at'] > self.ttl_seconds:
+                    self._remove(slot)
+                    slot = None
+            if slot is None or similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(slot)
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += entry['latency']
+            return entry['value']
+
+    def set(self, query, scope, value, latency=0.0):
+        """Store `value` for `query` in `scope`; `latency` is the model time a future hit saves"""
+        vector = self._embed(query)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            slot, similarity = self._nearest(vector, scope)
+            if slot is not None and similarity >= 1.0 - 1e-6:
+                # Same normalized question: refresh in place
+                self._remove(slot)
+            if not self._free:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = {'scope': scope, 'query': query, 'value': value,
+                                   'latency': latency, 'stored_at': time.time()}
+            self._scopes.setdefault(scope, []).append(slot)
+            self.stats["stores"] += 1
+
+    def hit_ratio(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._free = list(range(self.max_entries - 1, -1, -1))
+
+_default_cache = None
+
+def get_semantic_cache():
+    """Process-wide semantic cache, created on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SemanticCache()
+    return _default_cache
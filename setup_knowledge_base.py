@@ -64,7 +64,7 @@ def print_setup_instructions():
     
     print("\n2. Create S3 Bucket:")
     print("   aws s3 mb s3://your-coursematch-bucket")
-    print("   aws s3 sync knowledge_base_docs/ s3://your-coursematch-bucket/coursematch-kb/")
+    print("   python csv_to_knowledge_base.py your-coursematch-bucket")
     
     print("\n3. Create OpenSearch Serverless Collection:")
     print("   - Go to OpenSearch Service Console")
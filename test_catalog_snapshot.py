@@ -0,0 +1,39 @@
+import shutil
+from catalog_snapshot import SnapshotManager
+
+NEW_ROW = "\nECON 1,Principles of Economics,Supply and demand.,['MWF'],08:00,08:50,Society and Culture,2\n"
+BAD_ROW = "\nECON 2,Macroeconomics,Growth.,['MWF'],09:00,half past,Society and Culture,2\n"
+
+def manager_for(tmp_path):
+    csv_path = tmp_path / 'courses.csv'
+    shutil.copyfile('ucla_courses.csv', csv_path)
+    return SnapshotManager(str(csv_path), str(tmp_path / 'courses.catalog')), csv_path
+
+def test_changed_csv_swaps_in_a_new_version(tmp_path):
+    manager, csv_path = manager_for(tmp_path)
+    old = manager.current()
+    assert manager.check() is False
+
+    with open(csv_path, 'a') as f:
+        f.write(NEW_ROW)
+    assert manager.check() is True
+    fresh = manager.current()
+    assert fresh.version == 2 and len(fresh) == len(old) + 1
+    assert fresh.code_index.canonical('econ 1') == 'ECON 1'
+    # a course picked on the old version is found again in the new one
+    course = old.catalog.course(0)
+    assert fresh.catalog.course(fresh.find_row(course))['code'] == course['code']
+    # the old version stays readable for requests still holding it
+    assert old.catalog.course(len(old) - 1)['code']
+
+def test_invalid_csv_keeps_the_current_version(tmp_path):
+    manager, csv_path = manager_for(tmp_path)
+    good = csv_path.read_text()
+    csv_path.write_text(good + BAD_ROW)
+    assert manager.check() is False
+    assert manager.current().version == 1
+    assert manager.stats['failures'] == 1 and 'half past' in manager.stats['last_error']
+
+    csv_path.write_text(good + NEW_ROW)
+    assert manager.check() is True
+    assert manager.current().version == 2 and manager.stats['last_error'] is None
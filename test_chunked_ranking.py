@@ -0,0 +1,38 @@
+import threading
+from chunked_ranking import match_chunk_positions, normalize_chunk_scores, rank_in_chunks, stratified_chunks
+
+def test_stratified_chunks_keep_every_candidate():
+    chunks = stratified_chunks(list(range(10)), 4)
+    assert chunks == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+    assert sorted(sum(chunks, [])) == list(range(10))
+
+def test_scores_are_normalized_within_a_chunk():
+    ranked = normalize_chunk_scores([{'relevance_score': 9}, {'relevance_score': 5}, {'relevance_score': 1}])
+    assert [r['normalized_score'] for r in ranked] == [1.2247, 0.0, -1.2247]
+
+def test_sections_of_one_course_are_matched_in_order():
+    codes = ['CS 31', 'CS 31', 'MATH 1']
+    matched = match_chunk_positions(
+        [{'course_code': 'CS 31'}, {'course_code': 'CS 31'}, {'course_code': 'ART 1'}], [0, 1, 2], codes.__getitem__
+    )
+    assert [p for p, _ in matched] == [0, 1]
+
+def test_candidates_past_one_wave_are_still_ranked():
+    # 40 chunks on 4 workers: ten waves, and the weakest candidate is still scored
+    candidates = [{'code': f'C {i}', 'score': i} for i in range(200)]
+    seen = set()
+    lock = threading.Lock()
+
+    def rank_chunk(chunk):
+        with lock:
+            seen.update(course['code'] for course in chunk)
+        ranked = sorted(chunk, key=lambda course: -course['score'])
+        return {'recommendations': [{'course_code': c['code'], 'relevance_score': c['score']} for c in ranked]}
+
+    result = rank_in_chunks(candidates, rank_chunk, chunk_size=5, top_k=3, max_workers=4, rerank=False,
+                            row_of=lambda course: course['score'])
+    assert len(seen) == 200
+    assert len(result['recommendations']) == 3
+
+def test_all_chunks_failing_returns_none():
+    assert rank_in_chunks([{'code': f'C {i}'} for i in range(10)], lambda chunk: None, chunk_size=3) is None
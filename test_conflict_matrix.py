@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from catalog import build_columns
+from conflict_matrix import build_conflict_matrix
+from course_arrays import CourseArrays
+from course_record import _synthetic_rows, to_records
+from interval_index import MeetingIntervalIndex
+from schedule_generator import conflict_bitsets, same_code_bitsets
+from time_slots import course_mask
+
+def row(code, days, start, end):
+    return {'course_code': code, 'course_title': code, 'description': '', 'days': days,
+            'start_time': start, 'end_time': end, 'GE': '', 'difficulty': ''}
+
+def engines_agree(first, second):
+    """Conflict verdict of every engine for two courses; they must all give the same answer"""
+    rows = [first, second]
+    columns, _ = build_columns(rows)
+    matrix = np.unpackbits(build_conflict_matrix(columns), axis=1, count=2, bitorder='little')
+    verdicts = {
+        'masks': bool(course_mask(first) & course_mask(second)),
+        'interval_index': bool(MeetingIntervalIndex([first]).conflicting_ids([second])),
+        'course_arrays': bool(CourseArrays.from_dataframe(pd.DataFrame([first])).conflict_mask([second])[0]),
+        'conflict_matrix': bool(matrix[0, 1]),
+        'generator': bool(conflict_bitsets(rows)[0] >> 1 & 1)
+    }
+    assert len(set(verdicts.values())) == 1, verdicts
+    return verdicts['masks']
+
+def test_off_grid_meetings_in_one_slot_conflict():
+    # 10:52 and 10:53 both round into the 10:50-10:55 slot
+    assert engines_agree(row('A 1', 'MW', '10:00', '10:52'), row('B 1', 'MW', '10:53', '11:40'))
+
+def test_back_to_back_meetings_fit():
+    assert not engines_agree(row('A 1', 'MW', '10:00', '10:50'), row('B 1', 'MW', '10:50', '11:40'))
+
+def test_overlapping_meetings_conflict():
+    assert engines_agree(row('A 1', 'TuTh', '14:00', '15:15'), row('B 1', "['TR']", '15:00', '16:00'))
+
+def test_different_days_never_conflict():
+    assert not engines_agree(row('A 1', 'MWF', '09:00', '10:00'), row('B 1', 'TuTh', '09:00', '10:00'))
+
+def test_conflict_bitsets_match_conflict_matrix():
+    rows = _synthetic_rows(300)
+    columns, _ = build_columns(rows)
+    matrix = np.unpackbits(build_conflict_matrix(columns), axis=1, count=len(rows), bitorder='little')
+    from_matrix = [int(''.join(map(str, r[::-1])), 2) for r in matrix]
+    courses = to_records(rows)
+    same_code = same_code_bitsets(courses)
+    assert conflict_bitsets(courses) == [a | b for a, b in zip(from_matrix, same_code)]
@@ -0,0 +1,34 @@
+import pandas as pd
+from course_arrays import CourseArrays
+
+def row(code, title, days, start, end, ge='', difficulty='3'):
+    return {'course_code': code, 'course_title': title, 'description': f'An introduction to {title.lower()}',
+            'days': days, 'start_time': start, 'end_time': end, 'GE': ge, 'difficulty': difficulty}
+
+CATALOG = [
+    row('CS 31', 'Programming', 'MW', '10:00', '11:50', difficulty='4'),
+    row('CS 32', 'Programming Data Structures', 'TuTh', '10:00', '11:50', difficulty='4'),
+    row('ART 10', 'Painting', 'MW', '11:53', '13:00', ge='Arts'),
+    row('HIST 1', 'History', 'F', '09:00', '09:50', ge='Society'),
+]
+
+def arrays():
+    return CourseArrays.from_dataframe(pd.DataFrame(CATALOG))
+
+def test_conflict_mask_uses_slot_grid():
+    schedule = [row('MATH 1', 'Calculus', 'MW', '11:00', '11:52')]
+    # 11:52 and 11:53 share the 11:50-11:55 slot
+    assert arrays().conflict_mask(schedule).tolist() == [True, False, True, False]
+
+def test_top_matches_skips_conflicts_and_filters():
+    course_arrays = arrays()
+    schedule = [row('MATH 1', 'Calculus', 'MW', '10:00', '11:00')]
+    assert [r for r, _, _ in course_arrays.top_matches('programming', schedule, {})] == [1]
+    assert course_arrays.top_matches('programming', [], {'difficulty': '3'}) == []
+    matches = course_arrays.top_matches('programming', [], {}, k=1)
+    assert matches[0][0] == 0 and matches[0][2] == ['programming']
+
+def test_taken_rows_are_excluded():
+    # taken rows are never recommended
+    assert [r for r, _, _ in arrays().top_matches('programming', [], {}, taken_rows=[1])] == [0]
+    assert arrays().top_matches('programming', [], {}, taken_rows=[0, 1]) == []
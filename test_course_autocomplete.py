@@ -0,0 +1,32 @@
+from course_autocomplete import CompletionIndex
+from course_record import to_records
+
+COURSES = to_records([
+    {'course_code': 'COM SCI 188', 'course_title': 'Ethics in Artificial Intelligence', 'days': 'MWF',
+     'start_time': '13:00', 'end_time': '14:00'},
+    {'course_code': 'COM SCI 31', 'course_title': 'Introduction to Computer Science', 'days': 'TuTh',
+     'start_time': '10:00', 'end_time': '11:50'},
+    {'course_code': 'COG SCI 1', 'course_title': 'Introduction to Cognitive Science', 'days': 'TBA'},
+    {'course_code': 'PHIL 7', 'course_title': 'Introduction to Ethics', 'days': 'MW',
+     'start_time': '09:00', 'end_time': '10:15'},
+])
+
+def codes(completions):
+    return [c['code'] for c in completions]
+
+def test_department_aliases_complete_codes():
+    index = CompletionIndex(COURSES)
+    assert codes(index.complete('cs 18')) == ['COM SCI 188']
+    assert codes(index.complete('comsci')) == ['COM SCI 188', 'COM SCI 31']
+
+def test_title_words_complete_in_catalog_order():
+    index = CompletionIndex(COURSES)
+    assert codes(index.complete('ethic')) == ['COM SCI 188', 'PHIL 7']
+    assert codes(index.complete('intro scien')) == ['COM SCI 31', 'COG SCI 1']
+
+def test_completion_fields_and_limit():
+    index = CompletionIndex(COURSES)
+    first = index.complete('intro', limit=1)
+    assert len(first) == 1 and first[0]['position'] == 1 and first[0]['course'] is COURSES[1]
+    assert index.complete('cog sci 1')[0]['meeting'] == 'TBA'
+    assert index.complete('zzz') == []
@@ -0,0 +1,29 @@
+from course_codes import CourseCodeIndex, normalize_code, prefix_keys
+
+def test_spellings_of_one_code_share_a_key():
+    assert {normalize_code(code) for code in ["COM SCI 188", "cs 188", "CS188", "Com Sci 0188", "compsci-188"]} == {
+        "COMSCI 188"
+    }
+
+def test_number_suffix_and_ampersand_departments():
+    assert normalize_code("math 31a") == normalize_code("MATH 031A") == "MATH 31A"
+    assert normalize_code("M&ATS 101") == "M&ATS 101"
+
+def test_unrelated_codes_stay_apart():
+    assert normalize_code("COM SCI 18") != normalize_code("COM SCI 188")
+    assert normalize_code("COG SCI 1") != normalize_code("COM SCI 1")
+
+def test_prefix_keys_resolve_department_aliases():
+    assert prefix_keys("cs 18") == ["CS18", "COMSCI18"]
+    assert prefix_keys("com sci 1") == ["COMSCI1"]
+
+def test_index_lookups():
+    courses = [{'code': 'COM SCI 31'}, {'code': 'LING 20'}, {'code': 'COM SCI 31'}]
+    index = CourseCodeIndex(courses)
+    assert index.positions("cs 31") == [0, 2]
+    assert index.get("cs31") is courses[0]
+    assert index.canonical("cs 31") == "COM SCI 31"
+    assert index.canonical("ECON 1") == "ECON 1"
+    assert "ling 20" in index and "ling 21" not in index
+    assert index.first_in("cs 31", {id(courses[2])}) is courses[2]
+    assert index.position_of(courses[2]) == 2
@@ -0,0 +1,33 @@
+import json
+from course_record import Course, to_records
+from time_slots import course_mask, meeting_times
+
+CSV_ROW = {'course_code': 'com  sci 188', 'course_title': 'Ethics in AI', 'description': 'Privacy and bias.',
+           'days': "['MWF']", 'start_time': '13:00', 'end_time': '14:00', 'GE': 'Society and Culture',
+           'difficulty': '3'}
+
+def test_record_answers_to_both_schemas():
+    course = Course.from_csv_row(CSV_ROW)
+    assert course['code'] == course['course_code'] == 'COM SCI 188'
+    assert course['GE'] == course['ge_area'] == 'Society and Culture'
+    assert (course['days'], course['start_time'], course['time']) == ('MWF', '13:00', 'MWF 1:00-2:00')
+    assert meeting_times(course) == ((0, 2, 4), 780, 840)
+    assert course_mask(course) == course_mask(CSV_ROW)
+
+def test_missing_fields_read_like_a_dict_of_none():
+    course = Course.from_dict({'code': 'HIST 1', 'days': 'TBA'})
+    assert course['credits'] is None and course['time'] is None
+    assert course.get('credits', 4) == 4
+    assert 'credits' not in course
+    assert course.day_names() == 'TBA' and course_mask(course) == 0
+    assert json.loads(json.dumps(dict(course))) == {'code': 'HIST 1', 'title': '', 'description': '', 'keywords': []}
+
+def test_records_hash_by_identity():
+    first, second = to_records([CSV_ROW, CSV_ROW])
+    assert first != second and len({first, second}) == 2
+    assert to_records([first])[0] is first
+
+def test_sections_share_strings_and_masks():
+    first, second = to_records([CSV_ROW, dict(CSV_ROW)])
+    assert first.title is second.title
+    assert first.slot_mask is second.slot_mask
@@ -0,0 +1,34 @@
+from interval_index import MeetingIntervalIndex, free_gaps
+from schedule_parser import parse_free_windows
+from time_slots import course_mask, schedule_mask
+
+def row(code, days, start, end):
+    return {'course_code': code, 'days': days, 'start_time': start, 'end_time': end}
+
+def test_free_windows_merge_per_day():
+    assert parse_free_windows("Tuesday 12-2, Tu 1:30-3pm, Th 3-5pm") == {
+        1: [(12 * 60, 15 * 60)],
+        3: [(15 * 60, 17 * 60)]
+    }
+
+def test_window_edges_are_checked_on_the_slot_grid():
+    index = MeetingIntervalIndex([
+        row('A 1', 'Tu', '10:53', '11:40'),  # starts in the 10:50 slot the window only partly covers
+        row('B 1', 'Tu', '10:55', '11:40'),
+        row('C 1', 'Tu', '11:00', '12:02'),  # runs into the 12:00 slot
+    ])
+    assert index.ids_within({1: [(10 * 60 + 52, 12 * 60 + 2)]}) == [1]
+
+def test_courses_in_schedule_gaps_never_clash_with_it():
+    schedule = [row('MATH 1', 'MW', '09:00', '10:52'), row('CHEM 1', 'MW', '13:03', '14:00')]
+    courses = [
+        row('A 1', 'MW', '10:53', '11:40'),
+        row('B 1', 'MW', '10:55', '11:40'),
+        row('C 1', 'MW', '12:00', '13:02'),
+        row('D 1', 'MW', '12:00', '13:00'),
+        row('E 1', 'MWF', '15:00', '15:50'),
+    ]
+    inside = MeetingIntervalIndex(courses).ids_within(free_gaps(schedule))
+    assert inside == [1, 3, 4]
+    busy = schedule_mask(schedule)
+    assert all(not course_mask(courses[i]) & busy for i in inside)
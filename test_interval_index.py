@@ -0,0 +1,31 @@
+import random
+from course_record import _synthetic_rows, to_records
+from interval_index import MeetingIntervalIndex, free_gaps
+from time_slots import course_mask, schedule_mask
+
+def row(code, days, start, end):
+    return {'course_code': code, 'days': days, 'start_time': start, 'end_time': end}
+
+def test_off_grid_meetings_in_one_slot_conflict():
+    # 10:52 and 10:53 both round into the 10:50-10:55 slot, as in the bitmasks
+    index = MeetingIntervalIndex([row('A 1', 'MW', '10:00', '10:52')])
+    assert index.conflicting_ids([row('B 1', 'MW', '10:53', '11:40')]) == {0}
+
+def test_back_to_back_meetings_fit():
+    index = MeetingIntervalIndex([row('A 1', 'MW', '10:00', '10:50')])
+    assert index.conflicting_ids([row('B 1', 'MW', '10:50', '11:40')]) == set()
+    assert list(index.compatible_ids([row('B 1', 'MW', '10:50', '11:40')])) == [0]
+
+def test_interval_index_matches_slot_masks():
+    courses = to_records(_synthetic_rows(1500))
+    index = MeetingIntervalIndex(courses)
+    rng = random.Random(7)
+    for _ in range(50):
+        schedule = rng.sample(courses, 3)
+        busy = schedule_mask(schedule)
+        assert index.conflicting_ids(schedule) == {i for i, c in enumerate(courses) if course_mask(c) & busy}
+
+def test_free_gaps_are_the_complement_of_the_schedule():
+    gaps = free_gaps([row('A 1', 'MW', '10:00', '11:00')], days=[0, 1])
+    assert gaps[0] == [(480, 600), (660, 1320)]
+    assert gaps[1] == [(480, 1320)]
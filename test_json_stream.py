@@ -0,0 +1,29 @@
+import json
+from json_stream import JsonArrayStreamParser
+
+DOCUMENT = 'Sure! ```json\n' + json.dumps({'recommendations': [
+    {'course_code': 'CS 31', 'reason': 'braces {like} this and "quotes" \\ too'},
+    {'course_code': 'MATH 1', 'tags': [{'a': 1}], 'reason': ']'},
+]}) + '\n```'
+
+def test_elements_arrive_as_they_close():
+    parser = JsonArrayStreamParser()
+    seen = []
+    for ch in DOCUMENT:
+        for element in parser.feed(ch):
+            seen.append((element['course_code'], ch))
+    assert seen == [('CS 31', '}'), ('MATH 1', '}')]
+
+def test_any_chunking_gives_the_same_elements():
+    expected = json.loads(DOCUMENT[DOCUMENT.index('{'):DOCUMENT.rindex('}') + 1])['recommendations']
+    for size in (1, 3, 7, len(DOCUMENT)):
+        parser = JsonArrayStreamParser()
+        elements = []
+        for i in range(0, len(DOCUMENT), size):
+            elements.extend(parser.feed(DOCUMENT[i:i + size]))
+        assert elements == expected
+
+def test_text_after_the_array_is_ignored():
+    parser = JsonArrayStreamParser('items')
+    assert parser.feed('{"items": [{"a": 1}], "more": [{"b": 2}]}') == [{'a': 1}]
+    assert parser.feed('{"c": 3}') == []
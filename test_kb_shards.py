@@ -0,0 +1,27 @@
+import os
+from kb_shards import SHARDS_PREFIX, ShardedDocuments, s3_range_reader, write_shards
+from local_s3 import LocalS3Client
+
+DOCUMENTS = [{'course_id': f'C-{i}', 'course_code': f'C {i}', 'description': 'x' * (i % 50)} for i in range(500)]
+
+def test_documents_round_trip_across_shards(tmp_path):
+    index = write_shards(DOCUMENTS, str(tmp_path), max_shard_bytes=2048, block_bytes=1024)
+    assert len(index['shards']) > 1
+    shards = ShardedDocuments(str(tmp_path))
+    assert len(shards) == len(DOCUMENTS)
+    assert list(shards) == DOCUMENTS
+    assert shards.get('C-321') == DOCUMENTS[321]
+    assert 'C-999' not in shards and shards.get('C-999') is None
+
+def test_lookups_use_ranged_reads_on_s3(tmp_path):
+    export = tmp_path / 'export'
+    write_shards(DOCUMENTS, str(export), max_shard_bytes=2048, block_bytes=1024)
+    s3 = LocalS3Client(root=str(tmp_path / 's3'))
+    for name in os.listdir(export):
+        s3.upload_file(str(export / name), 'kb', f"{SHARDS_PREFIX}{name}")
+
+    shards = ShardedDocuments('s3', read_range=s3_range_reader(s3, 'kb'))
+    calls = s3.calls
+    assert shards.get('C-42') == DOCUMENTS[42]
+    # one ranged GET for the document's block, not the whole shard
+    assert s3.calls == calls + 1
@@ -0,0 +1,58 @@
+import csv
+from csv_to_knowledge_base import KB_PREFIX, prepare_csv_for_knowledge_base, section_key, upload_to_s3
+from local_s3 import LocalS3Client
+
+FIELDS = ['course_code', 'course_title', 'description', 'days', 'start_time', 'end_time', 'GE', 'difficulty']
+
+def write_catalog(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def row(code, days, start, title='Course'):
+    return {'course_code': code, 'course_title': title, 'description': '', 'days': days,
+            'start_time': start, 'end_time': '23:00', 'GE': '', 'difficulty': '2'}
+
+def keys(s3):
+    return [obj['Key'][len(KB_PREFIX):] for obj in s3.list_objects_v2(Bucket='kb', Prefix=KB_PREFIX)['Contents']]
+
+def test_section_key_is_code_and_meeting():
+    assert section_key(row('COM SCI 31', "['MWF']", '10:00')) == 'COM-SCI-31-MWF-10-00'
+
+def test_inserting_a_row_only_adds_one_document(tmp_path):
+    catalog = tmp_path / 'courses.csv'
+    docs = tmp_path / 'docs'
+    s3 = LocalS3Client(root=str(tmp_path / 's3'))
+    rows = [row('CS 31', 'MW', '10:00'), row('CS 31', 'TuTh', '10:00'), row('MATH 1', 'F', '09:00')]
+    write_catalog(catalog, rows)
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    first = upload_to_s3(str(docs), 'kb', s3=s3)
+    assert len(first['added']) == 3
+
+    write_catalog(catalog, [row('ART 1', 'MW', '08:00')] + rows)
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    second = upload_to_s3(str(docs), 'kb', s3=s3)
+    assert (second['added'], second['changed'], second['deleted']) == (['course_ART-1-MW-08-00.json'], [], [])
+    assert len(keys(s3)) == 4
+
+    write_catalog(catalog, rows[1:] + [row('ART 1', 'MW', '08:00', title='Drawing')])
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    third = upload_to_s3(str(docs), 'kb', s3=s3)
+    assert (third['changed'], third['deleted']) == (['course_ART-1-MW-08-00.json'], ['course_CS-31-MW-10-00.json'])
+    assert sorted(keys(s3)) == sorted(p.name for p in docs.iterdir())
+
+def test_unchanged_csv_skips_the_export(tmp_path, capsys):
+    catalog = tmp_path / 'courses.csv'
+    docs = tmp_path / 'docs'
+    write_catalog(catalog, [row('CS 31', 'MW', '10:00'), row('CS 31', 'MW', '10:00')])
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    assert sorted(p.name for p in docs.iterdir()) == ['course_CS-31-MW-10-00.json', 'course_CS-31-MW-10-00_2.json']
+    capsys.readouterr()
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    assert 'up to date' in capsys.readouterr().out
+
+    # a missing document is rewritten even though the CSV is unchanged
+    (docs / 'course_CS-31-MW-10-00_2.json').unlink()
+    prepare_csv_for_knowledge_base(str(catalog), str(docs))
+    assert (docs / 'course_CS-31-MW-10-00_2.json').exists()
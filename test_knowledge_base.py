@@ -38,6 +38,47 @@ def test_knowledge_base_retrieval(kb_id, query):
         print(f"Error testing Knowledge Base: {e}")
         return []
 
+def check_local_retrieval(query, csv_file_path="ucla_courses.csv", shards_dir="knowledge_base_shards"):
+    """Test the offline local retrieval index (no Bedrock round trip)"""
+    import os
+    from local_retrieval import LocalRetrievalIndex
+    
+    # Prefer the bundled export when one exists (python csv_to_knowledge_base.py --shards)
+    if os.path.exists(os.path.join(shards_dir, "index.json")):
+        index = LocalRetrievalIndex.from_shards(shards_dir)
+    else:
+        index = LocalRetrievalIndex.from_csv(csv_file_path)
+    results = index.search(query, k=5)
+    
+    print(f"Query: {query}")
+    print("=" * 50)
+    print(f"Found {len(results)} relevant courses:")
+    
+    for i, (doc, score) in enumerate(results, 1):
+        print(f"\n{i}. Score: {score:.3f}")
+        print(f"   Source: {doc.get('course_id', '')}")
+        print(f"   Content: {doc.get('full_text', '')[:200]}...")
+    
+    return results
+
+def check_shard_lookup(course_id, shards_dir="knowledge_base_shards"):
+    """Range-read a single course out of the bundled export"""
+    from kb_shards import ShardedDocuments
+    
+    try:
+        shards = ShardedDocuments(shards_dir)
+    except FileNotFoundError:
+        print(f"No bundled export in {shards_dir}/ (run: python csv_to_knowledge_base.py --shards)")
+        return None
+    
+    doc = shards.get(course_id)
+    print(f"{len(shards)} documents in {len(shards.shards)} shards")
+    if doc:
+        print(f"   {doc['course_id']}: {doc['course_code']} - {doc['title']} ({doc['days']} {doc['time']})")
+    else:
+        print(f"   {course_id} not found")
+    return doc
+
 def test_agent_with_kb():
     """Test the full agent with Knowledge Base"""
     from bedrock_agent import CourseMatchAgent
@@ -76,6 +117,12 @@ if __name__ == "__main__":
     # Test direct KB retrieval
     test_knowledge_base_retrieval(KB_ID, "computer science artificial intelligence")
     
+    print("\n\n💻 Testing Local Retrieval (offline)")
+    print("=" * 50)
+    
+    check_local_retrieval("computer science artificial intelligence")
+    check_shard_lookup("COM SCI 188-0")
+    
     print("\n\n🤖 Testing Agent with Knowledge Base")
     print("=" * 50)
     
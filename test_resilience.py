@@ -0,0 +1,58 @@
+import random
+from resilience import CircuitBreaker, backoff_delay, retry_call
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_then_lets_one_trial_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+    assert breaker.stats['opened'] == 1 and breaker.stats['rejected'] == 2
+
+def test_failed_trial_reopens_the_breaker():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now = 9
+    assert not breaker.allow()
+    assert breaker.stats['opened'] == 2
+
+def test_retry_returns_first_result():
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError('throttled')
+        return None if len(attempts) == 2 else 'ok'
+
+    assert retry_call(call, retries=2, base_delay=0) == 'ok'
+    assert len(attempts) == 3
+
+def test_retry_gives_up_at_the_deadline():
+    attempts = []
+    assert retry_call(lambda: attempts.append(1), retries=5, base_delay=10, max_delay=10,
+                      deadline=0, rng=random.Random(1)) is None
+    assert len(attempts) == 1
+
+def test_backoff_is_capped():
+    assert all(0 <= backoff_delay(attempt, 0.25, 2.0) <= 2.0 for attempt in range(10))
@@ -0,0 +1,40 @@
+from response_cache import LRUCache, ResponseCache, course_set_hash, make_cache_key, normalize_interests
+
+def test_trivial_edits_share_a_key():
+    assert normalize_interests('  Machine-Learning, AI!') == normalize_interests('machine learning ai')
+    assert course_set_hash(['CS 31', 'CS 32']) == course_set_hash(['CS 32', 'CS 31'])
+    assert make_cache_key('a', {'x': 1, 'y': 2}) == make_cache_key('a', {'y': 2, 'x': 1})
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl_seconds=-1)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+def test_disk_tier_serves_after_memory_is_cleared(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set('key', {'recommendations': [1, 2]})
+    cache.memory.clear()
+    assert cache.get('key') == {'recommendations': [1, 2]}
+    assert cache.get('key') == {'recommendations': [1, 2]}
+    assert cache.get('missing') is None
+    assert cache.stats['disk_hits'] == 1 and cache.stats['memory_hits'] == 1 and cache.stats['misses'] == 1
+
+    reopened = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    assert reopened.get('key') == {'recommendations': [1, 2]}
+
+def test_disk_tier_evicts_past_entry_limit():
+    cache = ResponseCache(':memory:', max_disk_entries=2)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.memory.clear()
+    assert cache.get('a') is None
+    assert cache.get('c') == 'c'
+    assert cache.stats['evictions'] == 1
@@ -0,0 +1,41 @@
+from itertools import combinations
+from schedule_generator import generate_schedules
+from time_slots import course_mask
+
+def course(code, days, start, end):
+    return {'code': code, 'title': code, 'days': days, 'start_time': start, 'end_time': end}
+
+CANDIDATES = [
+    course('COM SCI 31', 'MWF', '10:00', '10:50'),
+    course('COM SCI 31', 'TuTh', '10:00', '11:50'),
+    course('MATH 31A', 'MWF', '10:30', '11:20'),
+    course('MATH 31A', 'MWF', '13:00', '13:50'),
+    course('LING 20', 'TuTh', '11:00', '12:15'),
+    course('HIST 1A', 'TuTh', '14:00', '15:15'),
+    course('PHYSICS 1A', 'MWF', '08:00', '08:50'),
+    course('PSYCH 10', 'F', '12:00', '14:50'),
+]
+SCHEDULE = [course('CHEM 14A', 'MW', '15:00', '16:15')]
+
+def valid(chosen, current_schedule):
+    """No two sections of one course, no overlapping slots, nothing clashing with the schedule"""
+    if len({c['code'] for c in chosen}) < len(chosen):
+        return False
+    busy = 0
+    for c in list(chosen) + list(current_schedule):
+        if course_mask(c) & busy:
+            return False
+        busy |= course_mask(c)
+    return True
+
+def test_generator_yields_exactly_the_valid_combinations_in_order():
+    for k in range(1, 5):
+        expected = [list(chosen) for chosen in combinations(CANDIDATES, k) if valid(chosen, SCHEDULE)]
+        assert list(generate_schedules(CANDIDATES, k, SCHEDULE)) == expected
+
+def test_generator_drops_candidates_that_clash_with_the_schedule():
+    clashing = course('ECON 1', 'MW', '15:30', '16:45')
+    assert all(clashing not in schedule for schedule in generate_schedules(CANDIDATES + [clashing], 2, SCHEDULE))
+
+def test_generator_yields_nothing_when_k_is_too_large():
+    assert list(generate_schedules(CANDIDATES, len(CANDIDATES))) == []
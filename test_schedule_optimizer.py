@@ -0,0 +1,48 @@
+from itertools import combinations
+from interval_index import meeting_intervals
+from schedule_optimizer import DEFAULT_WEIGHTS, layout_breakdown, optimize_schedule, weighted_cost
+from time_slots import course_mask
+
+def course(code, days, start, end):
+    return {'code': code, 'title': code, 'days': days, 'start_time': start, 'end_time': end}
+
+CANDIDATES = [
+    course('COM SCI 31', 'MWF', '10:00', '10:50'),
+    course('COM SCI 31', 'TuTh', '10:00', '11:50'),
+    course('MATH 31A', 'MWF', '10:30', '11:20'),
+    course('MATH 31A', 'MWF', '13:00', '13:50'),
+    course('LING 20', 'TuTh', '11:00', '12:15'),
+    course('HIST 1A', 'TuTh', '14:00', '15:15'),
+    course('PHYSICS 1A', 'MWF', '08:00', '08:50'),
+    course('PSYCH 10', 'F', '12:00', '14:50'),
+]
+SCHEDULE = [course('CHEM 14A', 'MW', '15:00', '16:15')]
+
+def valid(chosen, current_schedule):
+    """No two sections of one course, no overlapping slots, nothing clashing with the schedule"""
+    if len({c['code'] for c in chosen}) < len(chosen):
+        return False
+    busy = 0
+    for c in list(chosen) + list(current_schedule):
+        if course_mask(c) & busy:
+            return False
+        busy |= course_mask(c)
+    return True
+
+def test_optimizer_finds_the_brute_force_optimum():
+    relevance = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2]
+    fixed = [m for entry in SCHEDULE for m in meeting_intervals(entry)]
+    best = min(
+        weighted_cost(layout_breakdown(fixed + [m for c in chosen for m in meeting_intervals(c)]),
+                      sum(relevance[CANDIDATES.index(c)] for c in chosen), DEFAULT_WEIGHTS)
+        for chosen in combinations(CANDIDATES, 3) if valid(chosen, SCHEDULE)
+    )
+    result = optimize_schedule(CANDIDATES, 3, SCHEDULE, relevance=relevance, budget_ms=5000)
+    assert result['optimal']
+    assert valid(result['courses'], SCHEDULE)
+    # The reported cost is rounded to 3 decimals
+    assert abs(result['cost'] - best) < 1e-3
+
+def test_optimizer_reports_no_layout():
+    result = optimize_schedule(CANDIDATES[:2], 2)
+    assert result['courses'] == []
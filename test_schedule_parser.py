@@ -0,0 +1,38 @@
+from course_codes import CourseCodeIndex
+from schedule_parser import parse_schedule, parse_schedule_entry, split_schedule_entries
+
+def test_full_entry_parses_locally():
+    course, confidence = parse_schedule_entry("COM SCI 31 MWF 10:00-10:50am")
+    assert confidence == 1.0
+    assert course == {'code': 'COM SCI 31', 'days': 'MWF', 'start_time': '10:00', 'end_time': '10:50'}
+
+def test_bare_afternoon_hours():
+    course, _ = parse_schedule_entry("MATH 31A TuTh 2-3:15")
+    assert (course['days'], course['start_time'], course['end_time']) == ('TuTh', '14:00', '15:15')
+
+def test_end_period_carries_to_start():
+    course, _ = parse_schedule_entry("PHYSICS 1A M/W 3-5pm")
+    assert (course['start_time'], course['end_time']) == ('15:00', '17:00')
+
+def test_comma_separated_days_stay_one_entry():
+    assert split_schedule_entries("LING 20 M, W, F 10-11; HIST 1A TuTh 9-10:15") == [
+        "LING 20 M, W, F 10-11", "HIST 1A TuTh 9-10:15"
+    ]
+
+def test_unexplained_lines_are_reported_without_bedrock():
+    result = parse_schedule("COM SCI 31 MWF 10-10:50\nChem 14A with Dr. Smith in room 2\nMy classes:")
+    assert [c['code'] for c in result['courses']] == ['COM SCI 31']
+    assert result['unparsed'] == ["Chem 14A with Dr. Smith in room 2"]
+    assert result['source'] == 'local'
+
+def test_code_index_spells_codes_and_fills_meetings():
+    index = CourseCodeIndex([{'code': 'COM SCI 31', 'days': 'MWF', 'start_time': '10:00', 'end_time': '10:50'}])
+    course, confidence = parse_schedule_entry("cs 31", index)
+    assert confidence == 1.0
+    assert course == {'code': 'COM SCI 31', 'days': 'MWF', 'start_time': '10:00', 'end_time': '10:50'}
+
+def test_parse_cache_follows_the_catalog():
+    first = CourseCodeIndex([{'code': 'COM SCI 31', 'days': 'MWF', 'start_time': '10:00', 'end_time': '10:50'}])
+    second = CourseCodeIndex([{'code': 'COM SCI 31', 'days': 'TuTh', 'start_time': '12:00', 'end_time': '13:50'}])
+    assert parse_schedule("cs 31", code_index=first)['courses'][0]['days'] == 'MWF'
+    assert parse_schedule("cs 31", code_index=second)['courses'][0]['days'] == 'TuTh'
@@ -0,0 +1,36 @@
+from semantic_cache import SemanticCache, normalize_query
+
+def test_abbreviations_expand():
+    assert normalize_query('AI ethics!') == 'artificial intelligence ethics'
+
+def test_rephrased_query_hits_within_its_scope():
+    cache = SemanticCache(threshold=0.8)
+    cache.set('AI ethics', 'scope-a', ['CS 188'], latency=2.5)
+    assert cache.get('ethics of AI', 'scope-a') == ['CS 188']
+    assert cache.get('AI ethics', 'scope-b') is None
+    assert cache.get('medieval poetry', 'scope-a') is None
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 2
+    assert cache.stats['saved_seconds'] == 2.5
+
+def test_same_query_refreshes_in_place():
+    cache = SemanticCache()
+    cache.set('machine learning', 'scope', 1)
+    cache.set('Machine Learning!', 'scope', 2)
+    assert len(cache) == 1
+    assert cache.get('machine learning', 'scope') == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(max_entries=2)
+    cache.set('linguistics', 'scope', 1)
+    cache.set('chemistry', 'scope', 2)
+    cache.get('linguistics', 'scope')
+    cache.set('philosophy', 'scope', 3)
+    assert cache.get('chemistry', 'scope') is None
+    assert cache.get('linguistics', 'scope') == 1
+    assert cache.stats['evictions'] == 1
+
+def test_expired_entries_miss():
+    cache = SemanticCache(ttl_seconds=-1)
+    cache.set('statistics', 'scope', 1)
+    assert cache.get('statistics', 'scope') is None
+    assert len(cache) == 0
@@ -0,0 +1,36 @@
+import pytest
+from catalog import validate_rows
+from time_slots import course_mask, is_unscheduled, parse_days, slot_bounds
+
+@pytest.mark.parametrize('days, expected', [
+    ('MWF', [0, 2, 4]),
+    ('TuTh', [1, 3]),
+    ("['TR']", [1, 3]),
+    ('Mon, Wed', [0, 2]),
+    ('M/W', [0, 2]),
+    ('Th', [3]),
+])
+def test_day_patterns(days, expected):
+    assert parse_days(days) == expected
+
+@pytest.mark.parametrize('days', ['TBA', 'Online', "['Online']", 'M-F', 'Arranged', '', None])
+def test_non_day_tokens_have_no_days(days):
+    # a stray day letter inside a word ("TBA", "M-F") is not a meeting day
+    assert parse_days(days) == []
+
+def test_tba_and_online_sections_are_valid_and_never_meet():
+    rows = [
+        {'course_code': 'A 1', 'days': 'TBA', 'start_time': '', 'end_time': ''},
+        {'course_code': 'B 1', 'days': "['Online']", 'start_time': '10:00', 'end_time': '11:00'},
+    ]
+    assert is_unscheduled('TBA') and not is_unscheduled('MWF')
+    assert validate_rows(rows) == [(-1, -1, []), (-1, -1, [])]
+    assert course_mask(rows[0]) == 0
+
+def test_unreadable_days_still_fail_validation():
+    with pytest.raises(ValueError, match='unreadable days'):
+        validate_rows([{'course_code': 'A 1', 'days': 'M-F', 'start_time': '10:00', 'end_time': '11:00'}])
+
+def test_slot_bounds_round_out_to_the_grid():
+    assert slot_bounds(600, 652) == (120, 131)
+    assert slot_bounds(653, 700) == (130, 140)
@@ -0,0 +1,179 @@
+"""
+Weekly time-slot bitmasks for schedule conflict checks.
+
+Every meeting pattern is encoded once into a fixed-width integer where each bit
+is one 5-minute slot of the week (7 days x 288 slots). Two meetings conflict
+exactly when their masks share a bit, so checking a course against a whole
+schedule is a single AND.
+"""
+
+import re
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+# Byte width of a weekly mask, padded to whole 64-bit words for array storage
+MASK_BYTES = -(-7 * SLOTS_PER_DAY // 64) * 8
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_ABBREVIATIONS = ['M', 'Tu', 'W', 'Th', 'F', 'Sa', 'Su']
+
+# A token is a day pattern only if it is made entirely of these abbreviations,
+# two-letter ones tried first ("Th" before "T"); anything else ("TBA", "M-F") has no days
+_DAY_TOKENS = {
+    'SU': 6, 'SA': 5, 'TH': 3, 'TU': 1,
+    'M': 0, 'T': 1, 'W': 2, 'R': 3, 'F': 4
+}
+COMPACT_DAYS_PATTERN = re.compile(r'^(?:TU|TH|SA|SU|M|T|W|R|F)+$')
+_DAY_TOKEN_PATTERN = re.compile(r'TU|TH|SA|SU|M|T|W|R|F')
+# Day values that mean the section has no regular meeting
+NO_MEETING_DAYS = {'tba', 'tbd', 'online', 'async', 'asynchronous', 'arr', 'arranged', 'none'}
+_FULL_DAY_NAMES = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1,
+    'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6
+}
+_TIME_PATTERN = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*$', re.IGNORECASE)
+
+_day_cache = {}
+
+def parse_days(days):
+    """Convert a day pattern ("MWF", "TuTh", "['MWF']", ["Monday", ...]) to sorted day indices"""
+    if days is None:
+        return []
+    if isinstance(days, (list, tuple, set)):
+        result = set()
+        for day in days:
+            result.update(parse_days(day))
+        return sorted(result)
+
+    key = str(days)
+    if key in _day_cache:
+        return _day_cache[key]
+
+    result = set()
+    cleaned = re.sub(r"[\[\]'\"]", ' ', key)
+    for token in re.split(r'[\s,/]+', cleaned):
+        if not token:
+            continue
+        if token.lower() in _FULL_DAY_NAMES:
+            result.add(_FULL_DAY_NAMES[token.lower()])
+            continue
+        token = token.upper()
+        if COMPACT_DAYS_PATTERN.match(token):
+            result.update(_DAY_TOKENS[abbreviation] for abbreviation in _DAY_TOKEN_PATTERN.findall(token))
+
+    result = sorted(result)
+    _day_cache[key] = result
+    return result
+
+def is_unscheduled(days):
+    """True if a days value says the section has no regular meeting ("TBA", "['Online']")"""
+    tokens = [t for t in re.split(r'[\s,/\[\]\'"]+', str(days or '').lower()) if t]
+    return bool(tokens) and all(token in NO_MEETING_DAYS for token in tokens)
+
+def parse_minutes(value):
+    """Convert a time to minutes since midnight.
+
+    Strings are read as clock times ("13:00", "9", "1:30pm"); numbers are
+    taken to already be minutes since midnight. Returns None if unparseable.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if value != value:  # NaN from pandas
+            return None
+        return int(value)
+
+    match = _TIME_PATTERN.match(str(value))
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    period = (match.group(3) or '').lower()
+    if period == 'pm' and hour != 12:
+        hour += 12
+    elif period == 'am' and hour == 12:
+        hour = 0
+    if hour > 24 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+def format_clock(minutes):
+    """Minutes since midnight as a 12-hour clock time ("1:30 PM")"""
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour % 24 < 12 else 'PM'}"
+
+def slot_bounds(start_min, end_min):
+    """[first, last) slots covered by a meeting, rounded outwards so off-grid times never hide an overlap"""
+    return start_min // SLOT_MINUTES, min(-(-end_min // SLOT_MINUTES), SLOTS_PER_DAY)
+
+def free_slot_bounds(start_min, end_min):
+    """[first, last) slots lying wholly inside a free window, rounded inwards to match slot_bounds"""
+    return -(-start_min // SLOT_MINUTES), min(end_min // SLOT_MINUTES, SLOTS_PER_DAY)
+
+def minutes_mask(day_indices, start_min, end_min):
+    """Weekly slot bitmask for already-parsed day indices and start/end minutes (0 if empty)"""
+    if start_min is None or end_min is None or end_min <= start_min:
+        return 0
+
+    first_slot, last_slot = slot_bounds(start_min, end_min)
+    day_bits = ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+    mask = 0
+    for day in day_indices:
+        mask |= day_bits << (day * SLOTS_PER_DAY)
+    return mask
+
+def meeting_mask(days, start, end):
+    """Encode one meeting pattern as a weekly slot bitmask (0 if it can't be parsed)"""
+    return minutes_mask(parse_days(days), parse_minutes(start), parse_minutes(end))
+
+def meeting_times(course):
+    """(day indices, start minute, end minute) of a course or schedule entry in either schema.
+
+    Course records (course_record.py) were parsed at load and just hand back
+    their fields; dicts are parsed here. Unreadable times come back as None.
+    """
+    parsed_times = getattr(course, 'parsed_times', None)
+    if parsed_times is not None:
+        return parsed_times()
+    return (parse_days(course.get('days', '')), parse_minutes(course.get('start_time')),
+            parse_minutes(course.get('end_time')))
+
+def course_mask(course):
+    """Slot bitmask for a course record or a schedule entry dict (either catalog schema)"""
+    mask = getattr(course, 'slot_mask', None)
+    if mask is not None:
+        return mask
+    return minutes_mask(*meeting_times(course))
+
+def schedule_mask(schedule):
+    """Union of the slot bitmasks of every entry in a schedule"""
+    mask = 0
+    for course in schedule or []:
+        mask |= course_mask(course)
+    return mask
+
+def mask_bytes(mask):
+    """Little-endian fixed-width bytes of a weekly mask (bit i -> byte i // 8)"""
+    return mask.to_bytes(MASK_BYTES, 'little')
+
+def conflicts(mask, busy_mask):
+    """True if a meeting mask overlaps the busy mask"""
+    return (mask & busy_mask) != 0
+
+def encode_courses(courses):
+    """Encode a catalog once into a list of slot bitmasks, aligned with the input"""
+    return [course_mask(course) for course in courses]
+
+def compatible_courses(current_schedule, courses, masks=None):
+    """Return the courses that don't conflict with the current schedule"""
+    busy = schedule_mask(current_schedule)
+    if not busy:
+        return list(courses)
+    if masks is None:
+        masks = encode_courses(courses)
+    return [course for course, mask in zip(courses, masks) if not mask & busy]